@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "taggit",
 ]
 
 INSTALLED_APPS += BACKENDS
@@ -141,7 +142,153 @@ MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 
+# Advertisement counters
+# Impressions and clicks are buffered and flushed in batches. Use the "sqlite"
+# store to share pending counts between the worker processes of one host.
+
+AD_COUNTERS = {
+    "STORE": "local",
+    "SQLITE_PATH": BASE_DIR / "ad_counters.sqlite3",
+    "FLUSH_INTERVAL": 5,
+    "MAX_PENDING": 500,
+}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Archive search
+# Dotted path to a source.apps.archives.search.SearchBackend subclass. When
+# unset, SQLite databases use the FTS5 index and others fall back to icontains.
+
+ARCHIVE_SEARCH_BACKEND = None
+
+
+# Content cache
+# Published article listings and slug lookups are cached in this cache alias.
+
+CONTENT_CACHE = {
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+    "PAGE_SIZE": 20,
+}
+
+
+# Related articles
+# Number of neighbours precomputed per article, and whether overlap between
+# article bodies adds to the category/tag score of the best candidates. A save
+# refreshes at most REFRESH_LIMIT articles it newly ranks in; the rest are
+# queued in CACHE_ALIAS for "rebuild_related_articles --deferred".
+
+RELATED_ARTICLES = {
+    "TOP_N": 10,
+    "USE_TERMS": True,
+    "TERM_CANDIDATES": 100,
+    "REFRESH_LIMIT": 20,
+    "CACHE_ALIAS": "default",
+}
+
+
+# Media derivatives
+# Resized image variants are rendered in a process pool of WORKERS processes
+# (defaults to the CPU count). Requests for a missing variant render it behind
+# a lock held in CACHE_ALIAS; concurrent requests wait up to LOCK_WAIT seconds.
+
+MEDIA_DERIVATIVES = {
+    "WORKERS": None,
+    "CACHE_ALIAS": "default",
+    "LOCK_TIMEOUT": 60,
+    "LOCK_WAIT": 10,
+}
+
+
+# Chunked uploads
+# Resumable uploads of edition scans are written chunk by chunk to DIR and
+# moved into storage when complete. Unfinished uploads older than
+# EXPIRE_HOURS are removed by the expire_chunked_uploads command.
+
+CHUNKED_UPLOADS = {
+    "DIR": BASE_DIR / "chunked_uploads",
+    "MAX_CHUNK_SIZE": 8 * 1024 * 1024,
+    "MAX_FILE_SIZE": 2 * 1024 * 1024 * 1024,
+    "EXPIRE_HOURS": 48,
+}
+
+
+# Ad serving
+# Each process keeps the servable ads in memory and checks the shared version
+# stamp in CACHE_ALIAS every SYNC_INTERVAL seconds, reloading the index when
+# ads, campaigns or placements were changed by another process.
+
+AD_SERVING = {
+    "SYNC_INTERVAL": 5,
+    "CACHE_ALIAS": "default",
+}
+
+
+# Ad pacing
+# Campaign spend is charged when ad counters are flushed. Serving processes
+# re-read spend every REFRESH_INTERVAL seconds and throttle campaigns that have
+# spent more than TOLERANCE of their budget ahead of an even schedule.
+
+AD_PACING = {
+    "REFRESH_INTERVAL": 30,
+    "TOLERANCE": 0.05,
+}
+
+
+# Ad events
+# Impressions and clicks are appended to binary segment files in DIR, rotated
+# every SEGMENT_SECONDS or SEGMENT_BYTES, and folded into hourly and daily
+# rollups by the rollup_ad_events command, which must run on every host.
+
+AD_EVENTS = {
+    "DIR": BASE_DIR / "ad_events",
+    "SEGMENT_BYTES": 4 * 1024 * 1024,
+    "SEGMENT_SECONDS": 300,
+    "SEGMENTS_PER_BATCH": 20,
+    "CACHE_ALIAS": "default",
+}
+
+
+# Ad clicks
+# The click redirect hands clicks to a background writer with a queue of
+# QUEUE_SIZE; repeated clicks by one visitor on one ad within DEDUPE_SECONDS
+# count once, tracked in CACHE_ALIAS.
+
+AD_CLICKS = {
+    "DEDUPE_SECONDS": 30,
+    "QUEUE_SIZE": 10000,
+    "CACHE_ALIAS": "default",
+}
+
+
+# Ad slot cache
+# Rendered ad slot HTML is cached per placement, ad and variant in ALIAS for
+# TIMEOUT seconds, and invalidated when the ad, its media or the placement
+# changes.
+
+AD_SLOT_CACHE = {
+    "ALIAS": "default",
+    "TIMEOUT": 3600,
+}
+
+
+# Ad traffic filter
+# Impressions and clicks from bot user agents, or above the per-minute rate
+# of their IP address (read from IP_HEADER), are dropped, or logged as invalid
+# events when ACTION is "flag". BOT_PATTERNS replaces the built-in patterns.
+# With a forwarded IP_HEADER, TRUSTED_PROXIES is the number of proxies that
+# append to it; the client address is that many entries from the right.
+
+AD_TRAFFIC_FILTER = {
+    "ACTION": "drop",
+    "IMPRESSIONS_PER_MINUTE": 300,
+    "CLICKS_PER_MINUTE": 20,
+    "MAX_TRACKED_IPS": 100000,
+    "IP_HEADER": "REMOTE_ADDR",
+    "TRUSTED_PROXIES": 1,
+}
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Advertiser, AdCampaign, AdPlacement, Advertisement, AdPerformance
+from .models import (
+    Advertiser, AdCampaign, CampaignSpend, AdPlacement, Advertisement, AdPerformance, AdHourlyRollup, AdDailyRollup,
+)
 
 @admin.register(Advertiser)
 class AdvertiserAdmin(admin.ModelAdmin):
@@ -10,11 +12,18 @@ class AdvertiserAdmin(admin.ModelAdmin):
 
 @admin.register(AdCampaign)
 class AdCampaignAdmin(admin.ModelAdmin):
-    list_display = ('name', 'advertiser', 'budget', 'start_date', 'end_date', 'is_active')
+    list_display = ('name', 'advertiser', 'budget', 'spent', 'pricing_model', 'rate', 'start_date', 'end_date', 'is_active')
     search_fields = ('name',)
     list_filter = ('is_active', 'advertiser')
     ordering = ('-start_date',)
 
+@admin.register(CampaignSpend)
+class CampaignSpendAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'impressions', 'clicks', 'amount', 'created_at')
+    search_fields = ('campaign__name',)
+    list_filter = ('campaign',)
+    ordering = ('-created_at',)
+
 @admin.register(AdPlacement)
 class AdPlacementAdmin(admin.ModelAdmin):
     list_display = ('name', 'page', 'position', 'is_active')
@@ -24,7 +33,7 @@ class AdPlacementAdmin(admin.ModelAdmin):
 
 @admin.register(Advertisement)
 class AdvertisementAdmin(admin.ModelAdmin):
-    list_display = ('name', 'campaign', 'placement', 'url', 'impressions', 'clicks', 'is_active')
+    list_display = ('name', 'campaign', 'placement', 'url', 'weight', 'impressions', 'clicks', 'is_active')
     search_fields = ('name', 'url')
     list_filter = ('is_active', 'campaign', 'placement')
     ordering = ('-start_date',)
@@ -34,3 +43,17 @@ class AdPerformanceAdmin(admin.ModelAdmin):
     list_display = ('advertisement', 'total_impressions', 'total_clicks', 'click_through_rate')
     search_fields = ('advertisement__name',)
     ordering = ('advertisement',)
+
+@admin.register(AdHourlyRollup)
+class AdHourlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('hour', 'advertisement', 'campaign', 'placement', 'impressions', 'clicks')
+    list_filter = ('campaign', 'placement')
+    date_hierarchy = 'hour'
+    ordering = ('-hour',)
+
+@admin.register(AdDailyRollup)
+class AdDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'advertisement', 'campaign', 'placement', 'impressions', 'clicks')
+    list_filter = ('campaign', 'placement')
+    date_hierarchy = 'day'
+    ordering = ('-day',)
@@ -0,0 +1,223 @@
+"""
+Write-behind buffering for advertisement impression and click counters.
+
+Hits are accumulated as per-ad deltas and flushed periodically as batched
+``F()`` updates, so rendering an ad never issues a full-row ``save()``.
+"""
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Advertisement
+from .pacing import charge_campaigns
+
+logger = logging.getLogger(__name__)
+
+# (impressions, clicks) per advertisement id
+Deltas = Dict[int, Tuple[int, int]]
+
+FLUSH_CHUNK_SIZE = 500
+
+
+class LocalCounterStore:
+    """Keeps pending counter deltas in process memory."""
+
+    def __init__(self):
+        self._pending = defaultdict(lambda: [0, 0])
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, ad_id: int, impressions: int = 0, clicks: int = 0) -> None:
+        with self._lock:
+            entry = self._pending[ad_id]
+            entry[0] += impressions
+            entry[1] += clicks
+
+    def drain(self) -> Deltas:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: [0, 0])
+        return {ad_id: tuple(values) for ad_id, values in pending.items()}
+
+
+class SQLiteCounterStore:
+    """
+    Shares pending counter deltas between the worker processes of one host
+    through a local SQLite file, so any worker can flush them.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS pending_ad_counters ("
+            "ad_id INTEGER PRIMARY KEY, impressions INTEGER NOT NULL, clicks INTEGER NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, sql: str, params: Iterable = ()):
+        return self._connection().execute(sql, tuple(params))
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM pending_ad_counters").fetchone()[0]
+
+    def add(self, ad_id: int, impressions: int = 0, clicks: int = 0) -> None:
+        self._execute(
+            "INSERT INTO pending_ad_counters (ad_id, impressions, clicks) VALUES (?, ?, ?) "
+            "ON CONFLICT(ad_id) DO UPDATE SET "
+            "impressions = impressions + excluded.impressions, clicks = clicks + excluded.clicks",
+            (ad_id, impressions, clicks),
+        )
+
+    def drain(self) -> Deltas:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT ad_id, impressions, clicks FROM pending_ad_counters"
+            ).fetchall()
+            connection.execute("DELETE FROM pending_ad_counters")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return {ad_id: (impressions, clicks) for ad_id, impressions, clicks in rows}
+
+
+class AdCounterBuffer:
+    """
+    Accumulates impression/click deltas and writes them to ``Advertisement``
+    in batched, concurrency-safe updates.
+    """
+
+    def __init__(self, store=None, flush_interval: float = 5.0, max_pending: int = 500):
+        self.store = store if store is not None else LocalCounterStore()
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+
+    def record_impression(self, ad_id: int, count: int = 1) -> None:
+        """Buffer ``count`` impressions for an advertisement."""
+        self.record(ad_id, impressions=count)
+
+    def record_click(self, ad_id: int, count: int = 1) -> None:
+        """Buffer ``count`` clicks for an advertisement."""
+        self.record(ad_id, clicks=count)
+
+    def record(self, ad_id: int, impressions: int = 0, clicks: int = 0) -> None:
+        if not impressions and not clicks:
+            return
+        self.store.add(ad_id, impressions, clicks)
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due or len(self.store) >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write all pending deltas to the database.
+        Returns the number of advertisements updated.
+        """
+        # Only one flush per process at a time; concurrent callers skip.
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_flush = time.monotonic()
+            deltas = self.store.drain()
+            if not deltas:
+                return 0
+            applied: Set[int] = set()
+            try:
+                return apply_counter_deltas(deltas, applied)
+            except Exception:
+                # Put back the deltas of the chunks that did not commit so a later flush retries only those.
+                for ad_id, (impressions, clicks) in deltas.items():
+                    if ad_id not in applied:
+                        self.store.add(ad_id, impressions, clicks)
+                raise
+        finally:
+            self._flush_lock.release()
+
+
+def _delta_case(values: Dict[int, int], field: str = 'pk') -> Case:
+    return Case(
+        *[When(**{field: ad_id}, then=Value(delta)) for ad_id, delta in values.items() if delta],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def apply_counter_deltas(deltas: Deltas, applied: Optional[Set[int]] = None) -> int:
+    """
+    Apply per-ad (impressions, clicks) deltas with ``F()`` expressions and
+    charge campaign spend in the same transaction, one transaction per chunk
+    of ads. The ids of each committed chunk are added to ``applied``.
+    ``AdPerformance`` is derived from the event log rollups instead (see
+    ``rollups``). Returns the number of advertisements updated.
+    """
+    updated = 0
+    ad_ids = sorted(deltas)
+    for start in range(0, len(ad_ids), FLUSH_CHUNK_SIZE):
+        chunk = ad_ids[start:start + FLUSH_CHUNK_SIZE]
+        impressions = {ad_id: deltas[ad_id][0] for ad_id in chunk}
+        clicks = {ad_id: deltas[ad_id][1] for ad_id in chunk}
+
+        with transaction.atomic():
+            updated += Advertisement.objects.filter(pk__in=chunk).update(
+                impressions=F('impressions') + _delta_case(impressions),
+                clicks=F('clicks') + _delta_case(clicks),
+            )
+
+            charge_campaigns({ad_id: deltas[ad_id] for ad_id in chunk})
+        if applied is not None:
+            applied.update(chunk)
+    return updated
+
+
+_buffer: Optional[AdCounterBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_counter_buffer() -> AdCounterBuffer:
+    """Return the process-wide counter buffer configured by ``settings.AD_COUNTERS``."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = getattr(settings, 'AD_COUNTERS', {})
+                store = None
+                if config.get('STORE') == 'sqlite':
+                    store = SQLiteCounterStore(config['SQLITE_PATH'])
+                _buffer = AdCounterBuffer(
+                    store=store,
+                    flush_interval=config.get('FLUSH_INTERVAL', 5.0),
+                    max_pending=config.get('MAX_PENDING', 500),
+                )
+                atexit.register(_flush_at_exit, _buffer)
+    return _buffer
+
+
+def _flush_at_exit(buffer: AdCounterBuffer) -> None:
+    try:
+        buffer.flush()
+    except Exception:
+        logger.exception("Failed to flush advertisement counters at exit")
@@ -0,0 +1,163 @@
+"""
+Append-only log of ad impression and click events in binary segment files.
+
+Every process appends fixed-size records to its own open segment in
+``AD_EVENTS['DIR']``: one ``os.write`` per event on an ``O_APPEND`` file,
+with no database access. A segment is closed (renamed from ``.open`` to
+``.seg``) once it is ``SEGMENT_SECONDS`` old or ``SEGMENT_BYTES`` large, and
+closed segments are folded into hourly and daily rollups by ``rollups``.
+Segments left open by a process that stopped writing are picked up once
+they are older than ``SEGMENT_SECONDS`` plus a grace period, a point after
+which the writer never appends to them.
+"""
+import atexit
+import os
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+from django.conf import settings
+
+IMPRESSION = 0
+CLICK = 1
+# Events rejected by the traffic filter and kept for auditing; rollups skip them.
+INVALID_IMPRESSION = 2
+INVALID_CLICK = 3
+
+# timestamp (epoch seconds), ad id, campaign id, placement id (0 for none), kind, count
+RECORD = struct.Struct('<IQQQBI')
+
+_config = getattr(settings, 'AD_EVENTS', {})
+EVENT_DIR = Path(_config.get('DIR', Path(settings.BASE_DIR) / 'ad_events'))
+SEGMENT_BYTES = _config.get('SEGMENT_BYTES', 4 * 1024 * 1024)
+SEGMENT_SECONDS = _config.get('SEGMENT_SECONDS', 300)
+# Extra age after which an open segment is considered abandoned by its writer.
+STALE_GRACE = 60
+
+OPEN_SUFFIX = '.open'
+CLOSED_SUFFIX = '.seg'
+
+
+class AdEvent(NamedTuple):
+    timestamp: int
+    ad_id: int
+    campaign_id: int
+    placement_id: Optional[int]
+    kind: int
+    count: int
+
+
+def _created_at(path: Path) -> int:
+    # Segment names start with their creation time: <epoch>-<host>-<pid>-<seq>.<suffix>
+    try:
+        return int(path.name.split('-', 1)[0])
+    except ValueError:
+        return 0
+
+
+class EventLog:
+    """Writes events of this process to rotating segment files."""
+
+    def __init__(self, directory: Path = EVENT_DIR, segment_bytes: int = SEGMENT_BYTES,
+                 segment_seconds: int = SEGMENT_SECONDS):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self._fd: Optional[int] = None
+        self._path: Optional[Path] = None
+        self._opened = 0.0
+        self._size = 0
+        self._sequence = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def append(self, ad_id: int, campaign_id: int, placement_id: Optional[int], kind: int,
+               count: int = 1, timestamp: Optional[float] = None) -> None:
+        """Append one event record; ``count`` lets one record stand for several identical events."""
+        now = time.time()
+        record = RECORD.pack(int(timestamp or now), ad_id, campaign_id, placement_id or 0, kind, count)
+        with self._lock:
+            if self._needs_rotation(now):
+                self._rotate(now)
+            os.write(self._fd, record)
+            self._size += len(record)
+
+    def _needs_rotation(self, now: float) -> bool:
+        # A forked worker must not share its parent's segment.
+        return (
+            self._fd is None or self._pid != os.getpid()
+            or self._size >= self.segment_bytes or now - self._opened >= self.segment_seconds
+        )
+
+    def _rotate(self, now: float) -> None:
+        if self._pid == os.getpid():
+            self._close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        self._pid = os.getpid()
+        name = f'{int(now)}-{socket.gethostname()}-{self._pid}-{self._sequence}{OPEN_SUFFIX}'
+        self._path = self.directory / name
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._opened, self._size = now, 0
+
+    def _close(self) -> None:
+        if self._fd is None:
+            return
+        os.close(self._fd)
+        self._fd = None
+        try:
+            os.replace(self._path, self._path.with_suffix(CLOSED_SUFFIX))
+        except FileNotFoundError:
+            # Already taken over by a rollup as an abandoned segment.
+            pass
+
+    def close(self) -> None:
+        """Close the current segment so the next rollup includes it."""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._close()
+
+
+def closed_segments(directory: Path = EVENT_DIR, now: Optional[float] = None) -> List[Path]:
+    """
+    Segments ready to be rolled up, oldest first: closed ones, and open ones
+    whose writer can no longer append to them. Abandoned open segments are
+    renamed to closed ones here.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    now = now or time.time()
+    for path in directory.glob(f'*{OPEN_SUFFIX}'):
+        if now - _created_at(path) > SEGMENT_SECONDS + STALE_GRACE:
+            try:
+                os.replace(path, path.with_suffix(CLOSED_SUFFIX))
+            except FileNotFoundError:
+                pass
+    return sorted(directory.glob(f'*{CLOSED_SUFFIX}'), key=lambda path: (_created_at(path), path.name))
+
+
+def read_segment(path: Path) -> Iterator[AdEvent]:
+    """Events of a segment; a partial record at the end (from a crash mid-write) is ignored."""
+    data = Path(path).read_bytes()
+    usable = len(data) - len(data) % RECORD.size
+    for timestamp, ad_id, campaign_id, placement_id, kind, count in RECORD.iter_unpack(data[:usable]):
+        yield AdEvent(timestamp, ad_id, campaign_id, placement_id or None, kind, count)
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    """Return the process-wide event log configured by ``settings.AD_EVENTS``."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = EventLog()
+                atexit.register(_log.close)
+    return _log
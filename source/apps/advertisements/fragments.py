@@ -0,0 +1,111 @@
+"""
+Fragment cache for rendered ad slots.
+
+The HTML of a slot is cached per (placement, ad, variant) under keys stamped
+with a generation of the ad and of the placement. Saving or deleting the
+ad, its media or the placement bumps the matching generation, so stale
+fragments stop being read and expire on their own. Impressions are recorded
+for every rendered slot, whether the HTML came from the cache or not.
+"""
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import select_template
+from django.urls import reverse
+from django.utils.safestring import SafeString, mark_safe
+
+from .models import Advertisement
+from .serving import AdCandidate, select_ad
+from .tracking import record_impression
+
+
+class AdSlotCache:
+    """Renders ad slots and caches their HTML per placement, ad and variant."""
+
+    prefix = 'advertisements:slot'
+
+    def __init__(self, alias: str = 'default', timeout: int = 3600):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _generation_key(self, scope: str) -> str:
+        return f'{self.prefix}:generation:{scope}'
+
+    def _generations(self, *scopes: str) -> list:
+        keys = [self._generation_key(scope) for scope in scopes]
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self.cache.add(key, 1, timeout=None)
+                found[key] = self.cache.get(key, 1)
+        return [found[key] for key in keys]
+
+    def fragment_key(self, placement_id: int, ad_id: int, variant: str) -> str:
+        ad_generation, placement_generation = self._generations(f'ad:{ad_id}', f'placement:{placement_id}')
+        return f'{self.prefix}:{placement_id}:{ad_id}:{variant}:{ad_generation}:{placement_generation}'
+
+    def render(self, candidate: AdCandidate, variant: str = 'default') -> SafeString:
+        """The slot HTML for ``candidate``, rendered on a cache miss only."""
+        key = self.fragment_key(candidate.placement_id, candidate.ad_id, variant)
+        html = self.cache.get(key)
+        if html is None:
+            html = self._render(candidate, variant)
+            self.cache.set(key, html, self.timeout)
+        return mark_safe(html)
+
+    def _render(self, candidate: AdCandidate, variant: str) -> str:
+        ad = Advertisement.objects.select_related('media', 'placement').prefetch_related(
+            'media__variants'
+        ).get(pk=candidate.ad_id)
+        width, _, height = ad.placement.dimensions.partition('x')
+        template = select_template([f'advertisements/ad_slot_{variant}.html', 'advertisements/ad_slot.html'])
+        return template.render({
+            'ad': ad,
+            'placement': ad.placement,
+            'variant': variant,
+            'click_url': reverse('advertisements:ad-click', args=[ad.pk]),
+            'width': width if width.isdigit() else '',
+            'height': height if height.isdigit() else '',
+            'sizes': f'{width}px' if width.isdigit() else '100vw',
+        })
+
+    def invalidate_ads(self, ad_ids: Iterable[int]) -> None:
+        self._bump(f'ad:{ad_id}' for ad_id in ad_ids)
+
+    def invalidate_placements(self, placement_ids: Iterable[int]) -> None:
+        self._bump(f'placement:{placement_id}' for placement_id in placement_ids)
+
+    def _bump(self, scopes: Iterable[str]) -> None:
+        for scope in set(scopes):
+            key = self._generation_key(scope)
+            self.cache.add(key, 1, timeout=None)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, 2, timeout=None)
+
+
+_config = getattr(settings, 'AD_SLOT_CACHE', {})
+slot_cache = AdSlotCache(
+    alias=_config.get('ALIAS', 'default'),
+    timeout=_config.get('TIMEOUT', 3600),
+)
+
+
+def render_slot(page: str, position: str, dimensions: Optional[str] = None, variant: str = 'default',
+                request=None) -> SafeString:
+    """
+    Choose an ad for the slot, count the impression (through the traffic
+    filter when ``request`` is given) and return its HTML ('' when no ad is
+    eligible).
+    """
+    candidate = select_ad(page, position, dimensions)
+    if candidate is None:
+        return mark_safe('')
+    record_impression(candidate, request=request)
+    return slot_cache.render(candidate, variant)
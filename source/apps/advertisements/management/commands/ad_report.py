@@ -0,0 +1,34 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from source.services.ad_reporting import LEVELS, AdReportService
+
+
+class Command(BaseCommand):
+    help = "Write a CTR, spend, eCPM and pacing report per ad, campaign, advertiser or placement as CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--level', choices=list(LEVELS), default='campaign')
+        parser.add_argument('--start', type=date.fromisoformat, help="First day (YYYY-MM-DD), inclusive.")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last day (YYYY-MM-DD), inclusive.")
+        parser.add_argument('--output', type=Path, help="Output file; defaults to stdout.")
+        parser.add_argument(
+            '--refresh-performance', action='store_true',
+            help="Recompute all ad performance totals from the rollups first.",
+        )
+
+    def handle(self, *args, **options):
+        if options['refresh_performance']:
+            updated = AdReportService.refresh_performance()
+            self.stderr.write(self.style.SUCCESS(f"Refreshed performance of {updated} ad(s)."))
+
+        report = AdReportService.report(options['level'], options['start'], options['end'])
+        if options['output']:
+            with options['output'].open('w', encoding='utf-8', newline='') as handle:
+                AdReportService.write_csv(report, handle, options['level'])
+            self.stderr.write(self.style.SUCCESS(f"Wrote {len(report)} row(s) to {options['output']}"))
+        else:
+            AdReportService.write_csv(report, sys.stdout, options['level'])
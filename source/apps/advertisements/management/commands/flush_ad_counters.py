@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.advertisements.counters import get_counter_buffer
+
+
+class Command(BaseCommand):
+    help = "Flush buffered advertisement impression and click counters to the database."
+
+    def handle(self, *args, **options):
+        updated = get_counter_buffer().flush()
+        self.stdout.write(self.style.SUCCESS(f"Flushed counters for {updated} advertisement(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.advertisements.rollups import roll_up
+
+
+class Command(BaseCommand):
+    help = "Fold closed ad event log segments into hourly and daily rollups and refresh ad performance."
+
+    def handle(self, *args, **options):
+        result = roll_up()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {result['events']} event record(s) from {result['segments']} segment(s)."
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisements", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="advertisement",
+            name="weight",
+            field=models.PositiveIntegerField(default=1, verbose_name="Rotation Weight"),
+        ),
+    ]
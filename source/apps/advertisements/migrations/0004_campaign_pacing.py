@@ -0,0 +1,87 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisements", "0003_advertisement_weight"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="adcampaign",
+            name="pricing_model",
+            field=models.CharField(
+                choices=[("cpm", "Cost per 1000 impressions"), ("cpc", "Cost per click")],
+                default="cpm",
+                max_length=3,
+                verbose_name="Pricing Model",
+            ),
+        ),
+        migrations.AddField(
+            model_name="adcampaign",
+            name="rate",
+            field=models.DecimalField(
+                decimal_places=4,
+                default=0,
+                max_digits=10,
+                verbose_name="Rate (per 1000 impressions or per click)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="adcampaign",
+            name="spent",
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=12, verbose_name="Spent"),
+        ),
+        migrations.CreateModel(
+            name="CampaignSpend",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "impressions",
+                    models.PositiveIntegerField(default=0, verbose_name="Impressions"),
+                ),
+                (
+                    "clicks",
+                    models.PositiveIntegerField(default=0, verbose_name="Clicks"),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=4, max_digits=12, verbose_name="Amount"),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spend_entries",
+                        to="advertisements.adcampaign",
+                        verbose_name="Campaign",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Campaign Spend",
+                "verbose_name_plural": "Campaign Spend",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,204 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:10
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_rollups_from_performance(apps, schema_editor):
+    """
+    Carry lifetime totals recorded before the event log over as one rollup
+    on each ad's start date, so totals derived from rollups keep them.
+    """
+    AdPerformance = apps.get_model("advertisements", "AdPerformance")
+    AdHourlyRollup = apps.get_model("advertisements", "AdHourlyRollup")
+    AdDailyRollup = apps.get_model("advertisements", "AdDailyRollup")
+    hourly, daily = [], []
+    performances = AdPerformance.objects.select_related("advertisement").filter(
+        models.Q(total_impressions__gt=0) | models.Q(total_clicks__gt=0)
+    )
+    for performance in performances.iterator():
+        ad = performance.advertisement
+        values = dict(
+            advertisement_id=ad.pk,
+            campaign_id=ad.campaign_id,
+            placement_id=ad.placement_id,
+            impressions=performance.total_impressions,
+            clicks=performance.total_clicks,
+        )
+        hourly.append(
+            AdHourlyRollup(hour=timezone.make_aware(datetime.datetime.combine(ad.start_date, datetime.time.min)), **values)
+        )
+        daily.append(AdDailyRollup(day=ad.start_date, **values))
+    AdHourlyRollup.objects.bulk_create(hourly, batch_size=1000)
+    AdDailyRollup.objects.bulk_create(daily, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("advertisements", "0004_campaign_pacing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdEventSegment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, unique=True, verbose_name="Segment Name"),
+                ),
+                (
+                    "events",
+                    models.PositiveIntegerField(default=0, verbose_name="Events"),
+                ),
+            ],
+            options={
+                "verbose_name": "Ad Event Segment",
+                "verbose_name_plural": "Ad Event Segments",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="AdDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="Day")),
+                (
+                    "impressions",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Impressions"),
+                ),
+                (
+                    "clicks",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Clicks"),
+                ),
+                (
+                    "advertisement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="advertisements.advertisement",
+                        verbose_name="Advertisement",
+                    ),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="advertisements.adcampaign",
+                        verbose_name="Campaign",
+                    ),
+                ),
+                (
+                    "placement",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="daily_rollups",
+                        to="advertisements.adplacement",
+                        verbose_name="Placement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Ad Rollup",
+                "verbose_name_plural": "Daily Ad Rollups",
+                "ordering": ["-day"],
+                "indexes": [
+                    models.Index(fields=["advertisement", "day"], name="ad_daily_ad_idx"),
+                    models.Index(fields=["campaign", "day"], name="ad_daily_campaign_idx"),
+                    models.Index(fields=["placement", "day"], name="ad_daily_placement_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="AdHourlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(verbose_name="Hour")),
+                (
+                    "impressions",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Impressions"),
+                ),
+                (
+                    "clicks",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Clicks"),
+                ),
+                (
+                    "advertisement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hourly_rollups",
+                        to="advertisements.advertisement",
+                        verbose_name="Advertisement",
+                    ),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hourly_rollups",
+                        to="advertisements.adcampaign",
+                        verbose_name="Campaign",
+                    ),
+                ),
+                (
+                    "placement",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="hourly_rollups",
+                        to="advertisements.adplacement",
+                        verbose_name="Placement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Hourly Ad Rollup",
+                "verbose_name_plural": "Hourly Ad Rollups",
+                "ordering": ["-hour"],
+                "indexes": [
+                    models.Index(fields=["advertisement", "hour"], name="ad_hourly_ad_idx"),
+                    models.Index(fields=["campaign", "hour"], name="ad_hourly_campaign_idx"),
+                    models.Index(fields=["placement", "hour"], name="ad_hourly_placement_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(seed_rollups_from_performance, migrations.RunPython.noop),
+    ]
@@ -17,11 +17,23 @@ class Advertiser(TimeStampedModel):
 
 
 class AdCampaign(TimeStampedModel):
+    PRICING_CHOICES = [
+        ("cpm", "Cost per 1000 impressions"),
+        ("cpc", "Cost per click"),
+    ]
+
     name = models.CharField(max_length=255, verbose_name="Campaign Name")
     advertiser = models.ForeignKey(
         Advertiser, on_delete=models.CASCADE, related_name="ad_campaigns", verbose_name="Advertiser"
     )
     budget = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Budget")
+    pricing_model = models.CharField(
+        max_length=3, choices=PRICING_CHOICES, default="cpm", verbose_name="Pricing Model"
+    )
+    rate = models.DecimalField(
+        max_digits=10, decimal_places=4, default=0, verbose_name="Rate (per 1000 impressions or per click)"
+    )
+    spent = models.DecimalField(max_digits=12, decimal_places=4, default=0, verbose_name="Spent")
     start_date = models.DateField(verbose_name="Start Date")
     end_date = models.DateField(verbose_name="End Date")
     is_active = models.BooleanField(default=True, verbose_name="Is Active")
@@ -39,6 +51,29 @@ class AdCampaign(TimeStampedModel):
         self.is_active = False
         self.save()
 
+    @property
+    def remaining_budget(self):
+        return max(self.budget - self.spent, 0)
+
+
+class CampaignSpend(TimeStampedModel):
+    """One ledger entry per campaign per counter flush, charging the impressions and clicks flushed."""
+
+    campaign = models.ForeignKey(
+        AdCampaign, on_delete=models.CASCADE, related_name="spend_entries", verbose_name="Campaign"
+    )
+    impressions = models.PositiveIntegerField(default=0, verbose_name="Impressions")
+    clicks = models.PositiveIntegerField(default=0, verbose_name="Clicks")
+    amount = models.DecimalField(max_digits=12, decimal_places=4, verbose_name="Amount")
+
+    class Meta:
+        verbose_name = "Campaign Spend"
+        verbose_name_plural = "Campaign Spend"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.campaign.name}: {self.amount}"
+
 
 class AdPlacement(TimeStampedModel):
     name = models.CharField(max_length=255, verbose_name="Placement Name")
@@ -72,6 +107,7 @@ class Advertisement(TimeStampedModel):
     impressions = models.PositiveIntegerField(default=0, verbose_name="Impressions")
     clicks = models.PositiveIntegerField(default=0, verbose_name="Clicks")
     is_active = models.BooleanField(default=True, verbose_name="Is Active")
+    weight = models.PositiveIntegerField(default=1, verbose_name="Rotation Weight")
     start_date = models.DateField(verbose_name="Start Date")
     end_date = models.DateField(verbose_name="End Date")
 
@@ -84,14 +120,14 @@ class Advertisement(TimeStampedModel):
         return self.name
 
     def increment_impressions(self):
-        """Increment the number of impressions for the ad."""
-        self.impressions += 1
-        self.save()
+        """Record one impression for the ad; counters are written on the next flush."""
+        from .tracking import record_impression
+        record_impression(self)
 
     def increment_clicks(self):
-        """Increment the number of clicks for the ad."""
-        self.clicks += 1
-        self.save()
+        """Record one click for the ad; counters are written on the next flush."""
+        from .tracking import record_click
+        record_click(self)
 
     def deactivate(self):
         """Deactivate the ad."""
@@ -103,10 +139,10 @@ class Advertisement(TimeStampedModel):
         print(f"Ad: {self.name}, Impressions: {self.impressions}, Clicks: {self.clicks}")
 
     def update_performance(self, impressions, clicks):
-        """Update performance metrics with new values."""
-        self.impressions += impressions
-        self.clicks += clicks
-        self.save()
+        """Record new performance metrics; counters are written on the next flush."""
+        from .tracking import record_click, record_impression
+        record_impression(self, impressions)
+        record_click(self, clicks)
 
 
 class AdPerformance(models.Model):
@@ -127,16 +163,88 @@ class AdPerformance(models.Model):
         return f"Performance for {self.advertisement.name}"
 
     def update_metrics(self):
-        """Update click-through rate and other metrics."""
-        if self.total_impressions > 0:
-            self.click_through_rate = (self.total_clicks / self.total_impressions) * 100
-        else:
-            self.click_through_rate = 0
-        self.save()
+        """Update click-through rate and other metrics. Use ``AdReportService.refresh_performance()`` for many ads."""
+        from .rollups import click_through_rate
+        self.click_through_rate = click_through_rate(self.total_impressions, self.total_clicks)
+        self.save(update_fields=["click_through_rate"])
 
     def reset_metrics(self):
         """Reset the total impressions and clicks to zero."""
         self.total_impressions = 0
         self.total_clicks = 0
         self.click_through_rate = 0
-        self.save()
\ No newline at end of file
+        self.save()
+
+class AdHourlyRollup(models.Model):
+    """Impressions and clicks of one ad in one placement during one hour, folded from the event log."""
+
+    hour = models.DateTimeField(verbose_name="Hour")
+    advertisement = models.ForeignKey(
+        Advertisement, on_delete=models.CASCADE, related_name="hourly_rollups", verbose_name="Advertisement"
+    )
+    campaign = models.ForeignKey(
+        AdCampaign, on_delete=models.CASCADE, related_name="hourly_rollups", verbose_name="Campaign"
+    )
+    placement = models.ForeignKey(
+        AdPlacement, on_delete=models.SET_NULL, null=True, related_name="hourly_rollups", verbose_name="Placement"
+    )
+    impressions = models.PositiveBigIntegerField(default=0, verbose_name="Impressions")
+    clicks = models.PositiveBigIntegerField(default=0, verbose_name="Clicks")
+
+    class Meta:
+        verbose_name = "Hourly Ad Rollup"
+        verbose_name_plural = "Hourly Ad Rollups"
+        ordering = ["-hour"]
+        indexes = [
+            models.Index(fields=["advertisement", "hour"], name="ad_hourly_ad_idx"),
+            models.Index(fields=["campaign", "hour"], name="ad_hourly_campaign_idx"),
+            models.Index(fields=["placement", "hour"], name="ad_hourly_placement_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.advertisement_id} @ {self.hour:%Y-%m-%d %H:00}"
+
+
+class AdDailyRollup(models.Model):
+    """Impressions and clicks of one ad in one placement during one day, summed from the hourly rollups."""
+
+    day = models.DateField(verbose_name="Day")
+    advertisement = models.ForeignKey(
+        Advertisement, on_delete=models.CASCADE, related_name="daily_rollups", verbose_name="Advertisement"
+    )
+    campaign = models.ForeignKey(
+        AdCampaign, on_delete=models.CASCADE, related_name="daily_rollups", verbose_name="Campaign"
+    )
+    placement = models.ForeignKey(
+        AdPlacement, on_delete=models.SET_NULL, null=True, related_name="daily_rollups", verbose_name="Placement"
+    )
+    impressions = models.PositiveBigIntegerField(default=0, verbose_name="Impressions")
+    clicks = models.PositiveBigIntegerField(default=0, verbose_name="Clicks")
+
+    class Meta:
+        verbose_name = "Daily Ad Rollup"
+        verbose_name_plural = "Daily Ad Rollups"
+        ordering = ["-day"]
+        indexes = [
+            models.Index(fields=["advertisement", "day"], name="ad_daily_ad_idx"),
+            models.Index(fields=["campaign", "day"], name="ad_daily_campaign_idx"),
+            models.Index(fields=["placement", "day"], name="ad_daily_placement_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.advertisement_id} @ {self.day}"
+
+
+class AdEventSegment(TimeStampedModel):
+    """An event log segment already folded into the rollups, so a retried rollup never counts it twice."""
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Segment Name")
+    events = models.PositiveIntegerField(default=0, verbose_name="Events")
+
+    class Meta:
+        verbose_name = "Ad Event Segment"
+        verbose_name_plural = "Ad Event Segments"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,184 @@
+"""
+Campaign budget pacing and spend accounting.
+
+Spend is charged when buffered counters are flushed (see ``counters``): the
+impressions and clicks of each flush are priced per campaign, written as
+one ``CampaignSpend`` ledger row per charged campaign and added to
+``AdCampaign.spent``, and campaigns that reach their budget are
+deactivated. Serving never writes; it asks the process-wide pacer, which
+re-reads campaign spend every ``REFRESH_INTERVAL`` seconds, whether a
+campaign that is spending ahead of its flight should be skipped.
+"""
+import random
+import threading
+import time
+from datetime import datetime, time as day_time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+
+from .models import AdCampaign, Advertisement, CampaignSpend
+
+_config = getattr(settings, 'AD_PACING', {})
+REFRESH_INTERVAL = _config.get('REFRESH_INTERVAL', 30)
+# Share of the budget a campaign may spend ahead of an even schedule before it is throttled.
+TOLERANCE = _config.get('TOLERANCE', 0.05)
+
+AMOUNT_PLACES = Decimal('0.0001')
+THOUSAND = Decimal(1000)
+
+# (impressions, clicks) per advertisement id, as flushed by the counter buffer
+Deltas = Dict[int, Tuple[int, int]]
+
+
+def _flight(start_date, end_date) -> Tuple[datetime, datetime]:
+    """Start and end of a campaign's flight: midnight of the start date to midnight after the end date."""
+    start = timezone.make_aware(datetime.combine(start_date, day_time.min))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), day_time.min))
+    return start, end
+
+
+def elapsed_share(start_date, end_date, now: Optional[datetime] = None) -> float:
+    """Fraction of the flight that has passed, between 0 and 1."""
+    start, end = _flight(start_date, end_date)
+    now = now or timezone.now()
+    if now <= start:
+        return 0.0
+    if now >= end:
+        return 1.0
+    return (now - start) / (end - start)
+
+
+def expected_spend(campaign: AdCampaign, now: Optional[datetime] = None) -> Decimal:
+    """What the campaign should have spent by ``now`` if its budget were spread evenly over the flight."""
+    share = elapsed_share(campaign.start_date, campaign.end_date, now)
+    return (campaign.budget * Decimal(share)).quantize(AMOUNT_PLACES)
+
+
+def delivery_rate(budget: Decimal, spent: Decimal, start_date, end_date, now: Optional[datetime] = None) -> float:
+    """
+    Probability of serving the campaign: 1 while it is on or behind an even
+    schedule, the ratio of remaining budget to remaining flight while it is
+    ahead, and 0 once the budget is spent. Campaigns without a budget are
+    never throttled.
+    """
+    if budget <= 0:
+        return 1.0
+    remaining_budget = float((budget - spent) / budget)
+    if remaining_budget <= 0:
+        return 0.0
+    remaining_time = 1.0 - elapsed_share(start_date, end_date, now)
+    if remaining_time <= 0:
+        return 1.0
+    return min(1.0, (remaining_budget + TOLERANCE) / remaining_time)
+
+
+def price(pricing_model: str, rate: Decimal, impressions: int, clicks: int) -> Decimal:
+    """Cost of ``impressions`` and ``clicks`` under a campaign's pricing model."""
+    if pricing_model == 'cpc':
+        amount = rate * clicks
+    else:
+        amount = rate * impressions / THOUSAND
+    return amount.quantize(AMOUNT_PLACES)
+
+
+def charge_campaigns(deltas: Deltas) -> List[int]:
+    """
+    Charge the campaigns of the ads in ``deltas``: one ledger row per
+    campaign with a non-zero charge, one ``spent`` update for all of them,
+    and ``deactivate()`` for campaigns that reached their budget. Each
+    campaign is priced once on its summed impressions and clicks, so
+    rounding applies per campaign rather than per ad. Call inside the
+    transaction that applies the counters. Returns the ids of the
+    deactivated campaigns.
+    """
+    ads = Advertisement.objects.filter(pk__in=list(deltas)).values_list(
+        'pk', 'campaign_id', 'campaign__pricing_model', 'campaign__rate'
+    )
+    totals: Dict[int, List] = {}
+    for ad_id, campaign_id, pricing_model, rate in ads:
+        impressions, clicks = deltas[ad_id]
+        entry = totals.setdefault(campaign_id, [pricing_model, rate, 0, 0])
+        entry[2] += impressions
+        entry[3] += clicks
+
+    charged = {}
+    for campaign_id, (pricing_model, rate, impressions, clicks) in totals.items():
+        amount = price(pricing_model, rate, impressions, clicks)
+        if amount:
+            charged[campaign_id] = (impressions, clicks, amount)
+    if not charged:
+        return []
+
+    CampaignSpend.objects.bulk_create([
+        CampaignSpend(campaign_id=campaign_id, impressions=impressions, clicks=clicks, amount=amount)
+        for campaign_id, (impressions, clicks, amount) in charged.items()
+    ])
+    AdCampaign.objects.filter(pk__in=charged).update(spent=F('spent') + Case(
+        *[When(pk=campaign_id, then=Value(amount)) for campaign_id, (_, _, amount) in charged.items()],
+        default=Value(Decimal(0)),
+        output_field=DecimalField(max_digits=12, decimal_places=4),
+    ))
+
+    exhausted = AdCampaign.objects.filter(
+        pk__in=charged, is_active=True, budget__gt=0, spent__gte=F('budget')
+    )
+    deactivated = []
+    for campaign in exhausted:
+        # deactivate() saves, which also drops the campaign's ads from the serving index.
+        campaign.deactivate()
+        deactivated.append(campaign.pk)
+    return deactivated
+
+
+class CampaignPacer:
+    """Per-process delivery rates of running campaigns, re-read from the database periodically."""
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._rates: Dict[int, float] = {}
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, now: Optional[datetime] = None) -> None:
+        """Recompute delivery rates for all running campaigns in one query."""
+        now = now or timezone.now()
+        campaigns = AdCampaign.objects.filter(is_active=True, end_date__gte=timezone.localdate(now)).values_list(
+            'pk', 'budget', 'spent', 'start_date', 'end_date'
+        )
+        rates = {
+            pk: delivery_rate(budget, spent, start_date, end_date, now)
+            for pk, budget, spent, start_date, end_date in campaigns
+        }
+        # Campaigns on schedule are left out; a missing rate means "always serve".
+        self._rates = {pk: rate for pk, rate in rates.items() if rate < 1.0}
+        self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def rate(self, campaign_id: int) -> float:
+        if time.monotonic() >= self._next_refresh:
+            with self._lock:
+                if time.monotonic() >= self._next_refresh:
+                    self.refresh()
+        return self._rates.get(campaign_id, 1.0)
+
+    def allows(self, campaign_id: int) -> bool:
+        """Whether to serve the campaign now, throttling those spending ahead of schedule."""
+        rate = self.rate(campaign_id)
+        return rate >= 1.0 or random.random() < rate
+
+
+_pacer: Optional[CampaignPacer] = None
+_pacer_lock = threading.Lock()
+
+
+def get_pacer() -> CampaignPacer:
+    """Return the process-wide pacer configured by ``settings.AD_PACING``."""
+    global _pacer
+    if _pacer is None:
+        with _pacer_lock:
+            if _pacer is None:
+                _pacer = CampaignPacer()
+    return _pacer
@@ -0,0 +1,188 @@
+"""
+Hourly and daily rollups of the ad event log.
+
+``roll_up`` folds closed event segments (see ``events``) into
+``AdHourlyRollup`` rows per hour, ad, campaign and placement, recomputes
+the ``AdDailyRollup`` rows of the days it touched from the hourly ones, and
+derives ``AdPerformance`` totals for the affected ads from the daily rows.
+Each batch of segments is recorded in ``AdEventSegment`` in the same
+transaction, so a segment whose file outlived a crash is never counted
+twice.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .events import CLICK, EVENT_DIR, IMPRESSION, closed_segments, read_segment
+from .models import (
+    AdCampaign, AdDailyRollup, AdEventSegment, AdHourlyRollup, AdPerformance, AdPlacement, Advertisement,
+)
+
+_config = getattr(settings, 'AD_EVENTS', {})
+SEGMENTS_PER_BATCH = _config.get('SEGMENTS_PER_BATCH', 20)
+CACHE_ALIAS = _config.get('CACHE_ALIAS', 'default')
+LOCK_KEY = 'advertisements:rollup-lock'
+LOCK_TIMEOUT = 60 * 60
+
+CTR_LIMIT = Decimal('100.00')
+CTR_PLACES = Decimal('0.01')
+
+# (hour, ad id, campaign id, placement id)
+HourKey = Tuple[datetime, int, int, Optional[int]]
+
+
+def aggregate_events(paths: Iterable[Path]) -> Tuple[Dict[HourKey, List[int]], Dict[str, int]]:
+    """
+    [impressions, clicks] per hour, ad, campaign and placement in the given
+    segments, and the number of event records per segment name.
+    """
+    totals: Dict[HourKey, List[int]] = defaultdict(lambda: [0, 0])
+    records: Dict[str, int] = {}
+    for path in paths:
+        records[path.name] = 0
+        for event in read_segment(path):
+            records[path.name] += 1
+            if event.kind not in (IMPRESSION, CLICK):
+                continue
+            hour = datetime.fromtimestamp(event.timestamp - event.timestamp % 3600, tz=dt_timezone.utc)
+            entry = totals[hour, event.ad_id, event.campaign_id, event.placement_id]
+            entry[1 if event.kind == CLICK else 0] += event.count
+    return totals, records
+
+
+def _drop_orphans(totals: Dict[HourKey, List[int]]) -> Dict[HourKey, List[int]]:
+    # Events may outlive their ad, campaign or placement; the placement is then dropped, the event is not.
+    ad_ids = set(Advertisement.objects.filter(pk__in={key[1] for key in totals}).values_list('pk', flat=True))
+    campaign_ids = set(AdCampaign.objects.filter(pk__in={key[2] for key in totals}).values_list('pk', flat=True))
+    placement_ids = set(AdPlacement.objects.filter(
+        pk__in={key[3] for key in totals if key[3]}
+    ).values_list('pk', flat=True))
+    kept: Dict[HourKey, List[int]] = defaultdict(lambda: [0, 0])
+    for (hour, ad_id, campaign_id, placement_id), (impressions, clicks) in totals.items():
+        if ad_id in ad_ids and campaign_id in campaign_ids:
+            entry = kept[hour, ad_id, campaign_id, placement_id if placement_id in placement_ids else None]
+            entry[0] += impressions
+            entry[1] += clicks
+    return kept
+
+
+def merge_hourly(totals: Dict[HourKey, List[int]]) -> None:
+    """Add ``totals`` to the hourly rollups: one read, one bulk update and one bulk insert."""
+    existing = AdHourlyRollup.objects.select_for_update().filter(
+        hour__in={key[0] for key in totals}, advertisement_id__in={key[1] for key in totals}
+    )
+    rows = {(row.hour, row.advertisement_id, row.campaign_id, row.placement_id): row for row in existing}
+    changed, created = [], []
+    for key, (impressions, clicks) in totals.items():
+        row = rows.get(key)
+        if row is None:
+            hour, ad_id, campaign_id, placement_id = key
+            created.append(AdHourlyRollup(
+                hour=hour, advertisement_id=ad_id, campaign_id=campaign_id, placement_id=placement_id,
+                impressions=impressions, clicks=clicks,
+            ))
+        else:
+            row.impressions += impressions
+            row.clicks += clicks
+            changed.append(row)
+    AdHourlyRollup.objects.bulk_update(changed, ['impressions', 'clicks'], batch_size=1000)
+    AdHourlyRollup.objects.bulk_create(created, batch_size=1000)
+
+
+def rebuild_daily(days: Set, ad_ids: Set[int]) -> None:
+    """Recompute the daily rollups of ``ad_ids`` on ``days`` (in the current time zone) from the hourly ones."""
+    hourly = AdHourlyRollup.objects.filter(advertisement_id__in=ad_ids).annotate(
+        day=TruncDate('hour', tzinfo=timezone.get_current_timezone())
+    ).filter(day__in=days).values('day', 'advertisement_id', 'campaign_id', 'placement_id').annotate(
+        total_impressions=Sum('impressions'), total_clicks=Sum('clicks')
+    ).order_by()
+    AdDailyRollup.objects.filter(day__in=days, advertisement_id__in=ad_ids).delete()
+    AdDailyRollup.objects.bulk_create([
+        AdDailyRollup(
+            day=row['day'], advertisement_id=row['advertisement_id'], campaign_id=row['campaign_id'],
+            placement_id=row['placement_id'], impressions=row['total_impressions'], clicks=row['total_clicks'],
+        )
+        for row in hourly
+    ], batch_size=1000)
+
+
+def click_through_rate(impressions: int, clicks: int) -> Decimal:
+    if not impressions:
+        return Decimal(0)
+    return min(Decimal(clicks * 100) / Decimal(impressions), CTR_LIMIT).quantize(CTR_PLACES)
+
+
+def derive_performance(ad_ids: Optional[Set[int]] = None) -> int:
+    """
+    Set ``AdPerformance`` totals of ``ad_ids`` (all ads with rollups when
+    None) to the sum of their daily rollups. Returns rows updated.
+    """
+    rollups = AdDailyRollup.objects.all()
+    if ad_ids is not None:
+        rollups = rollups.filter(advertisement_id__in=ad_ids)
+    totals = {
+        row['advertisement_id']: (row['total_impressions'], row['total_clicks'])
+        for row in rollups.values('advertisement_id').annotate(
+            total_impressions=Sum('impressions'), total_clicks=Sum('clicks')
+        ).order_by()
+    }
+    AdPerformance.objects.bulk_create(
+        [AdPerformance(advertisement_id=ad_id) for ad_id in totals], ignore_conflicts=True
+    )
+    performances = list(AdPerformance.objects.filter(advertisement_id__in=totals))
+    for performance in performances:
+        impressions, clicks = totals[performance.advertisement_id]
+        performance.total_impressions = impressions
+        performance.total_clicks = clicks
+        performance.click_through_rate = click_through_rate(impressions, clicks)
+    return AdPerformance.objects.bulk_update(
+        performances, ['total_impressions', 'total_clicks', 'click_through_rate'], batch_size=1000
+    )
+
+
+def _roll_up_batch(paths: List[Path]) -> int:
+    with transaction.atomic():
+        done = set(AdEventSegment.objects.filter(name__in=[path.name for path in paths]).values_list('name', flat=True))
+        pending = [path for path in paths if path.name not in done]
+        totals, records = aggregate_events(pending)
+        # Recording the segments first makes a concurrent rollup of the same files fail instead of double counting.
+        AdEventSegment.objects.bulk_create([AdEventSegment(name=name, events=count) for name, count in records.items()])
+        totals = _drop_orphans(totals)
+        if totals:
+            merge_hourly(totals)
+            ad_ids = {key[1] for key in totals}
+            rebuild_daily({timezone.localdate(key[0]) for key in totals}, ad_ids)
+            derive_performance(ad_ids)
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return sum(records.values())
+
+
+def roll_up(directory: Path = EVENT_DIR) -> Dict[str, int]:
+    """
+    Fold all closed segments in ``directory`` into the rollups, in batches
+    of ``SEGMENTS_PER_BATCH``. Only one rollup runs at a time; a call while
+    another holds the lock returns without doing anything.
+    """
+    result = {'segments': 0, 'events': 0}
+    cache = caches[CACHE_ALIAS]
+    if not cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+        return result
+    try:
+        segments = closed_segments(directory)
+        for start in range(0, len(segments), SEGMENTS_PER_BATCH):
+            batch = segments[start:start + SEGMENTS_PER_BATCH]
+            result['events'] += _roll_up_batch(batch)
+            result['segments'] += len(batch)
+    finally:
+        cache.delete(LOCK_KEY)
+    return result
@@ -0,0 +1,249 @@
+"""
+In-memory ad decision engine.
+
+Each process keeps an index of the ads that can be served: active ads of
+active campaigns in active placements, with the start and end dates of
+both ad and campaign. Choosing an ad for a (page, position) slot is a
+dictionary lookup and a bisect over cumulative rotation weights, with no
+query. The index is refreshed incrementally for ads whose ad, campaign or
+placement changed in this process, and reloaded when another process
+bumps the shared version stamp.
+"""
+import random
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Advertisement
+from .pacing import get_pacer
+
+_config = getattr(settings, 'AD_SERVING', {})
+SYNC_INTERVAL = _config.get('SYNC_INTERVAL', 5)
+CACHE_ALIAS = _config.get('CACHE_ALIAS', 'default')
+VERSION_KEY = 'advertisements:serving-index-version'
+# Draws per selection before giving up on a slot whose campaigns are all throttled.
+MAX_DRAWS = 3
+
+
+class AdCandidate(NamedTuple):
+    ad_id: int
+    campaign_id: int
+    placement_id: int
+    page: str
+    position: str
+    dimensions: str
+    weight: int
+    # The later of the ad and campaign start dates, and the earlier of their end dates.
+    start_date: date
+    end_date: date
+    url: str
+    media_id: Optional[int]
+    name: str
+
+
+# (ad ids, cumulative weights) of the ads eligible in one slot today
+Rotation = Tuple[List[int], List[int]]
+
+
+def _servable(queryset):
+    return queryset.filter(
+        is_active=True, weight__gt=0, campaign__is_active=True, placement__is_active=True
+    ).select_related('campaign', 'placement')
+
+
+def _candidate(ad: Advertisement) -> AdCandidate:
+    return AdCandidate(
+        ad_id=ad.pk,
+        campaign_id=ad.campaign_id,
+        placement_id=ad.placement_id,
+        page=ad.placement.page,
+        position=ad.placement.position,
+        dimensions=ad.placement.dimensions,
+        weight=ad.weight,
+        start_date=max(ad.start_date, ad.campaign.start_date),
+        end_date=min(ad.end_date, ad.campaign.end_date),
+        url=ad.url,
+        media_id=ad.media_id,
+        name=ad.name,
+    )
+
+
+def is_live(candidate: AdCandidate, today: Optional[date] = None) -> bool:
+    """Whether an indexed ad is within its (and its campaign's) dates today."""
+    today = today or timezone.localdate()
+    return candidate.start_date <= today <= candidate.end_date
+
+
+async def aload_candidate(ad_id: int) -> Optional[AdCandidate]:
+    """The ad as the index would hold it, in one query; None when it is not servable."""
+    ad = await _servable(Advertisement.objects.filter(pk=ad_id)).afirst()
+    return _candidate(ad) if ad is not None else None
+
+
+class PlacementIndex:
+    """Servable ads grouped by (page, position), with per-day weighted rotations built on demand."""
+
+    def __init__(self, sync_interval: float = SYNC_INTERVAL, cache_alias: str = CACHE_ALIAS):
+        self.sync_interval = sync_interval
+        self.cache_alias = cache_alias
+        self._ads: Dict[int, AdCandidate] = {}
+        self._slots: Dict[Tuple[str, str], Dict[int, AdCandidate]] = defaultdict(dict)
+        self._rotations: Dict[Tuple[str, str, Optional[str]], Rotation] = {}
+        self._day: Optional[date] = None
+        self._version = None
+        self._loaded = False
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """Rebuild the whole index in one query. Returns the number of indexed ads."""
+        version = self._shared_version()
+        ads = {ad.pk: _candidate(ad) for ad in _servable(Advertisement.objects.all()).iterator()}
+        slots = defaultdict(dict)
+        for candidate in ads.values():
+            slots[candidate.page, candidate.position][candidate.ad_id] = candidate
+        with self._lock:
+            self._ads, self._slots, self._rotations = ads, slots, {}
+            self._version = version
+            self._loaded = True
+            self._next_sync = time.monotonic() + self.sync_interval
+        return len(ads)
+
+    def refresh(self, ad_ids: Iterable[int] = (), campaign_ids: Iterable[int] = (),
+                placement_ids: Iterable[int] = ()) -> None:
+        """
+        Re-read the ads with the given ids, or belonging to the given
+        campaigns or placements, in one query; ads no longer servable are
+        dropped from the index.
+        """
+        ad_ids, campaign_ids, placement_ids = set(ad_ids), set(campaign_ids), set(placement_ids)
+        if not (ad_ids or campaign_ids or placement_ids):
+            return
+        if not self._loaded:
+            # Nothing to patch; the first selection loads the whole index.
+            return
+        changed = Advertisement.objects.filter(
+            Q(pk__in=ad_ids) | Q(campaign__in=campaign_ids) | Q(placement__in=placement_ids)
+        )
+        fresh = {ad.pk: _candidate(ad) for ad in _servable(changed)}
+        with self._lock:
+            stale = [
+                candidate for candidate in self._ads.values()
+                if candidate.ad_id in ad_ids or candidate.campaign_id in campaign_ids
+                or candidate.placement_id in placement_ids
+            ]
+            for candidate in stale:
+                self._discard(candidate)
+            for candidate in fresh.values():
+                self._discard(self._ads.get(candidate.ad_id))
+                self._ads[candidate.ad_id] = candidate
+                self._slots[candidate.page, candidate.position][candidate.ad_id] = candidate
+            self._rotations = {}
+
+    def _discard(self, candidate: Optional[AdCandidate]) -> None:
+        if candidate is None:
+            return
+        self._ads.pop(candidate.ad_id, None)
+        slot = self._slots.get((candidate.page, candidate.position))
+        if slot is not None:
+            slot.pop(candidate.ad_id, None)
+            if not slot:
+                del self._slots[candidate.page, candidate.position]
+
+    def _shared_version(self):
+        return caches[self.cache_alias].get(VERSION_KEY)
+
+    def bump_version(self) -> None:
+        """Tell the other processes to reload; this process keeps its incrementally refreshed index."""
+        cache = caches[self.cache_alias]
+        previous, version = cache.get(VERSION_KEY), time.time_ns()
+        cache.set(VERSION_KEY, version, None)
+        # Only skip the next reload if no other process changed ads since this one last synced.
+        if previous == self._version:
+            self._version = version
+
+    def _sync(self) -> None:
+        if not self._loaded:
+            self.load()
+            return
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+        if self._shared_version() != self._version:
+            self.load()
+
+    def _rotation(self, page: str, position: str, dimensions: Optional[str], today: date) -> Rotation:
+        key = (page, position, dimensions)
+        rotation = self._rotations.get(key) if self._day == today else None
+        if rotation is not None:
+            return rotation
+        with self._lock:
+            if self._day != today:
+                self._rotations, self._day = {}, today
+            rotation = self._rotations.get(key)
+            if rotation is None:
+                eligible = sorted(
+                    (candidate for candidate in self._slots.get((page, position), {}).values()
+                     if is_live(candidate, today)
+                     and (dimensions is None or candidate.dimensions == dimensions)),
+                    key=lambda candidate: candidate.ad_id,
+                )
+                rotation = (
+                    [candidate.ad_id for candidate in eligible],
+                    list(accumulate(candidate.weight for candidate in eligible)),
+                )
+                self._rotations[key] = rotation
+        return rotation
+
+    def get(self, ad_id: int) -> Optional[AdCandidate]:
+        """The indexed ad with this id, from memory only; None when it is not (yet) indexed."""
+        return self._ads.get(ad_id)
+
+    def eligible(self, page: str, position: str, dimensions: Optional[str] = None) -> List[AdCandidate]:
+        """Ads that can be served in the slot today."""
+        self._sync()
+        ad_ids, _ = self._rotation(page, position, dimensions, timezone.localdate())
+        return [self._ads[ad_id] for ad_id in ad_ids if ad_id in self._ads]
+
+    def select(self, page: str, position: str, dimensions: Optional[str] = None) -> Optional[AdCandidate]:
+        """
+        Pick an ad for the slot with probability proportional to its weight,
+        skipping campaigns the pacer throttles, or None.
+        """
+        self._sync()
+        ad_ids, weights = self._rotation(page, position, dimensions, timezone.localdate())
+        pacer = get_pacer()
+        # Campaigns spending ahead of schedule are skipped with some probability; redraw a few times.
+        for _ in range(min(len(ad_ids), MAX_DRAWS)):
+            candidate = self._ads.get(ad_ids[bisect_right(weights, random.random() * weights[-1])])
+            if candidate is not None and pacer.allows(candidate.campaign_id):
+                return candidate
+        return None
+
+
+_index: Optional[PlacementIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_placement_index() -> PlacementIndex:
+    """Return the process-wide placement index configured by ``settings.AD_SERVING``."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PlacementIndex()
+    return _index
+
+
+def select_ad(page: str, position: str, dimensions: Optional[str] = None) -> Optional[AdCandidate]:
+    return get_placement_index().select(page, position, dimensions)
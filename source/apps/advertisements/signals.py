@@ -0,0 +1,75 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from source.apps.content.models import Media
+
+from .fragments import slot_cache
+from .models import AdCampaign, AdPlacement, Advertisement
+from .serving import get_placement_index
+
+_pending = threading.local()
+
+
+def schedule_index_refresh(ad_ids=(), campaign_ids=(), placement_ids=()) -> None:
+    """Refresh the placement index for the given ads, campaigns and placements once the transaction commits."""
+    if not hasattr(_pending, 'ad_ids'):
+        _pending.ad_ids, _pending.campaign_ids, _pending.placement_ids = set(), set(), set()
+    _pending.ad_ids.update(ad_ids)
+    _pending.campaign_ids.update(campaign_ids)
+    _pending.placement_ids.update(placement_ids)
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending() -> None:
+    ad_ids, _pending.ad_ids = getattr(_pending, 'ad_ids', set()), set()
+    campaign_ids, _pending.campaign_ids = getattr(_pending, 'campaign_ids', set()), set()
+    placement_ids, _pending.placement_ids = getattr(_pending, 'placement_ids', set()), set()
+    if not (ad_ids or campaign_ids or placement_ids):
+        return
+    index = get_placement_index()
+    index.refresh(ad_ids, campaign_ids, placement_ids)
+    index.bump_version()
+
+
+@receiver(post_save, sender=Advertisement)
+@receiver(post_delete, sender=Advertisement)
+def refresh_advertisement(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index_refresh(ad_ids=[instance.pk])
+
+
+@receiver(post_save, sender=AdCampaign)
+@receiver(post_delete, sender=AdCampaign)
+def refresh_campaign(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index_refresh(campaign_ids=[instance.pk])
+
+
+@receiver(post_save, sender=AdPlacement)
+@receiver(post_delete, sender=AdPlacement)
+def refresh_placement(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_index_refresh(placement_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Advertisement)
+@receiver(post_delete, sender=Advertisement)
+def invalidate_advertisement_slots(sender, instance, raw=False, **kwargs):
+    slot_cache.invalidate_ads([instance.pk])
+
+
+@receiver(post_save, sender=AdPlacement)
+@receiver(post_delete, sender=AdPlacement)
+def invalidate_placement_slots(sender, instance, raw=False, **kwargs):
+    slot_cache.invalidate_placements([instance.pk])
+
+
+@receiver(post_save, sender=Media)
+@receiver(pre_delete, sender=Media)
+def invalidate_media_slots(sender, instance, raw=False, **kwargs):
+    # pre_delete: the ads still point at the media until it is deleted.
+    if not raw:
+        slot_cache.invalidate_ads(instance.ads_media.values_list('pk', flat=True))
@@ -0,0 +1,15 @@
+from django import template
+
+from source.apps.advertisements.fragments import render_slot
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def ad_slot(context, page, position, dimensions=None, variant='default'):
+    """
+    An ad chosen for the page/position slot, rendered from the fragment cache:
+    {% ad_slot "homepage" "sidebar" dimensions="300x250" variant="compact" %}
+    The impression is filtered for invalid traffic when the context has a request.
+    """
+    return render_slot(page, position, dimensions, variant, request=context.get('request'))
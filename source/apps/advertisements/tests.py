@@ -1,3 +1,137 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from .counters import AdCounterBuffer
+from .events import CLICK, IMPRESSION
+from source.services.ad_reporting import AdReportService
+
+from .models import AdCampaign, AdDailyRollup, Advertisement, Advertiser, AdPlacement, CampaignSpend
+from .pacing import charge_campaigns
+from .traffic import (
+    ACCEPTED, BOT_USER_AGENT, EMPTY_USER_AGENT, IP_RATE_LIMIT, SlidingWindowCounter, TrafficFilter, Verdict,
+    client_address,
+)
+from .views import _visitor
+
+
+def create_ads(count, **campaign_fields):
+    today = timezone.localdate()
+    advertiser = Advertiser.objects.create(name="Advertiser", email=f"ads{Advertiser.objects.count()}@example.com")
+    campaign = AdCampaign.objects.create(
+        name="Campaign", advertiser=advertiser, budget=Decimal('1000'),
+        start_date=today - timedelta(days=1), end_date=today + timedelta(days=1), **campaign_fields
+    )
+    placement = AdPlacement.objects.create(name="Header", page="home", position="header", dimensions="728x90")
+    return [
+        Advertisement.objects.create(
+            name=f"Ad {number}", campaign=campaign, placement=placement, url="https://example.com/",
+            start_date=campaign.start_date, end_date=campaign.end_date,
+        )
+        for number in range(count)
+    ]
+
+
+class CounterFlushTests(TestCase):
+    def test_failed_flush_retries_only_uncommitted_chunks(self):
+        first, second = create_ads(2, pricing_model='cpm', rate=Decimal('2'))
+        buffer = AdCounterBuffer(flush_interval=1e9, max_pending=1e9)
+        buffer.record_impression(first.pk, 1000)
+        buffer.record_impression(second.pk, 1000)
+
+        charge = mock.Mock(side_effect=[[], RuntimeError("database went away")])
+        with mock.patch('source.apps.advertisements.counters.FLUSH_CHUNK_SIZE', 1), \
+                mock.patch('source.apps.advertisements.counters.charge_campaigns', charge):
+            with self.assertRaises(RuntimeError):
+                buffer.flush()
+        self.assertEqual(buffer.store.drain(), {second.pk: (1000, 0)})
+
+        buffer.record_impression(second.pk, 1000)
+        buffer.flush()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.impressions, second.impressions), (1000, 1000))
+        self.assertEqual(second.campaign.spend_entries.get().amount, Decimal('2'))
+
+
+class VisitorKeyTests(TestCase):
+    def test_clients_behind_the_proxy_get_distinct_keys(self):
+        factory = RequestFactory()
+        with mock.patch('source.apps.advertisements.traffic.IP_HEADER', 'HTTP_X_FORWARDED_FOR'):
+            first, second, forged = [
+                _visitor(factory.get('/', REMOTE_ADDR='10.0.0.1', HTTP_USER_AGENT='Browser', HTTP_X_FORWARDED_FOR=forwarded))
+                for forwarded in ('198.51.100.1', '198.51.100.2', '203.0.113.9, 198.51.100.1')
+            ]
+        self.assertNotEqual(first, second)
+        self.assertEqual(first, forged)
+
+
+class CampaignChargeTests(TestCase):
+    def test_campaigns_are_priced_once_and_only_charged_ones_are_recorded(self):
+        first, second = create_ads(2, pricing_model='cpm', rate=Decimal('0.05'))
+        (unclicked,) = create_ads(1, pricing_model='cpc', rate=Decimal('1'))
+        # Each ad's share rounds to nothing; the campaign's total does not.
+        charge_campaigns({first.pk: (1, 0), second.pk: (1, 0), unclicked.pk: (500, 0)})
+
+        entry = CampaignSpend.objects.get()
+        self.assertEqual((entry.campaign_id, entry.impressions, entry.amount), (first.campaign_id, 2, Decimal('0.0001')))
+        first.campaign.refresh_from_db()
+        self.assertEqual(first.campaign.spent, Decimal('0.0001'))
+
+
+class AdReportSpendTests(TestCase):
+    def test_spend_comes_from_the_ledger(self):
+        first, second = create_ads(2, pricing_model='cpm', rate=Decimal('2'))
+        campaign, today = first.campaign, timezone.localdate()
+        for ad, impressions in ((first, 3000), (second, 1000)):
+            AdDailyRollup.objects.create(
+                day=today, advertisement=ad, campaign=campaign, placement=ad.placement, impressions=impressions
+            )
+        charge_campaigns({first.pk: (3000, 0), second.pk: (1000, 0)})
+        # A rate change applies to later charges only.
+        AdCampaign.objects.filter(pk=campaign.pk).update(rate=Decimal('5'))
+
+        (row,) = AdReportService.report('campaign', today, today)
+        self.assertEqual((row['spend'], row['ecpm']), (Decimal('8.00'), 2.0))
+        ads = {row['id']: row['spend'] for row in AdReportService.report('ad', today, today)}
+        self.assertEqual(ads, {first.pk: Decimal('6.00'), second.pk: Decimal('2.00')})
+        (row,) = AdReportService.report('advertiser', today, today)
+        self.assertEqual(row['spend'], Decimal('8.00'))
+
+
+class TrafficFilterTests(TestCase):
+    BROWSER = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"
+
+    def test_user_agent_rules(self):
+        traffic_filter = TrafficFilter()
+        self.assertEqual(traffic_filter.check(IMPRESSION, '198.51.100.1', '  '), Verdict(False, EMPTY_USER_AGENT))
+        for user_agent in ("Googlebot/2.1 (+http://www.google.com/bot.html)", "python-requests/2.31", "curl/8.4.0"):
+            with self.subTest(user_agent=user_agent):
+                verdict = traffic_filter.check(IMPRESSION, '198.51.100.1', user_agent)
+                self.assertEqual(verdict, Verdict(False, BOT_USER_AGENT))
+        self.assertEqual(traffic_filter.check(IMPRESSION, '198.51.100.1', self.BROWSER), Verdict(True, ACCEPTED))
+        self.assertEqual(traffic_filter.metrics(), {EMPTY_USER_AGENT: 1, BOT_USER_AGENT: 3, ACCEPTED: 1})
+
+    def test_rate_limit_is_per_address_and_event_kind(self):
+        traffic_filter = TrafficFilter(clicks_per_minute=2, impressions_per_minute=100)
+        verdicts = [traffic_filter.check(CLICK, '198.51.100.1', self.BROWSER).rule for _ in range(3)]
+        self.assertEqual(verdicts, [ACCEPTED, ACCEPTED, IP_RATE_LIMIT])
+        self.assertTrue(traffic_filter.check(CLICK, '198.51.100.2', self.BROWSER).accepted)
+        self.assertTrue(traffic_filter.check(IMPRESSION, '198.51.100.1', self.BROWSER).accepted)
+
+    def test_sliding_window_carries_part_of_the_previous_window(self):
+        counter = SlidingWindowCounter(limit=4, window=60)
+        self.assertEqual([counter.hit('ip', now=60 + second) for second in range(5)], [True] * 4 + [False])
+        # Halfway through the next window, half of the previous four still count.
+        self.assertEqual([counter.hit('ip', now=150) for _ in range(3)], [True, True, False])
+        # Two windows later the key starts afresh.
+        self.assertTrue(counter.hit('ip', now=300))
+
+    def test_client_address_skips_entries_added_by_trusted_proxies(self):
+        self.assertEqual(client_address('203.0.113.9, 198.51.100.1', trusted_proxies=1), '198.51.100.1')
+        self.assertEqual(client_address('203.0.113.9, 198.51.100.1, 10.0.0.2', trusted_proxies=2), '198.51.100.1')
+        self.assertEqual(client_address('198.51.100.1', trusted_proxies=3), '198.51.100.1')
+        self.assertEqual(client_address(''), '')
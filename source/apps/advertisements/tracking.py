@@ -0,0 +1,142 @@
+"""
+Entry point for recording ad impressions and clicks.
+
+Each event is buffered for the live counters and campaign spend (see
+``counters`` and ``pacing``) and appended to the event log that feeds the
+hourly and daily rollups (see ``events`` and ``rollups``). Neither writes to
+the database on the request path. Events recorded with their request first
+pass the invalid traffic filter (see ``traffic``). Clicks arriving through
+the redirect view are handed to a background ``ClickRecorder``, which also
+drops double clicks.
+"""
+import logging
+import queue
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .counters import get_counter_buffer
+from .events import CLICK, IMPRESSION, INVALID_CLICK, INVALID_IMPRESSION, get_event_log
+from .traffic import get_traffic_filter
+
+logger = logging.getLogger(__name__)
+
+_config = getattr(settings, 'AD_CLICKS', {})
+DEDUPE_SECONDS = _config.get('DEDUPE_SECONDS', 30)
+QUEUE_SIZE = _config.get('QUEUE_SIZE', 10000)
+CACHE_ALIAS = _config.get('CACHE_ALIAS', 'default')
+
+
+def _record(ad, kind: int, count: int) -> None:
+    if count <= 0:
+        return
+    # Accepts an Advertisement or a serving AdCandidate.
+    ad_id = getattr(ad, 'ad_id', None) or ad.pk
+    buffer = get_counter_buffer()
+    if kind == CLICK:
+        buffer.record_click(ad_id, count)
+    else:
+        buffer.record_impression(ad_id, count)
+    get_event_log().append(ad_id, ad.campaign_id, ad.placement_id, kind, count)
+
+
+def admit(ad, kind: int, request) -> bool:
+    """
+    Run an event through the traffic filter. Rejected events are dropped,
+    or logged as invalid events when the filter's action is "flag".
+    """
+    verdict = get_traffic_filter().check_request(kind, request)
+    if verdict.accepted:
+        return True
+    if get_traffic_filter().action == 'flag':
+        ad_id = getattr(ad, 'ad_id', None) or ad.pk
+        get_event_log().append(
+            ad_id, ad.campaign_id, ad.placement_id, INVALID_CLICK if kind == CLICK else INVALID_IMPRESSION
+        )
+    return False
+
+
+def record_impression(ad, count: int = 1, request=None) -> None:
+    """Record ``count`` impressions of an ad, filtering invalid traffic when the request is given."""
+    if request is None or admit(ad, IMPRESSION, request):
+        _record(ad, IMPRESSION, count)
+
+
+def record_click(ad, count: int = 1, request=None) -> None:
+    """Record ``count`` clicks on an ad, filtering invalid traffic when the request is given."""
+    if request is None or admit(ad, CLICK, request):
+        _record(ad, CLICK, count)
+
+
+class ClickRecorder:
+    """
+    Records clicks on a background thread so the click redirect never waits
+    for it. Repeated clicks by the same visitor on the same ad within
+    ``dedupe_seconds`` count once; the window is kept in a shared cache so
+    it holds across worker processes.
+    """
+
+    def __init__(self, dedupe_seconds: int = DEDUPE_SECONDS, queue_size: int = QUEUE_SIZE,
+                 cache_alias: str = CACHE_ALIAS):
+        self.dedupe_seconds = dedupe_seconds
+        self.cache_alias = cache_alias
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, ad, visitor: str) -> bool:
+        """Queue a click without blocking. Returns False when the queue is full and the click is dropped."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((ad, visitor))
+        except queue.Full:
+            logger.warning("Click queue is full; dropping click on ad %s", getattr(ad, 'ad_id', None) or ad.pk)
+            return False
+        return True
+
+    def _ensure_thread(self) -> None:
+        # Started lazily, and again in a forked worker, where the parent's thread does not exist.
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='ad-click-recorder', daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            ad, visitor = self._queue.get()
+            try:
+                self.record(ad, visitor)
+            except Exception:
+                logger.exception("Failed to record click on ad %s", getattr(ad, 'ad_id', None) or ad.pk)
+            finally:
+                self._queue.task_done()
+
+    def record(self, ad, visitor: str) -> bool:
+        """Record the click unless the visitor clicked the ad within the window. Returns whether it counted."""
+        ad_id = getattr(ad, 'ad_id', None) or ad.pk
+        key = f'advertisements:click:{ad_id}:{visitor}'
+        if not caches[self.cache_alias].add(key, 1, self.dedupe_seconds):
+            return False
+        record_click(ad)
+        return True
+
+    def join(self) -> None:
+        """Wait until every queued click has been recorded."""
+        self._queue.join()
+
+
+_recorder: Optional[ClickRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_click_recorder() -> ClickRecorder:
+    """Return the process-wide click recorder configured by ``settings.AD_CLICKS``."""
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = ClickRecorder()
+    return _recorder
@@ -0,0 +1,164 @@
+"""
+Invalid traffic filter in front of ad event recording.
+
+Every impression or click recorded with its request passes two rules before
+it reaches the counters and the event log: the user agent is classified by
+one compiled pattern of known crawlers, monitors and HTTP libraries (results
+are memoised per user agent string), and each IP address is held to a
+per-minute rate with an in-memory sliding window. Rejected events are
+dropped or, with ``ACTION = "flag"``, kept in the event log as invalid
+events that the rollups skip. Hits per rule are counted for monitoring.
+"""
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+
+from .events import CLICK
+
+BOT_PATTERNS = (
+    r'bot\b', r'crawl', r'spider', r'slurp', r'archiver', r'facebookexternalhit', r'embedly', r'preview',
+    r'headless', r'phantomjs', r'selenium', r'puppeteer', r'playwright', r'lighthouse', r'pingdom',
+    r'uptime', r'monitor', r'python-requests', r'python-urllib', r'aiohttp', r'httpx', r'curl/',
+    r'wget/', r'go-http-client', r'java/', r'okhttp', r'libwww-perl', r'scrapy', r'feedfetcher',
+)
+
+EMPTY_USER_AGENT = 'empty-user-agent'
+BOT_USER_AGENT = 'bot-user-agent'
+IP_RATE_LIMIT = 'ip-rate-limit'
+ACCEPTED = 'accepted'
+
+_config = getattr(settings, 'AD_TRAFFIC_FILTER', {})
+ACTION = _config.get('ACTION', 'drop')
+IMPRESSIONS_PER_MINUTE = _config.get('IMPRESSIONS_PER_MINUTE', 300)
+CLICKS_PER_MINUTE = _config.get('CLICKS_PER_MINUTE', 20)
+MAX_TRACKED_IPS = _config.get('MAX_TRACKED_IPS', 100000)
+USER_AGENT_CACHE_SIZE = _config.get('USER_AGENT_CACHE_SIZE', 4096)
+IP_HEADER = _config.get('IP_HEADER', 'REMOTE_ADDR')
+# Proxies in front of the site that append to IP_HEADER when it is a forwarded header.
+TRUSTED_PROXIES = _config.get('TRUSTED_PROXIES', 1)
+
+
+class Verdict(NamedTuple):
+    accepted: bool
+    rule: str
+
+
+class SlidingWindowCounter:
+    """
+    Per-key hit rate over a sliding window, estimated from the counts of the
+    current and previous fixed windows. Keeps at most ``max_keys`` keys,
+    forgetting the least recently seen first.
+    """
+
+    def __init__(self, limit: int, window: float = 60.0, max_keys: int = MAX_TRACKED_IPS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # key -> [window start, previous window count, current window count]
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, now: Optional[float] = None) -> bool:
+        """Count a hit for ``key`` unless it would exceed the limit. Returns whether it was allowed."""
+        now = time.monotonic() if now is None else now
+        start = now - now % self.window
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or start - entry[0] > self.window:
+                entry = [start, 0, 0]
+            elif start != entry[0]:
+                entry = [start, entry[2], 0]
+            self._entries[key] = entry
+            if len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+            estimate = entry[1] * (1 - (now - start) / self.window) + entry[2]
+            if estimate >= self.limit:
+                return False
+            entry[2] += 1
+            return True
+
+
+def client_address(forwarded: str, trusted_proxies: int = TRUSTED_PROXIES) -> str:
+    """
+    The client address in a (possibly comma-separated) forwarded header. Each
+    trusted proxy appends the address it received the request from, so the
+    entry ``trusted_proxies`` from the right is the last one not supplied by
+    the client; entries left of it can be forged.
+    """
+    addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+    if not addresses:
+        return ''
+    return addresses[-min(max(trusted_proxies, 1), len(addresses))]
+
+
+def request_address(request) -> str:
+    """The client address of ``request``, read from ``IP_HEADER`` with ``REMOTE_ADDR`` as fallback."""
+    return client_address(request.META.get(IP_HEADER, '') or request.META.get('REMOTE_ADDR', ''))
+
+
+class TrafficFilter:
+    """Classifies ad events as valid or invalid traffic and counts the rule each one matched."""
+
+    def __init__(self, bot_patterns: Iterable[str] = BOT_PATTERNS,
+                 impressions_per_minute: int = IMPRESSIONS_PER_MINUTE,
+                 clicks_per_minute: int = CLICKS_PER_MINUTE, action: str = ACTION,
+                 user_agent_cache_size: int = USER_AGENT_CACHE_SIZE):
+        self.action = action
+        self._bot_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in bot_patterns), re.IGNORECASE)
+        self.is_bot = lru_cache(maxsize=user_agent_cache_size)(self._matches_bot)
+        self._limits = {
+            'impression': SlidingWindowCounter(impressions_per_minute),
+            'click': SlidingWindowCounter(clicks_per_minute),
+        }
+        self._hits = Counter()
+        self._lock = threading.Lock()
+
+    def _matches_bot(self, user_agent: str) -> bool:
+        return self._bot_pattern.search(user_agent) is not None
+
+    def check(self, kind: int, ip_address: str, user_agent: str) -> Verdict:
+        """Apply the rules in order, cheapest first, and return the first that rejects the event."""
+        user_agent = (user_agent or '').strip()
+        if not user_agent:
+            verdict = Verdict(False, EMPTY_USER_AGENT)
+        elif self.is_bot(user_agent):
+            verdict = Verdict(False, BOT_USER_AGENT)
+        elif not self._limits['click' if kind == CLICK else 'impression'].hit(ip_address or ''):
+            verdict = Verdict(False, IP_RATE_LIMIT)
+        else:
+            verdict = Verdict(True, ACCEPTED)
+        with self._lock:
+            self._hits[verdict.rule] += 1
+        return verdict
+
+    def check_request(self, kind: int, request) -> Verdict:
+        return self.check(kind, request_address(request), request.META.get('HTTP_USER_AGENT', ''))
+
+    def metrics(self) -> Dict[str, int]:
+        """Hits per rule since the process started (or the last reset)."""
+        with self._lock:
+            return dict(self._hits)
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+
+_filter: Optional[TrafficFilter] = None
+_filter_lock = threading.Lock()
+
+
+def get_traffic_filter() -> TrafficFilter:
+    """Return the process-wide traffic filter configured by ``settings.AD_TRAFFIC_FILTER``."""
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                _filter = TrafficFilter(bot_patterns=_config.get('BOT_PATTERNS') or BOT_PATTERNS)
+    return _filter
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'advertisements'
+
+urlpatterns = [
+    path('<int:ad_id>/click/', views.ad_click, name='ad-click'),
+]
@@ -1,3 +1,39 @@
-from django.shortcuts import render
+import hashlib
 
-# Create your views here.
+from django.http import Http404, HttpResponseRedirect
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.http import require_GET
+
+from .models import Advertisement
+from .serving import aload_candidate, get_placement_index, is_live
+from .events import CLICK
+from .tracking import admit, get_click_recorder
+from .traffic import request_address
+
+
+def _visitor(request) -> str:
+    """An anonymous key for the visitor, used only to drop double clicks."""
+    fingerprint = f"{request_address(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+@require_GET
+async def ad_click(request, ad_id):
+    """
+    Redirect to the ad's target URL and record the click in the background,
+    unless the traffic filter rejects it. Only clicks on ads that can be
+    served today are recorded, so a paused, expired or exhausted campaign is
+    not charged for them; other ads still redirect. Servable ads are read
+    from the in-memory placement index; others cost a query or two.
+    """
+    ad = get_placement_index().get(ad_id) or await aload_candidate(ad_id)
+    if ad is None:
+        ad = await Advertisement.objects.only('url').filter(pk=ad_id).afirst()
+        if ad is None:
+            raise Http404("Unknown advertisement")
+    elif is_live(ad) and admit(ad, CLICK, request):
+        get_click_recorder().submit(ad, _visitor(request))
+    response = HttpResponseRedirect(ad.url)
+    # A cached redirect would skip the click.
+    add_never_cache_headers(response)
+    return response
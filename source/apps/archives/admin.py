@@ -84,7 +84,7 @@ class EditionAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'slug')
     prepopulated_fields = {'slug': ('title',)}
     inlines = [EditionContentInline]
-    raw_id_fields = ('cover_image', 'primary_category')
+    raw_id_fields = ('cover_image', 'scan', 'primary_category')
     date_hierarchy = 'publication_date'
     
     def edition_title(self, obj):
@@ -117,7 +117,7 @@ class EditionAdmin(admin.ModelAdmin):
         }),
         ('Digitization', {
             'fields': (
-                'is_digitized',
+                ('is_digitized', 'scan'),
                 ('page_count', 'file_size'),
             ),
             'classes': ('collapse',)
@@ -0,0 +1,115 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from source.apps.archives.models import ArchiveYear, Edition, EditionContent
+from source.apps.content.models import Category
+from source.services.archive_statistics import CONTENT_TYPES, ArchiveStatisticsService
+
+
+def legacy_year_statistics(year):
+    """The original per-year implementation, kept for comparison."""
+    archive_year = ArchiveYear.objects.get(year=year)
+    editions = archive_year.editions.all()
+    return {
+        'total_editions': archive_year.total_editions,
+        'total_content': EditionContent.objects.filter(edition__archive_year=archive_year).count(),
+        'content_by_type': list(EditionContent.objects.filter(
+            edition__archive_year=archive_year
+        ).values('content_type').annotate(count=Count('id'))),
+        'digitized_editions': editions.filter(is_digitized=True).count(),
+        'total_pages': sum(edition.page_count for edition in editions),
+        'categories': Category.objects.filter(
+            archived_content__edition__archive_year=archive_year
+        ).distinct().count()
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark archive year statistics against synthetic data. The data is "
+        "created inside a transaction that is always rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Number of EditionContent rows to create.")
+        parser.add_argument('--years', type=int, default=20)
+        parser.add_argument('--pages-per-edition', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=25)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            years = self.seed(options)
+            self.report(years)
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        pages = options['pages_per_edition']
+        edition_count = max(1, options['rows'] // pages)
+        year_values = [1900 + offset for offset in range(options['years'])]
+
+        categories = Category.objects.bulk_create([
+            Category(name=f'benchmark-category-{index}', slug=f'benchmark-category-{index}')
+            for index in range(options['categories'])
+        ])
+        archive_years = ArchiveYear.objects.bulk_create([ArchiveYear(year=year) for year in year_values])
+        editions = Edition.objects.bulk_create([
+            Edition(
+                archive_year=archive_years[index % len(archive_years)],
+                edition_number=index,
+                title=f'Benchmark edition {index}',
+                slug=f'benchmark-edition-{index}',
+                publication_date=date(archive_years[index % len(archive_years)].year, 1, 1),
+                is_digitized=index % 3 == 0,
+                page_count=pages,
+            )
+            for index in range(edition_count)
+        ], batch_size=1000)
+
+        Through = EditionContent.categories.through
+        for edition in editions:
+            contents = EditionContent.objects.bulk_create([
+                EditionContent(
+                    edition=edition,
+                    title=f'Page {page}',
+                    content_type=CONTENT_TYPES[page % len(CONTENT_TYPES)],
+                    page_number=page,
+                )
+                for page in range(1, pages + 1)
+            ])
+            Through.objects.bulk_create([
+                Through(editioncontent_id=content.pk, category_id=categories[content.page_number % len(categories)].pk)
+                for content in contents
+            ])
+
+        self.stdout.write(f"Seeded {edition_count * pages} content rows across {len(year_values)} years.")
+        return year_values
+
+    def measure(self, label, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"{label:<45} {len(queries):>6} queries {elapsed:>10.1f} ms")
+
+    def report(self, years):
+        self.measure(
+            "legacy get_year_statistics (single year)",
+            lambda: legacy_year_statistics(years[0])
+        )
+        self.measure(
+            "aggregate get_year_statistics (single year)",
+            lambda: ArchiveStatisticsService.get_year_statistics(years[0])
+        )
+        self.measure(
+            f"legacy loop over {len(years)} years",
+            lambda: [legacy_year_statistics(year) for year in years]
+        )
+        self.measure(
+            f"aggregate get_statistics_for_years ({len(years)})",
+            lambda: ArchiveStatisticsService.get_statistics_for_years(years)
+        )
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from source.services.chunked_upload import EXPIRE_AFTER, ChunkedUploadService
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished chunked uploads that have not received data recently, with their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=EXPIRE_AFTER.total_seconds() / 3600,
+            help="Age in hours after which an unfinished upload expires. Defaults to CHUNKED_UPLOADS['EXPIRE_HOURS']."
+        )
+
+    def handle(self, *args, **options):
+        expired = ChunkedUploadService.expire(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} unfinished upload(s)."))
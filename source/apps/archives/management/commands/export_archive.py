@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from source.services.archive_export import ArchiveExporter
+
+
+class Command(BaseCommand):
+    help = "Stream the archive (editions, pages and metadata) to a JSONL or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(ArchiveExporter.formats), default='jsonl')
+        parser.add_argument('--output', type=Path, help="Output file; defaults to stdout.")
+        parser.add_argument('--year', type=int, action='append', help="Only export these years.")
+        parser.add_argument('--chunk-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        exporter = ArchiveExporter(chunk_size=options['chunk_size'])
+        if options['year']:
+            exporter.queryset = exporter.queryset.filter(archive_year__year__in=options['year'])
+
+        if options['output']:
+            with options['output'].open('w', encoding='utf-8', newline='') as handle:
+                exporter.write(handle, options['format'])
+            self.stderr.write(self.style.SUCCESS(f"Exported archive to {options['output']}"))
+        else:
+            exporter.write(sys.stdout, options['format'])
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from source.services.archive_ingestion import EditionIngestionService, read_csv_manifest, read_jsonl_manifest
+
+
+class Command(BaseCommand):
+    help = (
+        "Import editions with their pages and metadata from a JSONL manifest "
+        "(one edition per line, pages under 'contents') or a CSV manifest "
+        "(one row per page, rows of an edition kept together)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', type=Path)
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        manifest = options['manifest']
+        manifest_format = options['format'] or manifest.suffix.lstrip('.').lower()
+        readers = {'jsonl': read_jsonl_manifest, 'csv': read_csv_manifest}
+        if manifest_format not in readers:
+            raise CommandError(f"Unsupported manifest format: {manifest_format}")
+
+        with manifest.open(encoding='utf-8', newline='') as handle:
+            try:
+                counts = EditionIngestionService.ingest(
+                    readers[manifest_format](handle), batch_size=options['batch_size']
+                )
+            except ValidationError as error:
+                raise CommandError(f"Import aborted, nothing was written: {'; '.join(error.messages)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {counts['editions']} edition(s), {counts['contents']} page(s) and "
+            f"{counts['metadata']} metadata row(s) across {counts['years']} year(s); "
+            f"skipped {counts['skipped']} existing edition(s)."
+        ))
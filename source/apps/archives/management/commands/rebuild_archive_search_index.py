@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.archives.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for archived edition content."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} edition content item(s)."))
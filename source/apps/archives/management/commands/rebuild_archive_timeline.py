@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.archives.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized per-year/per-category archive timeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild_timeline(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} timeline entries."))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archives', '0002_editioncontent_search_index'),
+        ('content', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryTimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(verbose_name='Archive Year')),
+                ('content_type', models.CharField(max_length=50, verbose_name='Content Type')),
+                ('content_count', models.PositiveIntegerField(default=0, verbose_name='Content Count')),
+                ('edition_numbers', models.JSONField(default=list, verbose_name='Edition Numbers')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archive_timeline_entries', to='content.category', verbose_name='Category')),
+            ],
+            options={
+                'verbose_name': 'Category Timeline Entry',
+                'verbose_name_plural': 'Category Timeline Entries',
+                'ordering': ['category', 'year', 'content_type'],
+                'unique_together': {('category', 'year', 'content_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archives', '0003_categorytimelineentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='edition',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, max_length=255, unique=True, verbose_name='Edition Slug'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:58
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archives', '0004_edition_unicode_slug'),
+        ('content', '0008_mediablob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Upload ID')),
+                ('filename', models.CharField(max_length=255, verbose_name='File Name')),
+                ('total_size', models.BigIntegerField(verbose_name='Total Size in Bytes')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Received Bytes')),
+                ('checksum', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 Checksum')),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete')], default='uploading', max_length=20, verbose_name='Status')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Completed At')),
+                ('edition', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='archives.edition', verbose_name='Edition')),
+                ('edition_content', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='archives.editioncontent', verbose_name='Edition Content')),
+                ('media', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to='content.media', verbose_name='Resulting Media')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+            ],
+            options={
+                'verbose_name': 'Chunked Upload',
+                'verbose_name_plural': 'Chunked Uploads',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='archives_ch_status_5f0ce0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archives', '0005_chunkedupload'),
+        ('content', '0008_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='edition',
+            name='scan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='edition_scans', to='content.media', verbose_name='Edition Scan'),
+        ),
+    ]
@@ -1,7 +1,10 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from django.utils.text import slugify
 from source.apps.core.models import TimeStampedModel
+from source.utils.slug_utils import unique_slug
 from source.apps.content.models import Article, Magazine, Media, Category
 
 class ArchiveCategory(TimeStampedModel):
@@ -161,7 +164,7 @@ class Edition(TimeStampedModel):
     )
     edition_number = models.PositiveIntegerField(verbose_name="Edition Number")
     title = models.CharField(max_length=255, verbose_name="Edition Title")
-    slug = models.SlugField(max_length=255, unique=True, verbose_name="Edition Slug")
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True, verbose_name="Edition Slug")
     description = models.TextField(blank=True, verbose_name="Edition Description")
     edition_type = models.CharField(
         max_length=20,
@@ -185,6 +188,14 @@ class Edition(TimeStampedModel):
         verbose_name="Edition Cover"
     )
     is_digitized = models.BooleanField(default=False, verbose_name="Is Digitized")
+    scan = models.ForeignKey(
+        Media,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='edition_scans',
+        verbose_name="Edition Scan"
+    )
     page_count = models.PositiveIntegerField(default=0, verbose_name="Page Count")
     file_size = models.BigIntegerField(default=0, verbose_name="File Size in Bytes")
     primary_category = models.ForeignKey(
@@ -212,7 +223,7 @@ class Edition(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(f"{self.archive_year.year}-{self.edition_number}-{self.title}")
+            self.slug = unique_slug(self, f"{self.archive_year.year}-{self.edition_number}-{self.title}")
         super().save(*args, **kwargs)
         self.archive_year.update_total_editions()
 
@@ -313,3 +324,89 @@ class ArchiveMetadata(TimeStampedModel):
 
     def __str__(self):
         return f"Metadata for {self.edition_content}"
+
+
+class CategoryTimelineEntry(models.Model):
+    """Materialized rollup of archived content per category, year and content type"""
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='archive_timeline_entries',
+        verbose_name="Category"
+    )
+    year = models.PositiveIntegerField(verbose_name="Archive Year")
+    content_type = models.CharField(max_length=50, verbose_name="Content Type")
+    content_count = models.PositiveIntegerField(default=0, verbose_name="Content Count")
+    edition_numbers = models.JSONField(default=list, verbose_name="Edition Numbers")
+
+    class Meta:
+        verbose_name = "Category Timeline Entry"
+        verbose_name_plural = "Category Timeline Entries"
+        ordering = ['category', 'year', 'content_type']
+        unique_together = ['category', 'year', 'content_type']
+
+    def __str__(self):
+        return f"{self.category} - {self.year} - {self.content_type}: {self.content_count}"
+
+
+class ChunkedUpload(TimeStampedModel):
+    """Resumable upload of a large file, received in sequential chunks"""
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, verbose_name="Upload ID")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name="Uploaded By"
+    )
+    filename = models.CharField(max_length=255, verbose_name="File Name")
+    total_size = models.BigIntegerField(verbose_name="Total Size in Bytes")
+    offset = models.BigIntegerField(default=0, verbose_name="Received Bytes")
+    checksum = models.CharField(max_length=64, blank=True, verbose_name="SHA-256 Checksum")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading', verbose_name="Status")
+    edition = models.ForeignKey(
+        Edition,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name="Edition"
+    )
+    edition_content = models.ForeignKey(
+        EditionContent,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name="Edition Content"
+    )
+    media = models.ForeignKey(
+        Media,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name="Resulting Media"
+    )
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name="Completed At")
+
+    class Meta:
+        verbose_name = "Chunked Upload"
+        verbose_name_plural = "Chunked Uploads"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size} bytes)"
+
+    @property
+    def is_complete(self):
+        return self.status == 'complete'
@@ -0,0 +1,168 @@
+"""
+Full-text search index for archived ``EditionContent``.
+
+On SQLite the index is an FTS5 virtual table ranked with bm25; other
+databases fall back to ``DatabaseSearchBackend`` until a dedicated backend
+is configured through ``settings.ARCHIVE_SEARCH_BACKEND``.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils.module_loading import import_string
+
+from source.utils.text_utils import tokenize
+
+from .models import EditionContent
+
+
+class SearchBackend:
+    """Interface for archive search index backends."""
+
+    def index(self, contents: Iterable[EditionContent]) -> None:
+        """Add or refresh index entries for the given contents."""
+        raise NotImplementedError
+
+    def remove(self, content_ids: Iterable[int]) -> None:
+        """Drop index entries for the given content ids."""
+        raise NotImplementedError
+
+    def search(self, query: str, limit: Optional[int] = None,
+               within: Optional[QuerySet] = None) -> List[Tuple[int, float]]:
+        """
+        Return ``(content_id, score)`` pairs, best match first. ``within``
+        restricts matches to an ``EditionContent`` queryset before ``limit``
+        is applied.
+        """
+        raise NotImplementedError
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Re-index every ``EditionContent``. Returns the number of indexed rows."""
+        self.clear()
+        batch, indexed = [], 0
+        for content in EditionContent.objects.only('id', 'title', 'content_preview', 'keywords').iterator(
+            chunk_size=batch_size
+        ):
+            batch.append(content)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            self.index(batch)
+            indexed += len(batch)
+        return indexed
+
+    def clear(self) -> None:
+        """Drop every index entry."""
+        raise NotImplementedError
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """Inverted index stored in an FTS5 virtual table keyed by content id."""
+
+    table = 'archives_editioncontent_fts'
+    # bm25 weights for the title, content_preview and keywords columns.
+    column_weights = (10.0, 1.0, 5.0)
+
+    def index(self, contents: Iterable[EditionContent]) -> None:
+        rows = [
+            (content.pk, ' '.join(tokenize(content.title)),
+             ' '.join(tokenize(content.content_preview)), ' '.join(tokenize(content.keywords)))
+            for content in contents
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, content_preview, keywords) VALUES (%s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, content_ids: Iterable[int]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in content_ids])
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, query: str, limit: Optional[int] = None,
+               within: Optional[QuerySet] = None) -> List[Tuple[int, float]]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Every token must match; each one also matches as a prefix.
+        match = ' AND '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        weights = ', '.join(str(weight) for weight in self.column_weights)
+        sql = (
+            f'SELECT rowid, bm25({self.table}, {weights}) AS score FROM {self.table} '
+            f'WHERE {self.table} MATCH %s ORDER BY score'
+        )
+        params = [match]
+        if within is not None:
+            try:
+                within_sql, within_params = within.order_by().values('pk').query.sql_with_params()
+            except EmptyResultSet:
+                return []
+            sql = sql.replace(' ORDER BY', f' AND rowid IN ({within_sql}) ORDER BY')
+            params.extend(within_params)
+        if limit:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25 is lower-is-better; flip it so higher scores rank first.
+            return [(row[0], -row[1]) for row in cursor.fetchall()]
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Unindexed fallback that matches with ``icontains`` over the source columns."""
+
+    def index(self, contents: Iterable[EditionContent]) -> None:
+        pass
+
+    def remove(self, content_ids: Iterable[int]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        return 0
+
+    def search(self, query: str, limit: Optional[int] = None,
+               within: Optional[QuerySet] = None) -> List[Tuple[int, float]]:
+        if not query:
+            return []
+        contents = EditionContent.objects.all()
+        if within is not None:
+            contents = contents.filter(pk__in=within.order_by().values('pk'))
+        content_ids = contents.filter(
+            Q(title__icontains=query) |
+            Q(content_preview__icontains=query) |
+            Q(keywords__icontains=query)
+        ).order_by('-edition__publication_date').values_list('id', flat=True)
+        if limit:
+            content_ids = content_ids[:limit]
+        return [(content_id, 0.0) for content_id in content_ids]
+
+
+_backend: Optional[SearchBackend] = None
+
+
+def get_search_backend() -> SearchBackend:
+    """Return the configured archive search backend."""
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'ARCHIVE_SEARCH_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif connection.vendor == 'sqlite':
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = DatabaseSearchBackend()
+    return _backend
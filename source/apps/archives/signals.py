@@ -0,0 +1,92 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Edition, EditionContent
+from .search import get_search_backend
+from .timeline import cells_for_links, refresh_timeline
+
+
+@receiver(post_save, sender=EditionContent)
+def index_edition_content(sender, instance, raw=False, **kwargs):
+    """Keep the archive search index in sync with saved content."""
+    if raw:
+        return
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=EditionContent)
+def unindex_edition_content(sender, instance, **kwargs):
+    """Drop deleted content from the archive search index."""
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(pre_save, sender=EditionContent)
+def capture_content_timeline_cells(sender, instance, raw=False, **kwargs):
+    """Remember the timeline cells of content whose edition or type is about to change."""
+    instance._timeline_cells = set()
+    if raw or instance.pk is None:
+        return
+    previous = EditionContent.objects.filter(pk=instance.pk).values('edition_id', 'content_type').first()
+    if previous and (previous['edition_id'], previous['content_type']) != (instance.edition_id, instance.content_type):
+        instance._timeline_cells = cells_for_links(Q(editioncontent_id=instance.pk))
+
+
+@receiver(post_save, sender=EditionContent)
+def refresh_content_timeline(sender, instance, raw=False, **kwargs):
+    cells = getattr(instance, '_timeline_cells', None)
+    if cells:
+        refresh_timeline(cells | cells_for_links(Q(editioncontent_id=instance.pk)))
+
+
+@receiver(pre_delete, sender=EditionContent)
+def capture_deleted_content_timeline_cells(sender, instance, **kwargs):
+    instance._timeline_cells = cells_for_links(Q(editioncontent_id=instance.pk))
+
+
+@receiver(post_delete, sender=EditionContent)
+def refresh_deleted_content_timeline(sender, instance, **kwargs):
+    refresh_timeline(getattr(instance, '_timeline_cells', ()))
+
+
+@receiver(pre_save, sender=Edition)
+def capture_edition_timeline_cells(sender, instance, raw=False, **kwargs):
+    """Remember the timeline cells of an edition that moves to another year or number."""
+    instance._timeline_cells = set()
+    if raw or instance.pk is None:
+        return
+    previous = Edition.objects.filter(pk=instance.pk).values('archive_year_id', 'edition_number').first()
+    if previous and (previous['archive_year_id'], previous['edition_number']) != (
+        instance.archive_year_id, instance.edition_number
+    ):
+        instance._timeline_cells = cells_for_links(Q(editioncontent__edition_id=instance.pk))
+
+
+@receiver(post_save, sender=Edition)
+def refresh_edition_timeline(sender, instance, raw=False, **kwargs):
+    cells = getattr(instance, '_timeline_cells', None)
+    if cells:
+        refresh_timeline(cells | cells_for_links(Q(editioncontent__edition_id=instance.pk)))
+
+
+@receiver(m2m_changed, sender=EditionContent.categories.through)
+def refresh_category_link_timeline(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the timeline rollup in sync when content categories change, from either side."""
+    if reverse:
+        # ``instance`` is a Category and ``pk_set`` holds content ids.
+        scope = Q(category_id=instance.pk)
+        changed = Q(category_id=instance.pk, editioncontent_id__in=pk_set or ())
+    else:
+        scope = Q(editioncontent_id=instance.pk)
+        changed = Q(editioncontent_id=instance.pk, category_id__in=pk_set or ())
+
+    if action == 'pre_clear':
+        instance._timeline_cells = cells_for_links(scope)
+    elif action == 'post_clear':
+        refresh_timeline(getattr(instance, '_timeline_cells', ()))
+    elif action == 'pre_remove':
+        instance._timeline_cells = cells_for_links(changed)
+    elif action == 'post_remove':
+        refresh_timeline(getattr(instance, '_timeline_cells', ()))
+    elif action == 'post_add':
+        refresh_timeline(cells_for_links(changed))
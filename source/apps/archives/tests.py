@@ -1,3 +1,107 @@
-from django.test import TestCase
+import hashlib
+import io
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from source.services import chunked_upload
+from source.services.archive_ingestion import EditionIngestionService, read_csv_manifest, read_jsonl_manifest
+from source.services.chunked_upload import ChunkedUploadService, UploadOffsetMismatch
+
+from .models import ArchiveYear, Edition, EditionContent
+
+PDF = (
+    b"%PDF-1.4\n1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+    b"2 0 obj << /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >> endobj\n"
+    b"3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n4 0 obj << /Type /Page /Parent 2 0 R >> endobj\n%%EOF"
+)
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.enterContext(mock.patch.object(chunked_upload, 'UPLOAD_DIR', Path(media_root.name) / 'chunked_uploads'))
+        self.enterContext(mock.patch.object(chunked_upload, 'MAX_CHUNK_SIZE', 100))
+
+    def _send(self, upload, data, offset):
+        chunk = data[offset:offset + 100]
+        return ChunkedUploadService.append_chunk(upload.upload_id, offset, io.BytesIO(chunk), len(chunk))
+
+    def test_resume_after_offset_mismatch_and_lost_hash_state(self):
+        data = bytes(range(256)) * 2
+        upload = ChunkedUploadService.start('notes.txt', len(data))
+        self._send(upload, data, 0)
+        with self.assertRaises(UploadOffsetMismatch) as raised:
+            self._send(upload, data, 50)
+        self.assertEqual(raised.exception.expected, 100)
+
+        # Another worker, without this one's running hash, receives the rest.
+        chunked_upload._hashers.discard(upload)
+        # The stored file is moved into place under the digest computed while receiving, not hashed again.
+        with mock.patch('source.apps.content.storage.hashlib') as storage_hashlib:
+            for offset in range(100, len(data), 100):
+                upload = self._send(upload, data, offset)
+        storage_hashlib.sha256.assert_not_called()
+
+        self.assertTrue(upload.is_complete)
+        self.assertEqual(upload.checksum, hashlib.sha256(data).hexdigest())
+        with upload.media.file.open('rb') as stored:
+            self.assertEqual(stored.read(), data)
+        self.assertFalse(chunked_upload.part_path(upload).exists())
+
+    def test_only_whole_edition_scans_set_edition_totals(self):
+        archive_year = ArchiveYear.objects.create(year=1990)
+        edition = Edition.objects.create(
+            archive_year=archive_year, edition_number=1, title="First", publication_date=date(1990, 1, 1)
+        )
+        page = EditionContent.objects.create(edition=edition, title="Cover", content_type='article', page_number=1)
+
+        upload = ChunkedUploadService.start('page.pdf', len(PDF), edition_content=page)
+        for offset in range(0, len(PDF), 100):
+            self._send(upload, PDF, offset)
+        edition.refresh_from_db()
+        self.assertEqual((edition.page_count, edition.file_size, edition.scan), (0, 0, None))
+
+        upload = ChunkedUploadService.start('edition.pdf', len(PDF), edition=edition)
+        for offset in range(0, len(PDF), 100):
+            upload = self._send(upload, PDF, offset)
+        edition.refresh_from_db()
+        self.assertEqual((edition.page_count, edition.file_size, edition.scan), (2, len(PDF), upload.media))
+
+
+class ManifestValidationTests(TestCase):
+    CSV_HEADER = "year,edition_number,title,publication_date,page_number,content_title,metadata_language\n"
+
+    def test_csv_manifest_errors_name_the_page_row(self):
+        cases = [
+            (["1990,1,First,1990-01-01,1,Cover,\n", "1990,1,First,1990-01-01,two,Letters,\n"],
+             "Row 3: invalid value for 'page_number'"),
+            (["1990,1,First,1990-01-01,1,Cover,\n", "1990,2,Second,1990-13-01,1,Cover,\n"],
+             "Row 3: invalid value for 'publication_date'"),
+            (["1990,1,First,1990-01-01,1,Cover,\n", "1990,1,First,1990-01-01,,Letters,\n"],
+             "Row 3: page is missing 'page_number'"),
+        ]
+        for rows, message in cases:
+            with self.subTest(message=message), self.assertRaisesMessage(ValidationError, message):
+                EditionIngestionService.ingest(read_csv_manifest([self.CSV_HEADER] + rows))
+        self.assertFalse(Edition.objects.exists())
+
+    def test_jsonl_manifest_errors_name_the_line(self):
+        edition = '{"year": 1990, "edition_number": 1, "title": "First", "publication_date": "1990-01-01"}\n'
+        with self.assertRaisesMessage(ValidationError, "Row 3: invalid JSON"):
+            EditionIngestionService.ingest(read_jsonl_manifest([edition, "\n", "{"]))
+        with self.assertRaisesMessage(ValidationError, "Row 2: edition is missing 'title'"):
+            EditionIngestionService.ingest(read_jsonl_manifest([edition, '{"year": 1990, "edition_number": 2}\n']))
+        self.assertFalse(Edition.objects.exists())
+
+    def test_valid_manifest_is_ingested(self):
+        rows = ["1990,1,First,1990-01-01,1,Cover,ar\n", "1990,1,First,1990-01-01,2,Letters,\n"]
+        counts = EditionIngestionService.ingest(read_csv_manifest([self.CSV_HEADER] + rows))
+        self.assertEqual((counts['editions'], counts['contents'], counts['metadata']), (1, 2, 2))
+        self.assertEqual(ArchiveYear.objects.get(year=1990).total_editions, 1)
@@ -0,0 +1,119 @@
+"""
+Maintenance of the materialized ``CategoryTimelineEntry`` rollup.
+
+The rollup is keyed by (category, year) cells; any change to archived
+content recomputes only the cells it touches with one grouped query.
+"""
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import CategoryTimelineEntry, EditionContent
+
+# (category_id, year)
+Cell = Tuple[int, int]
+
+CategoryLink = EditionContent.categories.through
+
+
+def cells_for_links(link_filter: Q) -> Set[Cell]:
+    """Return the timeline cells covered by the category links matching ``link_filter``."""
+    return set(
+        CategoryLink.objects.filter(link_filter).values_list(
+            'category_id', 'editioncontent__edition__archive_year__year'
+        ).distinct()
+    )
+
+
+def _aggregate(link_filter: Optional[Q]) -> Dict[Tuple[int, int, str], Dict[str, Any]]:
+    links = CategoryLink.objects.all()
+    if link_filter is not None:
+        links = links.filter(link_filter)
+    rows = links.values(
+        'category_id',
+        year=F('editioncontent__edition__archive_year__year'),
+        content_type=F('editioncontent__content_type'),
+        edition_number=F('editioncontent__edition__edition_number'),
+    ).annotate(count=Count('editioncontent_id')).order_by()
+
+    entries = defaultdict(lambda: {'count': 0, 'editions': set()})
+    for row in rows:
+        entry = entries[(row['category_id'], row['year'], row['content_type'])]
+        entry['count'] += row['count']
+        entry['editions'].add(row['edition_number'])
+    return entries
+
+
+def _cells_filter(cells: Iterable[Cell], year_lookup: str) -> Q:
+    years_by_category = defaultdict(set)
+    for category_id, year in cells:
+        years_by_category[category_id].add(year)
+    return reduce(or_, (
+        Q(category_id=category_id, **{f'{year_lookup}__in': years})
+        for category_id, years in years_by_category.items()
+    ))
+
+
+def _build_entries(entries) -> list:
+    return [
+        CategoryTimelineEntry(
+            category_id=category_id,
+            year=year,
+            content_type=content_type,
+            content_count=entry['count'],
+            edition_numbers=sorted(entry['editions']),
+        )
+        for (category_id, year, content_type), entry in entries.items()
+    ]
+
+
+@transaction.atomic
+def refresh_timeline(cells: Iterable[Cell]) -> None:
+    """Recompute the rollup for the given (category_id, year) cells."""
+    cells = {(category_id, year) for category_id, year in cells if category_id and year}
+    if not cells:
+        return
+    entries = _aggregate(_cells_filter(cells, 'editioncontent__edition__archive_year__year'))
+    CategoryTimelineEntry.objects.filter(_cells_filter(cells, 'year')).delete()
+    CategoryTimelineEntry.objects.bulk_create(_build_entries(entries))
+
+
+@transaction.atomic
+def rebuild_timeline(batch_size: int = 1000) -> int:
+    """Rebuild the whole rollup from scratch. Returns the number of entries written."""
+    entries = _build_entries(_aggregate(None))
+    CategoryTimelineEntry.objects.all().delete()
+    CategoryTimelineEntry.objects.bulk_create(entries, batch_size=batch_size)
+    return len(entries)
+
+
+def get_category_timeline(
+    category_id: int,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Read a category timeline from the rollup with a single indexed query."""
+    entries = CategoryTimelineEntry.objects.filter(category_id=category_id)
+    if start_year:
+        entries = entries.filter(year__gte=start_year)
+    if end_year:
+        entries = entries.filter(year__lte=end_year)
+
+    timeline = {}
+    for entry in entries.order_by('year', 'content_type'):
+        year_data = timeline.setdefault(entry.year, {
+            'total_content': 0,
+            'content_types': {},
+            'editions': set()
+        })
+        year_data['total_content'] += entry.content_count
+        year_data['content_types'][entry.content_type] = entry.content_count
+        year_data['editions'].update(entry.edition_numbers)
+
+    for year_data in timeline.values():
+        year_data['editions'] = sorted(year_data['editions'])
+    return timeline
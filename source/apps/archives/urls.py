@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'archives'
+
+urlpatterns = [
+    path('export/', views.export_archive, name='export'),
+    path('uploads/', views.start_upload, name='upload-start'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload-chunk'),
+]
@@ -1,3 +1,90 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
-# Create your views here.
+from source.services.archive_export import ArchiveExporter
+from source.services.chunked_upload import MAX_CHUNK_SIZE, ChunkedUploadService, UploadOffsetMismatch
+
+from .models import ChunkedUpload, Edition, EditionContent
+
+
+@staff_member_required
+@require_GET
+def export_archive(request):
+    """Stream the archive as JSONL or CSV, optionally limited to ?year=... values."""
+    export_format = request.GET.get('format', 'jsonl')
+    if export_format not in ArchiveExporter.formats:
+        return HttpResponseBadRequest("Unsupported export format")
+
+    exporter = ArchiveExporter()
+    years = request.GET.getlist('year')
+    if years:
+        try:
+            exporter.queryset = exporter.queryset.filter(archive_year__year__in=[int(year) for year in years])
+        except ValueError:
+            return HttpResponseBadRequest("Invalid year")
+    return exporter.streaming_response(export_format)
+
+
+def _upload_payload(upload):
+    return {
+        'upload_id': str(upload.upload_id),
+        'filename': upload.filename,
+        'offset': upload.offset,
+        'total_size': upload.total_size,
+        'chunk_size': MAX_CHUNK_SIZE,
+        'status': upload.status,
+        'checksum': upload.checksum,
+    }
+
+
+@staff_member_required
+@require_POST
+def start_upload(request):
+    """Start a resumable upload from ``filename``, ``total_size`` and optional ``edition``/``edition_content`` ids."""
+    try:
+        total_size = int(request.POST.get('total_size', ''))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid total_size")
+    edition = edition_content = None
+    if request.POST.get('edition'):
+        edition = get_object_or_404(Edition, pk=request.POST['edition'])
+    if request.POST.get('edition_content'):
+        edition_content = get_object_or_404(EditionContent, pk=request.POST['edition_content'])
+
+    try:
+        upload = ChunkedUploadService.start(
+            request.POST.get('filename', ''), total_size, edition=edition,
+            edition_content=edition_content, user=request.user
+        )
+    except ValidationError as error:
+        return JsonResponse({'error': '; '.join(error.messages)}, status=400)
+    return JsonResponse(_upload_payload(upload), status=201)
+
+
+@staff_member_required
+@require_http_methods(['GET', 'PUT'])
+def upload_chunk(request, upload_id):
+    """
+    GET reports the received offset so a client can resume. PUT appends the
+    raw request body at the ``Upload-Offset`` header; the body is streamed to
+    disk, never read into memory as a whole.
+    """
+    upload = get_object_or_404(ChunkedUpload, upload_id=upload_id)
+    if request.method == 'GET':
+        return JsonResponse(_upload_payload(upload))
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid Upload-Offset or Content-Length")
+    try:
+        upload = ChunkedUploadService.append_chunk(upload.upload_id, offset, request, length)
+    except UploadOffsetMismatch as error:
+        return JsonResponse({'error': error.messages[0], 'offset': error.expected}, status=409)
+    except ValidationError as error:
+        return JsonResponse({'error': '; '.join(error.messages)}, status=400)
+    return JsonResponse(_upload_payload(upload))
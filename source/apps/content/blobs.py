@@ -0,0 +1,169 @@
+"""
+Reference counting and garbage collection for deduplicated media blobs.
+
+Media files are stored once per distinct content (see ``storage``); each
+``MediaBlob`` counts how many articles, ads, edition scans, edition,
+magazine and year covers and archive category icons use it through any
+``Media`` row. Counts are recomputed for the affected blobs after each
+commit that changes one of those relations. ``gc_media_blobs`` only removes
+blobs that no ``Media`` row points at any more; Media rows themselves,
+attached or not, are never deleted by the collector.
+"""
+import threading
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import Media, MediaBlob
+from .storage import blob_digest
+
+REFERENCE_RELATIONS = (
+    'article_media',
+    'ads_media',
+    'edition_covers',
+    'edition_scans',
+    'magazine_covers',
+    'year_covers',
+    'category_icons',
+)
+
+_pending = threading.local()
+
+
+def register_blob(media: Media) -> Optional[MediaBlob]:
+    """Attach ``media`` to the blob row of its stored file, creating the row on first use."""
+    digest = blob_digest(media.file.name or '')
+    if not digest:
+        return None
+    blob, _ = MediaBlob.objects.get_or_create(
+        digest=digest, defaults={'name': media.file.name, 'size': media.file.storage.size(media.file.name)}
+    )
+    if media.blob_id != blob.pk:
+        Media.objects.filter(pk=media.pk).update(blob=blob)
+        media.blob = blob
+    return blob
+
+
+def reference_counts(blob_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """References per blob across ``REFERENCE_RELATIONS``, one grouped query per relation."""
+    media = Media.objects.filter(blob__isnull=False)
+    if blob_ids is not None:
+        media = media.filter(blob__in=list(blob_ids))
+    counts: Dict[int, int] = {}
+    for relation in REFERENCE_RELATIONS:
+        rows = media.filter(**{f'{relation}__isnull': False}).values('blob_id').annotate(
+            references=Count(relation)
+        ).order_by()
+        for row in rows:
+            counts[row['blob_id']] = counts.get(row['blob_id'], 0) + row['references']
+    return counts
+
+
+def recount_blobs(blob_ids: Iterable[int]) -> int:
+    """Recompute ``ref_count`` for the given blobs. Returns the number of changed blobs."""
+    blob_ids = {blob_id for blob_id in blob_ids if blob_id}
+    if not blob_ids:
+        return 0
+    return _apply_counts(MediaBlob.objects.filter(pk__in=blob_ids), reference_counts(blob_ids))
+
+
+def _apply_counts(blobs, counts: Dict[int, int]) -> int:
+    # ``updated_at`` records when the count last changed, which starts the GC grace period.
+    now = timezone.now()
+    changed = []
+    for blob in blobs.only('pk', 'ref_count').iterator(chunk_size=2000):
+        if blob.ref_count != counts.get(blob.pk, 0):
+            blob.ref_count = counts.get(blob.pk, 0)
+            blob.updated_at = now
+            changed.append(blob)
+    MediaBlob.objects.bulk_update(changed, ['ref_count', 'updated_at'], batch_size=1000)
+    return len(changed)
+
+
+def schedule_recount(media_ids: Iterable[Optional[int]] = (), blob_ids: Iterable[Optional[int]] = ()) -> None:
+    """Recount the given blobs, and those of the given Media rows, once the current transaction commits."""
+    media_ids = {media_id for media_id in media_ids if media_id}
+    blob_ids = {blob_id for blob_id in blob_ids if blob_id}
+    if not media_ids and not blob_ids:
+        return
+    if not hasattr(_pending, 'media_ids'):
+        _pending.media_ids, _pending.blob_ids = set(), set()
+    _pending.media_ids |= media_ids
+    _pending.blob_ids |= blob_ids
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending() -> None:
+    media_ids, _pending.media_ids = getattr(_pending, 'media_ids', set()), set()
+    blob_ids, _pending.blob_ids = getattr(_pending, 'blob_ids', set()), set()
+    if media_ids:
+        blob_ids |= set(Media.objects.filter(pk__in=media_ids).values_list('blob_id', flat=True))
+    recount_blobs(blob_ids)
+
+
+def recount_all() -> int:
+    """Recompute every blob's ``ref_count`` from scratch. Returns the number of changed blobs."""
+    return _apply_counts(MediaBlob.objects.all(), reference_counts())
+
+
+def collect_garbage(grace: timedelta = timedelta(hours=24), dry_run: bool = False) -> Dict[str, int]:
+    """
+    Delete blobs that no Media row has pointed at or named for longer than
+    ``grace``, and their stored files. Reusing a blob's file for a new upload
+    restarts its grace period. ``ref_count`` is refreshed first but does not
+    decide anything: a Media row keeps its blob whether or not it is used.
+    """
+    recount_all()
+    cutoff = timezone.now() - grace
+    orphans = MediaBlob.objects.filter(media_items__isnull=True, updated_at__lt=cutoff)
+    result = {'blobs': 0, 'bytes': 0}
+    storage = Media._meta.get_field('file').storage
+    for blob in orphans.iterator():
+        with transaction.atomic():
+            # Re-check under a row lock: storage touches a blob whose file an upload reuses, and a new
+            # Media row names the file before register_blob links it to the blob.
+            blob = MediaBlob.objects.select_for_update().filter(pk=blob.pk, updated_at__lt=cutoff).first()
+            if blob is None or Media.objects.filter(Q(blob=blob) | Q(file=blob.name)).exists():
+                continue
+            result['blobs'] += 1
+            result['bytes'] += blob.size
+            if dry_run:
+                continue
+            blob.delete()
+            transaction.on_commit(lambda name=blob.name: storage.delete(name))
+    return result
+
+
+def _reference_models() -> Set[type]:
+    return {
+        relation.related_model for relation in Media._meta.related_objects
+        if relation.related_name in REFERENCE_RELATIONS and not relation.many_to_many
+    }
+
+
+def _capture_media_references(sender, instance, raw=False, **kwargs):
+    fields = [field.attname for field in sender._meta.concrete_fields
+              if field.is_relation and field.related_model is Media]
+    instance._previous_media_ids = ()
+    if not raw and instance.pk is not None:
+        instance._previous_media_ids = sender._default_manager.filter(pk=instance.pk).values_list(*fields).first() or ()
+
+
+def _recount_media_references(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    fields = [field.attname for field in sender._meta.concrete_fields
+              if field.is_relation and field.related_model is Media]
+    schedule_recount([getattr(instance, field) for field in fields] + list(getattr(instance, '_previous_media_ids', ())))
+
+
+def connect_reference_signals() -> None:
+    """Keep blob counts current when a model with a Media foreign key is saved or deleted."""
+    for model in _reference_models():
+        pre_save.connect(_capture_media_references, sender=model, dispatch_uid=f'blob-refs-pre-{model._meta.label}')
+        post_save.connect(_recount_media_references, sender=model, dispatch_uid=f'blob-refs-post-{model._meta.label}')
+        post_delete.connect(_recount_media_references, sender=model, dispatch_uid=f'blob-refs-del-{model._meta.label}')
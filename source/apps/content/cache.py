@@ -0,0 +1,164 @@
+"""
+Cache layer for published article listings and single-article lookups.
+
+Listings are stored under generation-stamped keys per scope (all published
+articles, one category or one tag). Invalidating a scope bumps its
+generation, so stale pages simply stop being read and expire on their own.
+"""
+import threading
+from collections import Counter
+from typing import Any, Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Article
+
+MISSING = '__missing__'
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters per cache kind."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, hit: bool) -> None:
+        with self._lock:
+            self._counts[f'{kind}_{"hits" if hit else "misses"}'] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class ArticleCache:
+    """Caches published article pages by category/tag/page and articles by slug."""
+
+    prefix = 'content:articles'
+    tag_cloud_scope = 'tag-cloud'
+
+    def __init__(self, alias: str = 'default', timeout: int = 300, page_size: int = 20):
+        self.alias = alias
+        self.timeout = timeout
+        self.page_size = page_size
+        self.stats = CacheStats()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def category_scope(category_id: int) -> str:
+        return f'category:{category_id}'
+
+    @staticmethod
+    def tag_scope(tag_slug: str) -> str:
+        return f'tag:{tag_slug}'
+
+    @staticmethod
+    def category_tags_scope(category_id: int) -> str:
+        return f'category-tags:{category_id}'
+
+    @staticmethod
+    def issue_scope(magazine_id: int) -> str:
+        return f'issue:{magazine_id}'
+
+    def _generation_key(self, scope: str) -> str:
+        return f'{self.prefix}:generation:{scope}'
+
+    def _generation(self, scope: str) -> int:
+        key = self._generation_key(scope)
+        generation = self.cache.get(key)
+        if generation is None:
+            self.cache.add(key, 1, timeout=None)
+            generation = self.cache.get(key, 1)
+        return generation
+
+    def _slug_key(self, slug: str) -> str:
+        return f'{self.prefix}:slug:{slug}'
+
+    def cached(self, kind: str, scope: str, suffix: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``kind``/``scope``/``suffix``, computing it on a miss."""
+        key = f'{self.prefix}:{kind}:{scope}:{self._generation(scope)}:{suffix}'
+        value = self.cache.get(key)
+        self.stats.record(kind, value is not None)
+        if value is None:
+            value = compute()
+            self.cache.set(key, value, self.timeout)
+        return value
+
+    def published_articles(self, category_id: Optional[int] = None, tag_slug: Optional[str] = None,
+                           page: int = 1) -> List[Article]:
+        """Return one page of published articles, newest first, optionally scoped to a category or tag."""
+        if category_id is not None:
+            scope = self.category_scope(category_id)
+        elif tag_slug is not None:
+            scope = self.tag_scope(tag_slug)
+        else:
+            scope = 'all'
+
+        def fetch():
+            queryset = Article.objects.published().select_related('author').order_by('-published_at', '-created_at')
+            if category_id is not None:
+                queryset = queryset.filter(categories=category_id)
+            elif tag_slug is not None:
+                queryset = queryset.filter(tags__slug=tag_slug)
+            start = (page - 1) * self.page_size
+            return list(queryset[start:start + self.page_size])
+
+        return self.cached('list', scope, str(page), fetch)
+
+    def get_by_slug(self, slug: str) -> Optional[Article]:
+        """Return the published article with this slug, or None."""
+        key = self._slug_key(slug)
+        article = self.cache.get(key)
+        self.stats.record('slug', article is not None)
+        if article is None:
+            article = Article.objects.published().select_related('author').filter(slug=slug).first()
+            self.cache.set(key, article if article is not None else MISSING, self.timeout)
+        return None if article == MISSING else article
+
+    def invalidate_scopes(self, scopes: Iterable[str]) -> None:
+        for scope in set(scopes):
+            key = self._generation_key(scope)
+            self.cache.add(key, 1, timeout=None)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, 2, timeout=None)
+
+    def invalidate_slugs(self, slugs: Iterable[str]) -> None:
+        self.cache.delete_many([self._slug_key(slug) for slug in set(slugs) if slug])
+
+    def invalidate_issues(self, magazine_ids: Iterable[int]) -> None:
+        self.invalidate_scopes([self.issue_scope(magazine_id) for magazine_id in magazine_ids])
+
+    def invalidate_article(self, article: Article, category_ids: Iterable[int] = None,
+                           tag_slugs: Iterable[str] = None, slugs: Iterable[str] = ()) -> None:
+        """Invalidate every listing and lookup the article can appear in."""
+        if category_ids is None:
+            category_ids = article.categories.values_list('id', flat=True)
+        if tag_slugs is None:
+            tag_slugs = article.tags.values_list('slug', flat=True)
+        category_ids = list(category_ids)
+        self.invalidate_scopes(
+            ['all', self.tag_cloud_scope]
+            + [self.category_scope(category_id) for category_id in category_ids]
+            + [self.category_tags_scope(category_id) for category_id in category_ids]
+            + [self.tag_scope(tag_slug) for tag_slug in tag_slugs]
+        )
+        self.invalidate_slugs([article.slug, *slugs])
+
+
+_config = getattr(settings, 'CONTENT_CACHE', {})
+article_cache = ArticleCache(
+    alias=_config.get('ALIAS', 'default'),
+    timeout=_config.get('TIMEOUT', 300),
+    page_size=_config.get('PAGE_SIZE', 20),
+)
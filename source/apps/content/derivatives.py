@@ -0,0 +1,231 @@
+"""
+Resized image variants of ``Media`` files.
+
+Every image gets the sizes and formats the static asset pipeline produces
+(``scripts/optimize/images.js``): four widths in JPEG, PNG and WebP. Variants
+are rendered with Pillow, in a process pool for batches, and stored under
+the SHA-256 of their bytes, so identical renders share one file. Missing
+variants are rendered on first request behind a cache lock, so concurrent
+requests for the same variant render it once. Files of deleted variants are
+removed after commit once no other variant shares them.
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+
+from .models import Media, MediaVariant
+
+SIZES = {
+    'thumbnail': 150,
+    'small': 300,
+    'medium': 600,
+    'large': 1200,
+}
+FORMATS = ('jpg', 'png', 'webp')
+QUALITY = {
+    'jpg': 80,
+    'png': 80,
+    'webp': 75,
+}
+PIL_FORMATS = {
+    'jpg': 'JPEG',
+    'png': 'PNG',
+    'webp': 'WEBP',
+}
+
+_config = getattr(settings, 'MEDIA_DERIVATIVES', {})
+WORKERS = _config.get('WORKERS')
+LOCK_TIMEOUT = _config.get('LOCK_TIMEOUT', 60)
+LOCK_WAIT = _config.get('LOCK_WAIT', 10)
+CACHE_ALIAS = _config.get('CACHE_ALIAS', 'default')
+
+# (size, format)
+Spec = Tuple[str, str]
+# (size, format, data, width, height)
+Rendered = Tuple[str, str, bytes, int, int]
+
+_pending = threading.local()
+
+
+def render_variants(source: bytes, specs: Sequence[Spec]) -> List[Rendered]:
+    """
+    Decode ``source`` once and render each (size, format) spec. Images are
+    never enlarged. Only depends on Pillow, so it can run in a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(source)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    rendered, resized = [], {}
+    for size, variant_format in specs:
+        width = min(SIZES[size], image.width)
+        if width not in resized:
+            resized[width] = image.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS
+            )
+        variant = resized[width]
+        if variant_format == 'jpg' and variant.mode != 'RGB':
+            variant = variant.convert('RGB')
+        elif variant.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            variant = variant.convert('RGBA')
+
+        output = io.BytesIO()
+        options = {'optimize': True} if variant_format == 'png' else {'quality': QUALITY[variant_format]}
+        variant.save(output, PIL_FORMATS[variant_format], **options)
+        rendered.append((size, variant_format, output.getvalue(), variant.width, variant.height))
+    return rendered
+
+
+def variant_path(data: bytes, variant_format: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    return f'derivatives/{digest[:2]}/{digest[2:4]}/{digest}.{variant_format}'
+
+
+def _read_source(media: Media) -> bytes:
+    with media.file.open('rb') as source:
+        return source.read()
+
+
+def _store(media: Media, rendered: Iterable[Rendered]) -> List[MediaVariant]:
+    variants = []
+    for size, variant_format, data, width, height in rendered:
+        path = variant_path(data, variant_format)
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(data))
+        variants.append(MediaVariant(
+            media=media, size=size, format=variant_format, file=path,
+            width=width, height=height, file_size=len(data),
+        ))
+    return MediaVariant.objects.bulk_create(
+        variants,
+        update_conflicts=True,
+        unique_fields=['media', 'size', 'format'],
+        update_fields=['file', 'width', 'height', 'file_size', 'updated_at'],
+    )
+
+
+def schedule_file_cleanup(paths: Iterable[str]) -> None:
+    """Delete the given variant files once the current transaction commits, unless a variant still uses them."""
+    paths = {path for path in paths if path}
+    if not paths:
+        return
+    if not hasattr(_pending, 'paths'):
+        _pending.paths = set()
+    _pending.paths |= paths
+    transaction.on_commit(_delete_unused_files)
+
+
+def _delete_unused_files() -> None:
+    paths, _pending.paths = getattr(_pending, 'paths', set()), set()
+    if not paths:
+        return
+    # Identical renders of other media share a file.
+    used = set(MediaVariant.objects.filter(file__in=paths).values_list('file', flat=True))
+    for path in paths - used:
+        default_storage.delete(path)
+
+
+def all_specs() -> List[Spec]:
+    return [(size, variant_format) for size in SIZES for variant_format in FORMATS]
+
+
+def generate_variants(media_items: Iterable[Media], specs: Optional[Sequence[Spec]] = None,
+                      workers: Optional[int] = WORKERS) -> int:
+    """
+    Render variants for many images in a process pool. Sources are read in
+    this process and only bytes cross the process boundary. Returns the
+    number of variants stored.
+    """
+    specs = list(specs or all_specs())
+    images = (media for media in media_items if media.media_type == 'image')
+    # Submit a bounded window of sources so memory does not grow with the batch.
+    workers = workers or os.cpu_count() or 1
+    window = workers * 2
+    stored = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            jobs = [
+                (media, pool.submit(render_variants, _read_source(media), specs))
+                for media in islice(images, window)
+            ]
+            if not jobs:
+                break
+            for media, future in jobs:
+                stored += len(_store(media, future.result()))
+    return stored
+
+
+def _lock_key(media_id: int, size: str, variant_format: str) -> str:
+    return f'content:media-variant-lock:{media_id}:{size}:{variant_format}'
+
+
+def get_variant(media: Media, size: str, variant_format: str) -> Optional[MediaVariant]:
+    """
+    Return the stored variant, rendering it in this process if it does not
+    exist yet. Only the request that takes the lock renders; the others wait
+    up to ``LOCK_WAIT`` seconds for it and get None if it is still missing.
+    """
+    if size not in SIZES or variant_format not in FORMATS or media.media_type != 'image':
+        return None
+    variant = MediaVariant.objects.filter(media=media, size=size, format=variant_format).first()
+    if variant is not None:
+        return variant
+
+    cache = caches[CACHE_ALIAS]
+    key = _lock_key(media.pk, size, variant_format)
+    if cache.add(key, 1, LOCK_TIMEOUT):
+        try:
+            return _store(media, render_variants(_read_source(media), [(size, variant_format)]))[0]
+        finally:
+            cache.delete(key)
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        variant = MediaVariant.objects.filter(media=media, size=size, format=variant_format).first()
+        if variant is not None:
+            return variant
+    return None
+
+
+def _stored_variants(media: Media) -> Dict[Spec, MediaVariant]:
+    # Reads prefetched variants when the caller used prefetch_related('variants').
+    return {(variant.size, variant.format): variant for variant in media.variants.all()}
+
+
+def variant_url(media: Media, size: str, variant_format: str = 'webp') -> str:
+    """URL of a variant: the stored file if it exists, otherwise the view that renders it."""
+    variant = _stored_variants(media).get((size, variant_format))
+    if variant is not None:
+        return variant.file.url
+    return reverse('content:media-variant', args=[media.pk, size, variant_format])
+
+
+def srcset(media: Media, variant_format: str = 'webp') -> str:
+    """
+    A ``srcset`` value covering every size. Stored variants use their real
+    width; missing ones point at the rendering view with their nominal width.
+    """
+    stored = _stored_variants(media)
+    candidates = {}
+    for size, width in SIZES.items():
+        variant = stored.get((size, variant_format))
+        if variant is not None:
+            candidates.setdefault(variant.width, variant.file.url)
+        else:
+            candidates.setdefault(width, reverse('content:media-variant', args=[media.pk, size, variant_format]))
+    return ', '.join(f'{url} {width}w' for width, url in sorted(candidates.items()))
@@ -0,0 +1,72 @@
+"""
+Assembly of complete magazine issues.
+
+An issue is the magazine with its cover and every member article together
+with the article's author, categories, tags and media, loaded in a fixed
+number of queries. Assembled issues are cached per magazine until the
+magazine, its cover or one of its articles changes.
+"""
+from typing import Any, Dict, List
+
+from django.db.models import F, Prefetch
+
+from .cache import ArticleCache, article_cache
+from .models import Article, Category, Magazine
+
+MagazineArticle = Magazine.articles.through
+
+
+def issue_articles(magazine_id: int):
+    """Member articles in table-of-contents order, with every relation an issue page renders."""
+    return Article.objects.filter(magazine_articles=magazine_id).select_related('author').prefetch_related(
+        Prefetch('categories', queryset=Category.objects.order_by('name')),
+        'tags',
+        'media',
+    ).order_by(F('published_at').asc(nulls_last=True), 'created_at', 'pk')
+
+
+def table_of_contents(articles: List[Article]) -> List[Dict[str, Any]]:
+    return [
+        {
+            'position': position,
+            'article_id': article.pk,
+            'title': article.title,
+            'slug': article.slug,
+            'author': (article.author.get_full_name() or article.author.get_username()) if article.author else '',
+            'categories': [category.name for category in article.categories.all()],
+            'published_at': article.published_at,
+        }
+        for position, article in enumerate(articles, start=1)
+    ]
+
+
+def assemble_issue(magazine_id: int) -> Dict[str, Any]:
+    """
+    Load a complete issue in five queries: the magazine with its cover, the
+    articles with their authors, and one query each for categories, tags and
+    media.
+    """
+    magazine = Magazine.objects.select_related('cover_image').get(pk=magazine_id)
+    articles = list(issue_articles(magazine_id))
+    return {
+        'magazine': magazine,
+        'articles': articles,
+        'table_of_contents': table_of_contents(articles),
+    }
+
+
+def get_issue(magazine_id: int) -> Dict[str, Any]:
+    """Return the assembled issue from the cache, assembling it on a miss."""
+    return article_cache.cached(
+        'issue', ArticleCache.issue_scope(magazine_id), 'graph', lambda: assemble_issue(magazine_id)
+    )
+
+
+def magazine_ids_for_articles(article_ids) -> List[int]:
+    return list(
+        MagazineArticle.objects.filter(article_id__in=article_ids).values_list('magazine_id', flat=True).distinct()
+    )
+
+
+def invalidate_issues_for_articles(article_ids) -> None:
+    article_cache.invalidate_issues(magazine_ids_for_articles(article_ids))
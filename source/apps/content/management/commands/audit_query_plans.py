@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from source.apps.content.utils import manager_query_plan_cases
+from source.apps.core.utils import explain_query_plan, is_full_scan
+
+
+class Command(BaseCommand):
+    help = "Print the query plan of each content manager listing query and fail on full table scans."
+
+    def handle(self, *args, **options):
+        offenders = []
+        for label, queryset in manager_query_plan_cases():
+            self.stdout.write(label)
+            for line in explain_query_plan(queryset):
+                full_scan = is_full_scan(line)
+                if full_scan:
+                    offenders.append(label)
+                self.stdout.write(f"    {line}{'  <-- full scan' if full_scan else ''}")
+
+        if offenders:
+            raise CommandError(f"Full table scans in: {', '.join(sorted(set(offenders)))}")
+        self.stdout.write(self.style.SUCCESS("No full table scans."))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from source.apps.content.blobs import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount references to deduplicated media blobs and delete the blobs "
+        "and stored files that no Media row has pointed at for longer than "
+        "the grace period. Media rows are never deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24)
+        parser.add_argument('--dry-run', action='store_true', help="Report orphaned blobs without deleting them.")
+
+    def handle(self, *args, **options):
+        result = collect_garbage(timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['blobs']} blob(s) ({result['bytes']} bytes)."
+        ))
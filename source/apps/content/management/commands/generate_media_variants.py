@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.content.derivatives import FORMATS, SIZES, generate_variants
+from source.apps.content.models import Media
+
+
+class Command(BaseCommand):
+    help = (
+        "Render resized variants of Media images in a process pool. By default "
+        "only images without any variant are rendered."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Re-render images that already have variants.")
+        parser.add_argument('--size', action='append', choices=list(SIZES), help="Limit to these sizes.")
+        parser.add_argument('--format', action='append', choices=list(FORMATS), help="Limit to these formats.")
+        parser.add_argument('--workers', type=int, help="Worker processes, defaults to MEDIA_DERIVATIVES['WORKERS'].")
+
+    def handle(self, *args, **options):
+        media_items = Media.objects.images().order_by('pk')
+        if not options['all']:
+            media_items = media_items.filter(variants__isnull=True)
+        specs = [
+            (size, variant_format)
+            for size in options['size'] or SIZES
+            for variant_format in options['format'] or FORMATS
+        ]
+        kwargs = {'workers': options['workers']} if options['workers'] else {}
+        stored = generate_variants(media_items.iterator(), specs, **kwargs)
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} media variant(s)."))
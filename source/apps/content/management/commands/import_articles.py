@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from source.services.article_import import ArticleImportService, read_csv_articles, read_jsonl_articles
+
+
+class Command(BaseCommand):
+    help = (
+        "Import articles from a JSONL file (one article per line) or a CSV file "
+        "(one row per article, categories and tags separated by ';'). Authors "
+        "are matched by 'author_email' and categories by slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', type=Path)
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        source = options['source']
+        source_format = options['format'] or source.suffix.lstrip('.').lower()
+        readers = {'jsonl': read_jsonl_articles, 'csv': read_csv_articles}
+        if source_format not in readers:
+            raise CommandError(f"Unsupported import format: {source_format}")
+
+        with source.open(encoding='utf-8', newline='') as handle:
+            try:
+                counts = ArticleImportService.import_articles(
+                    readers[source_format](handle), batch_size=options['batch_size']
+                )
+            except ValidationError as error:
+                raise CommandError(f"Import aborted, nothing was written: {'; '.join(error.messages)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {counts['articles']} article(s) and {counts['tags']} tag(s); "
+            f"skipped {counts['skipped']} existing article(s). Run rebuild_related_articles "
+            f"to include them in related articles."
+        ))
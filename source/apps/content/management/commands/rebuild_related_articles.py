@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.content.related import rebuild_related, refresh_deferred
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the precomputed related articles of every published article. "
+        "Saves refresh neighbourhoods incrementally; run this after bulk imports "
+        "or changes made with queryset updates, and with --deferred periodically "
+        "to refresh the articles saves left for later."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-terms', action='store_true', help="Score by shared categories and tags only.")
+        parser.add_argument('--deferred', action='store_true', help="Only refresh the articles saves deferred.")
+
+    def handle(self, *args, **options):
+        rebuild = refresh_deferred if options['deferred'] else rebuild_related
+        written = rebuild(use_terms=not options['no_terms'])
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} related article rows."))
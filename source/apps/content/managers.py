@@ -43,6 +43,11 @@ class ArticleQuerySet(models.QuerySet):
     def by_author(self, author):
         return self.filter(author=author)
 
+    def tagged(self, tags, match='any'):
+        """Articles tagged with any or all of the given tag slugs."""
+        from .tags import filter_by_tags
+        return filter_by_tags(self, tags, match)
+
 
 class ArticleManager(models.Manager):
     def get_queryset(self):
@@ -54,6 +59,9 @@ class ArticleManager(models.Manager):
     def by_author(self, author):
         return self.get_queryset().by_author(author)
 
+    def tagged(self, tags, match='any'):
+        return self.get_queryset().tagged(tags, match)
+
 
 
 class MagazineQuerySet(models.QuerySet):
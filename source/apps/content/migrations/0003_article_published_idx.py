@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-published_at", "-created_at"],
+                name="article_published_idx",
+            ),
+        ),
+    ]
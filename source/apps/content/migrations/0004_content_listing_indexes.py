@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0003_article_published_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="is_active",
+            field=models.BooleanField(default=True, verbose_name="Is Active"),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["author", "-published_at", "-created_at"],
+                name="article_author_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["name"],
+                name="category_active_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="magazine",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-published_at", "-created_at"],
+                name="magazine_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(
+                fields=["media_type", "-created_at"],
+                name="media_type_created_idx",
+            ),
+        ),
+    ]
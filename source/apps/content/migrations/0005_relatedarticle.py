@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0004_content_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedArticle",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("score", models.FloatField(default=0, verbose_name="Similarity Score")),
+                ("rank", models.PositiveSmallIntegerField(verbose_name="Rank")),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_links",
+                        to="content.article",
+                        verbose_name="Article",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_to_links",
+                        to="content.article",
+                        verbose_name="Related Article",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Related Article",
+                "verbose_name_plural": "Related Articles",
+                "ordering": ["article", "rank"],
+                "indexes": [models.Index(fields=["article", "rank"], name="related_article_rank_idx")],
+                "unique_together": {("article", "related")},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0005_relatedarticle"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="article",
+            name="slug",
+            field=models.SlugField(allow_unicode=True, max_length=255, unique=True, verbose_name="Slug"),
+        ),
+        migrations.AlterField(
+            model_name="category",
+            name="slug",
+            field=models.SlugField(allow_unicode=True, max_length=255, unique=True, verbose_name="Category Slug"),
+        ),
+        migrations.AlterField(
+            model_name="magazine",
+            name="slug",
+            field=models.SlugField(allow_unicode=True, max_length=255, unique=True, verbose_name="Magazine Slug"),
+        ),
+    ]
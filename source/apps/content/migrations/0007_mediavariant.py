@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0006_unicode_slugs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaVariant",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Created At")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Updated At")),
+                (
+                    "size",
+                    models.CharField(
+                        choices=[("thumbnail", "Thumbnail"), ("small", "Small"), ("medium", "Medium"), ("large", "Large")],
+                        max_length=20,
+                        verbose_name="Size",
+                    ),
+                ),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("jpg", "JPEG"), ("png", "PNG"), ("webp", "WebP")], max_length=10, verbose_name="Format"
+                    ),
+                ),
+                ("file", models.FileField(max_length=255, upload_to="", verbose_name="Variant File")),
+                ("width", models.PositiveIntegerField(verbose_name="Width")),
+                ("height", models.PositiveIntegerField(verbose_name="Height")),
+                ("file_size", models.PositiveIntegerField(default=0, verbose_name="File Size (bytes)")),
+                (
+                    "media",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="variants",
+                        to="content.media",
+                        verbose_name="Media",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Media Variant",
+                "verbose_name_plural": "Media Variants",
+                "ordering": ["media", "width"],
+                "unique_together": {("media", "size", "format")},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:26
+
+import django.db.models.deletion
+import source.apps.content.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0007_mediavariant"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Created At")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Updated At")),
+                ("digest", models.CharField(max_length=64, unique=True, verbose_name="SHA-256 Digest")),
+                ("name", models.CharField(max_length=255, verbose_name="Stored File Name")),
+                ("size", models.BigIntegerField(default=0, verbose_name="Size (bytes)")),
+                ("ref_count", models.PositiveIntegerField(default=0, verbose_name="Reference Count")),
+            ],
+            options={
+                "verbose_name": "Media Blob",
+                "verbose_name_plural": "Media Blobs",
+                "indexes": [models.Index(fields=["ref_count", "updated_at"], name="media_blob_ref_count_idx")],
+            },
+        ),
+        migrations.AlterField(
+            model_name="media",
+            name="file",
+            field=models.FileField(
+                storage=source.apps.content.storage.get_media_storage,
+                upload_to="media/%Y/%m/%d/",
+                verbose_name="Media File",
+            ),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="media_items",
+                to="content.mediablob",
+                verbose_name="Blob",
+            ),
+        ),
+    ]
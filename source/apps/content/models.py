@@ -1,15 +1,16 @@
 from django.db import models
-from django.utils.text import slugify
 from django.utils import timezone
 from source.apps.core.models import TimeStampedModel
+from source.utils.slug_utils import unique_slug
 from django.conf import settings
 from .managers import CategoryManager, MediaManager, ArticleManager, MagazineManager
+from .storage import get_media_storage
 from taggit.managers import TaggableManager
 
 
 class Category(TimeStampedModel):
     name = models.CharField(max_length=255, unique=True, verbose_name="Category Name")
-    slug = models.SlugField(max_length=255, unique=True, verbose_name="Category Slug")
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True, verbose_name="Category Slug")
     description = models.TextField(blank=True, verbose_name="Category Description")
     is_active = models.BooleanField(default=True, verbose_name="Is Active")
 
@@ -19,13 +20,16 @@ class Category(TimeStampedModel):
         verbose_name = "Category"
         verbose_name_plural = "Categories"
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name"], condition=models.Q(is_active=True), name="category_active_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = unique_slug(self, self.name)
         super().save(*args, **kwargs)
         
     def get_related_articles(self):
@@ -58,6 +62,23 @@ class Category(TimeStampedModel):
         category.delete()
 
 
+class MediaBlob(TimeStampedModel):
+    digest = models.CharField(max_length=64, unique=True, verbose_name="SHA-256 Digest")
+    name = models.CharField(max_length=255, verbose_name="Stored File Name")
+    size = models.BigIntegerField(default=0, verbose_name="Size (bytes)")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Reference Count")
+
+    class Meta:
+        verbose_name = "Media Blob"
+        verbose_name_plural = "Media Blobs"
+        indexes = [
+            models.Index(fields=["ref_count", "updated_at"], name="media_blob_ref_count_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+
 class Media(TimeStampedModel):
     MEDIA_TYPE_CHOICES = [
         ("image", "Image"),
@@ -65,7 +86,11 @@ class Media(TimeStampedModel):
         ("document", "Document"),
     ]
 
-    file = models.FileField(upload_to="media/%Y/%m/%d/", verbose_name="Media File")
+    file = models.FileField(upload_to="media/%Y/%m/%d/", storage=get_media_storage, verbose_name="Media File")
+    blob = models.ForeignKey(
+        MediaBlob, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="media_items",
+        verbose_name="Blob"
+    )
     media_type = models.CharField(max_length=50, choices=MEDIA_TYPE_CHOICES, verbose_name="Media Type")
     alt_text = models.CharField(max_length=255, blank=True, verbose_name="Alt Text")
 
@@ -75,6 +100,9 @@ class Media(TimeStampedModel):
         verbose_name = "Media"
         verbose_name_plural = "Media"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["media_type", "-created_at"], name="media_type_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.media_type} - {self.file.name}"
@@ -90,9 +118,40 @@ class Media(TimeStampedModel):
         return cls.objects.all()
 
 
+class MediaVariant(TimeStampedModel):
+    SIZE_CHOICES = [
+        ("thumbnail", "Thumbnail"),
+        ("small", "Small"),
+        ("medium", "Medium"),
+        ("large", "Large"),
+    ]
+    FORMAT_CHOICES = [
+        ("jpg", "JPEG"),
+        ("png", "PNG"),
+        ("webp", "WebP"),
+    ]
+
+    media = models.ForeignKey(Media, on_delete=models.CASCADE, related_name="variants", verbose_name="Media")
+    size = models.CharField(max_length=20, choices=SIZE_CHOICES, verbose_name="Size")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name="Format")
+    file = models.FileField(max_length=255, verbose_name="Variant File")
+    width = models.PositiveIntegerField(verbose_name="Width")
+    height = models.PositiveIntegerField(verbose_name="Height")
+    file_size = models.PositiveIntegerField(default=0, verbose_name="File Size (bytes)")
+
+    class Meta:
+        verbose_name = "Media Variant"
+        verbose_name_plural = "Media Variants"
+        ordering = ["media", "width"]
+        unique_together = ["media", "size", "format"]
+
+    def __str__(self):
+        return f"{self.media} ({self.size} {self.format})"
+
+
 class Article(TimeStampedModel):
     title = models.CharField(max_length=255, verbose_name="Title")
-    slug = models.SlugField(max_length=255, unique=True, verbose_name="Slug")
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True, verbose_name="Slug")
     content = models.TextField(verbose_name="Content")
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="article_author", verbose_name="Author"
@@ -109,13 +168,21 @@ class Article(TimeStampedModel):
         verbose_name = "Article"
         verbose_name_plural = "Articles"
         ordering = ["-published_at", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["-published_at", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="article_published_idx",
+            ),
+            models.Index(fields=["author", "-published_at", "-created_at"], name="article_author_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.title)
+            self.slug = unique_slug(self, self.title)
         super().save(*args, **kwargs)
 
     def publish(self):
@@ -160,6 +227,24 @@ class Article(TimeStampedModel):
     def get_all_articles(cls):
         return cls.objects.all()
 
+    def get_related(self, n=5):
+        """Return up to ``n`` precomputed related articles, best match first."""
+        return Article.objects.filter(related_to_links__article=self).order_by("related_to_links__rank")[:n]
+
+    @classmethod
+    def get_published_articles(cls, category=None, tag=None, page=1):
+        """Return a cached page of published articles, optionally for one category or tag slug."""
+        from .cache import article_cache
+        return article_cache.published_articles(
+            category_id=category.pk if category is not None else None, tag_slug=tag, page=page
+        )
+
+    @classmethod
+    def get_published_by_slug(cls, slug):
+        """Return the cached published article with this slug, or None."""
+        from .cache import article_cache
+        return article_cache.get_by_slug(slug)
+
     @classmethod
     def update_article(cls, article_id, title=None, content=None):
         article = cls.objects.get(id=article_id)
@@ -176,9 +261,32 @@ class Article(TimeStampedModel):
         article.delete()
 
 
+class RelatedArticle(models.Model):
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="related_links", verbose_name="Article"
+    )
+    related = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="related_to_links", verbose_name="Related Article"
+    )
+    score = models.FloatField(default=0, verbose_name="Similarity Score")
+    rank = models.PositiveSmallIntegerField(verbose_name="Rank")
+
+    class Meta:
+        verbose_name = "Related Article"
+        verbose_name_plural = "Related Articles"
+        ordering = ["article", "rank"]
+        unique_together = ["article", "related"]
+        indexes = [
+            models.Index(fields=["article", "rank"], name="related_article_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.article} -> {self.related} ({self.score:.2f})"
+
+
 class Magazine(TimeStampedModel):
     title = models.CharField(max_length=255, verbose_name="Magazine Title")
-    slug = models.SlugField(max_length=255, unique=True, verbose_name="Magazine Slug")
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True, verbose_name="Magazine Slug")
     description = models.TextField(blank=True, verbose_name="Description")
     articles = models.ManyToManyField(Article, related_name="magazine_articles", verbose_name="Articles")
     cover_image = models.ForeignKey(
@@ -193,13 +301,20 @@ class Magazine(TimeStampedModel):
         verbose_name = "Magazine"
         verbose_name_plural = "Magazines"
         ordering = ["-published_at", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["-published_at", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="magazine_published_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.title)
+            self.slug = unique_slug(self, self.title)
         super().save(*args, **kwargs)
 
     def publish(self):
@@ -220,6 +335,11 @@ class Magazine(TimeStampedModel):
         """Retrieve all articles associated with this magazine."""
         return self.articles.all()
 
+    def get_issue(self):
+        """Return the cached issue: the magazine, its articles with their relations and the table of contents."""
+        from .issues import get_issue
+        return get_issue(self.pk)
+
     @classmethod
     def create_magazine(cls, title, description='', cover_image=None):
         magazine = cls(title=title, description=description, cover_image=cover_image)
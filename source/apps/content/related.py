@@ -0,0 +1,199 @@
+"""
+Precomputed related articles.
+
+Published articles are scored against each other by shared categories and
+tags, optionally boosted by term overlap between their bodies, and the best
+``TOP_N`` neighbours of each article are stored as ``RelatedArticle`` rows.
+Saving or publishing an article refreshes only that article and the articles
+whose neighbourhoods it can enter or leave, once per transaction; beyond
+``REFRESH_LIMIT`` of the latter, the refresh is deferred to the
+``rebuild_related_articles --deferred`` command.
+"""
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Min
+
+from source.utils.text_utils import tokenize
+
+from .models import Article, RelatedArticle
+from .tags import tagged_articles
+
+CATEGORY_WEIGHT = 1.0
+TAG_WEIGHT = 2.0
+TERM_WEIGHT = 3.0
+MIN_TERM_LENGTH = 3
+
+_config = getattr(settings, 'RELATED_ARTICLES', {})
+TOP_N = _config.get('TOP_N', 10)
+USE_TERMS = _config.get('USE_TERMS', True)
+TERM_CANDIDATES = _config.get('TERM_CANDIDATES', 100)
+# Articles a change lifts into the neighbourhood of that are refreshed on commit; the rest are deferred.
+REFRESH_LIMIT = _config.get('REFRESH_LIMIT', 20)
+CACHE_ALIAS = _config.get('CACHE_ALIAS', 'default')
+DEFERRED_KEY = 'content:related-deferred'
+
+CategoryLink = Article.categories.through
+
+_pending = threading.local()
+
+
+def _terms(text: str) -> Set[str]:
+    return {token for token in tokenize(text) if len(token) >= MIN_TERM_LENGTH}
+
+
+def score_candidates(article: Article, use_terms: bool = USE_TERMS,
+                     limit: Optional[int] = TOP_N) -> List[Tuple[int, float]]:
+    """
+    Return up to ``limit`` (all when None) ``(article_id, score)`` pairs for
+    published articles similar to ``article``.
+    """
+    published = Article.objects.published().values('pk')
+    scores: Dict[int, float] = Counter()
+
+    shared_categories = CategoryLink.objects.filter(
+        category_id__in=CategoryLink.objects.filter(article_id=article.pk).values('category_id'),
+        article_id__in=published,
+    ).exclude(article_id=article.pk).values('article_id').annotate(shared=Count('category_id')).order_by()
+    for row in shared_categories:
+        scores[row['article_id']] += CATEGORY_WEIGHT * row['shared']
+
+    shared_tags = tagged_articles().filter(
+        tag_id__in=tagged_articles().filter(object_id=article.pk).values('tag_id'),
+        object_id__in=published,
+    ).exclude(object_id=article.pk).values('object_id').annotate(shared=Count('tag_id')).order_by()
+    for row in shared_tags:
+        scores[row['object_id']] += TAG_WEIGHT * row['shared']
+
+    if use_terms and scores:
+        terms = _terms(article.content)
+        candidates = sorted(scores, key=lambda pk: (-scores[pk], -pk))[:TERM_CANDIDATES]
+        if terms:
+            for pk, content in Article.objects.filter(pk__in=candidates).values_list('pk', 'content'):
+                other = _terms(content)
+                if other:
+                    scores[pk] += TERM_WEIGHT * len(terms & other) / len(terms | other)
+
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+
+
+def _neighbour_ids(article_id: int) -> Set[int]:
+    """Articles whose stored neighbours may change when ``article_id`` changes."""
+    related_from = set(RelatedArticle.objects.filter(related_id=article_id).values_list('article_id', flat=True))
+    related_to = set(RelatedArticle.objects.filter(article_id=article_id).values_list('related_id', flat=True))
+    return related_from | related_to
+
+
+def _outranked_ids(article: Article, use_terms: bool = USE_TERMS) -> List[int]:
+    """
+    Articles sharing a category or tag with ``article`` that it now enters
+    the neighbourhood of, best match first: those with fewer than ``TOP_N``
+    stored neighbours or whose lowest stored score is below their score with
+    ``article``. Ties are left alone, so a category-only match does not
+    reach every article of the category.
+    """
+    scores = score_candidates(article, use_terms, limit=None)
+    candidate_ids = [pk for pk, _ in scores]
+    stored = {}
+    for start in range(0, len(candidate_ids), 500):
+        stored.update(
+            (row['article_id'], (row['kept'], row['lowest']))
+            for row in RelatedArticle.objects.filter(article_id__in=candidate_ids[start:start + 500]).values(
+                'article_id'
+            ).annotate(kept=Count('pk'), lowest=Min('score')).order_by()
+        )
+    return [
+        pk for pk, score in scores
+        if pk not in stored or stored[pk][0] < TOP_N or stored[pk][1] < score
+    ]
+
+
+def defer_refresh(article_ids: Iterable[int]) -> None:
+    """Leave articles for ``refresh_deferred``, run by ``rebuild_related_articles --deferred``."""
+    article_ids = set(article_ids)
+    if article_ids:
+        cache = caches[CACHE_ALIAS]
+        cache.set(DEFERRED_KEY, set(cache.get(DEFERRED_KEY) or ()) | article_ids, None)
+
+
+def refresh_deferred(use_terms: bool = USE_TERMS) -> int:
+    """
+    Refresh the articles left by ``defer_refresh``. Returns the number of
+    rows written. Ids deferred while this runs are kept for the next run.
+    """
+    cache = caches[CACHE_ALIAS]
+    article_ids = sorted(cache.get(DEFERRED_KEY) or ())
+    cache.delete(DEFERRED_KEY)
+    written = 0
+    for start in range(0, len(article_ids), 500):
+        written += refresh_related(article_ids[start:start + 500], use_terms)
+    return written
+
+
+@transaction.atomic
+def refresh_related(article_ids: Iterable[int], use_terms: bool = USE_TERMS) -> int:
+    """Recompute stored neighbours for the given articles. Returns the number of rows written."""
+    article_ids = set(article_ids)
+    if not article_ids:
+        return 0
+    RelatedArticle.objects.filter(article_id__in=article_ids).delete()
+    rows = []
+    for article in Article.objects.published().filter(pk__in=article_ids).only('pk', 'content'):
+        rows.extend(
+            RelatedArticle(article_id=article.pk, related_id=related_id, score=score, rank=rank)
+            for rank, (related_id, score) in enumerate(score_candidates(article, use_terms), start=1)
+        )
+    RelatedArticle.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_article(article_id: int, use_terms: bool = USE_TERMS) -> int:
+    """
+    Refresh an article and every article it may have entered or left the
+    neighbourhood of: its previous and new neighbours, the articles that
+    listed it, and the articles sharing a category or tag with it that it now
+    outranks a stored neighbour of. Only the best ``REFRESH_LIMIT`` of the
+    latter are refreshed here; the rest are deferred to the batch command.
+    """
+    affected = {article_id} | _neighbour_ids(article_id)
+    refresh_related([article_id], use_terms)
+    affected |= _neighbour_ids(article_id)
+    article = Article.objects.published().filter(pk=article_id).only('pk', 'content').first()
+    if article is not None:
+        outranked = _outranked_ids(article, use_terms)
+        affected.update(outranked[:REFRESH_LIMIT])
+        defer_refresh(set(outranked[REFRESH_LIMIT:]) - affected)
+    return refresh_related(affected - {article_id}, use_terms)
+
+
+def schedule_refresh(article_id: int) -> None:
+    """
+    Refresh ``article_id`` once the current transaction commits. The first
+    commit callback refreshes every pending article, so a save followed by
+    category and tag changes costs one refresh.
+    """
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids.add(article_id)
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending() -> None:
+    pending, _pending.ids = getattr(_pending, 'ids', set()), set()
+    for article_id in pending:
+        refresh_article(article_id)
+
+
+def rebuild_related(use_terms: bool = USE_TERMS) -> int:
+    """Recompute neighbours for every published article. Returns the number of rows written."""
+    caches[CACHE_ALIAS].delete(DEFERRED_KEY)
+    RelatedArticle.objects.exclude(article__in=Article.objects.published()).delete()
+    written = 0
+    article_ids = list(Article.objects.published().values_list('pk', flat=True))
+    for start in range(0, len(article_ids), 500):
+        written += refresh_related(article_ids[start:start + 500], use_terms)
+    return written
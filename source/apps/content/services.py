@@ -1,5 +1,7 @@
 from .models import Category, Article, Media, Magazine
 from .utils import validate_article_data
+from . import issues as article_issues
+from . import tags as article_tags
 
 class CategoryService:
     @staticmethod
@@ -24,10 +26,35 @@ class ArticleService:
         validate_article_data(title, content)
         return Article.create_article(title, content, author, categories, tags)
 
+    @staticmethod
+    def bulk_create_articles(entries, batch_size=500):
+        from source.services.article_import import ArticleImportService
+        return ArticleImportService.import_articles(entries, batch_size)
+
     @staticmethod
     def get_all_articles():
         return Article.get_all_articles()
 
+    @staticmethod
+    def get_published_articles(category=None, tag=None, page=1):
+        return Article.get_published_articles(category, tag, page)
+
+    @staticmethod
+    def get_published_by_slug(slug):
+        return Article.get_published_by_slug(slug)
+
+    @staticmethod
+    def get_articles_by_tags(tags, match='any'):
+        return Article.objects.published().tagged(tags, match)
+
+    @staticmethod
+    def get_tag_cloud(limit=50):
+        return article_tags.tag_cloud(limit)
+
+    @staticmethod
+    def get_category_tag_counts(category_id):
+        return article_tags.category_tag_counts(category_id)
+
     @staticmethod
     def update_article(article_id, title=None, content=None):
         return Article.update_article(article_id, title, content)
@@ -54,6 +81,10 @@ class MagazineService:
     def get_all_magazines():
         return Magazine.get_all_magazines()
 
+    @staticmethod
+    def get_issue(magazine_id):
+        return article_issues.get_issue(magazine_id)
+
     @staticmethod
     def update_magazine(magazine_id, title=None, description=None):
         return Magazine.update_magazine(magazine_id, title, description)
@@ -0,0 +1,251 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import blobs, derivatives, issues, related
+from .cache import ArticleCache, article_cache
+from .models import Article, Category, Magazine, Media, MediaVariant
+
+
+@receiver(pre_save, sender=Article)
+def capture_article_state(sender, instance, raw=False, **kwargs):
+    """Remember whether the article was published, and under which slug, before saving."""
+    previous = None
+    if not raw and instance.pk is not None:
+        previous = Article.objects.filter(pk=instance.pk).values('is_published', 'slug').first()
+    instance._previous_state = previous
+
+
+@receiver(post_save, sender=Article)
+def invalidate_saved_article(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    was_published = bool(previous and previous['is_published'])
+    if instance.is_published or was_published:
+        article_cache.invalidate_article(instance, slugs=[previous['slug']] if previous else [])
+
+
+@receiver(pre_delete, sender=Article)
+def capture_deleted_article_relations(sender, instance, **kwargs):
+    # Relations are removed before post_delete fires, so read them now.
+    instance._cached_relations = (
+        list(instance.categories.values_list('id', flat=True)),
+        list(instance.tags.values_list('slug', flat=True)),
+    )
+
+
+@receiver(post_delete, sender=Article)
+def invalidate_deleted_article(sender, instance, **kwargs):
+    category_ids, tag_slugs = getattr(instance, '_cached_relations', ([], []))
+    article_cache.invalidate_article(instance, category_ids=category_ids, tag_slugs=tag_slugs)
+
+
+@receiver(m2m_changed, sender=Article.categories.through)
+def invalidate_article_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate category listings when article/category links change, from either side."""
+    if reverse:
+        # ``instance`` is a Category.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            article_cache.invalidate_scopes([
+                ArticleCache.category_scope(instance.pk), ArticleCache.category_tags_scope(instance.pk)
+            ])
+        return
+
+    if not instance.is_published:
+        return
+    if action == 'pre_clear':
+        instance._cleared_category_ids = list(instance.categories.values_list('id', flat=True))
+        return
+    if action == 'post_clear':
+        category_ids = getattr(instance, '_cleared_category_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        category_ids = pk_set
+    else:
+        return
+    article_cache.invalidate_scopes(
+        [ArticleCache.category_scope(pk) for pk in category_ids]
+        + [ArticleCache.category_tags_scope(pk) for pk in category_ids]
+    )
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_article_tags(sender, instance, action, pk_set, **kwargs):
+    """Invalidate tag listings, the tag cloud and category tag counts when a published article's tags change."""
+    if not isinstance(instance, Article) or not instance.is_published:
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_tag_slugs = list(instance.tags.values_list('slug', flat=True))
+        return
+    if action == 'post_clear':
+        tag_slugs = getattr(instance, '_cleared_tag_slugs', [])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        tag_slugs = sender.tag_model().objects.filter(pk__in=pk_set).values_list('slug', flat=True)
+    else:
+        return
+    article_cache.invalidate_scopes(
+        [ArticleCache.tag_cloud_scope]
+        + [ArticleCache.tag_scope(slug) for slug in tag_slugs]
+        + [ArticleCache.category_tags_scope(pk) for pk in instance.categories.values_list('id', flat=True)]
+    )
+
+
+@receiver(post_save, sender=Article)
+def refresh_saved_article_related(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    if not raw and (instance.is_published or (previous and previous['is_published'])):
+        related.schedule_refresh(instance.pk)
+
+
+@receiver(pre_delete, sender=Article)
+def capture_deleted_article_neighbours(sender, instance, **kwargs):
+    # Related rows cascade with the article, so read its neighbourhood now.
+    instance._related_neighbours = related._neighbour_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Article)
+def refresh_deleted_article_neighbours(sender, instance, **kwargs):
+    neighbours = getattr(instance, '_related_neighbours', set())
+    if neighbours:
+        transaction.on_commit(lambda: related.refresh_related(neighbours))
+
+
+@receiver(m2m_changed, sender=Article.categories.through)
+@receiver(m2m_changed, sender=Article.tags.through)
+def refresh_relinked_article_related(sender, instance, action, pk_set, **kwargs):
+    """Refresh related articles when a published article's categories or tags change."""
+    if not isinstance(instance, Article):
+        # A category changed its articles from the reverse side.
+        if action == 'pre_clear':
+            instance._cleared_article_ids = list(
+                instance.article_categories.published().values_list('pk', flat=True)
+            )
+            return
+        if action == 'post_clear':
+            article_ids = getattr(instance, '_cleared_article_ids', [])
+        elif action in ('post_add', 'post_remove'):
+            article_ids = Article.objects.published().filter(pk__in=pk_set).values_list('pk', flat=True)
+        else:
+            return
+        for article_id in article_ids:
+            related.schedule_refresh(article_id)
+        return
+
+    if instance.is_published and action in ('post_add', 'post_remove', 'post_clear'):
+        related.schedule_refresh(instance.pk)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Category)
+def invalidate_member_issues(sender, instance, raw=False, **kwargs):
+    """Drop cached issues that render this article, or an article in this category."""
+    if raw:
+        return
+    if sender is Article:
+        issues.invalidate_issues_for_articles([instance.pk])
+    else:
+        issues.invalidate_issues_for_articles(instance.article_categories.values('pk'))
+
+
+@receiver(pre_delete, sender=Article)
+def capture_deleted_article_issues(sender, instance, **kwargs):
+    instance._magazine_ids = issues.magazine_ids_for_articles([instance.pk])
+
+
+@receiver(post_delete, sender=Article)
+def invalidate_deleted_article_issues(sender, instance, **kwargs):
+    article_cache.invalidate_issues(getattr(instance, '_magazine_ids', []))
+
+
+@receiver(m2m_changed, sender=Article.categories.through)
+@receiver(m2m_changed, sender=Article.tags.through)
+@receiver(m2m_changed, sender=Article.media.through)
+def invalidate_relinked_article_issues(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, Article):
+        issues.invalidate_issues_for_articles([instance.pk])
+    elif action == 'pre_clear':
+        # A category or media item detached from all of its articles.
+        issues.invalidate_issues_for_articles(
+            sender.objects.filter(**{instance._meta.model_name: instance.pk}).values('article_id')
+        )
+    elif pk_set:
+        issues.invalidate_issues_for_articles(pk_set)
+
+
+@receiver(post_save, sender=Magazine)
+@receiver(post_delete, sender=Magazine)
+def invalidate_magazine_issue(sender, instance, raw=False, **kwargs):
+    if not raw:
+        article_cache.invalidate_issues([instance.pk])
+
+
+@receiver(post_save, sender=Media)
+@receiver(pre_delete, sender=Media)
+def invalidate_media_issues(sender, instance, raw=False, **kwargs):
+    """Drop cached issues that use this media item as their cover or in an article."""
+    if raw:
+        return
+    article_cache.invalidate_issues(Magazine.objects.filter(
+        Q(cover_image=instance.pk) | Q(articles__media=instance.pk)
+    ).values_list('pk', flat=True).distinct())
+
+
+@receiver(m2m_changed, sender=Magazine.articles.through)
+def invalidate_magazine_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # ``instance`` is an Article leaving every magazine.
+        article_cache.invalidate_issues(issues.magazine_ids_for_articles([instance.pk]))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        article_cache.invalidate_issues((pk_set or []) if reverse else [instance.pk])
+
+
+@receiver(pre_save, sender=Media)
+def capture_media_file(sender, instance, raw=False, **kwargs):
+    instance._previous_file = None
+    if not raw and instance.pk is not None:
+        instance._previous_file = Media.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+
+
+@receiver(post_save, sender=Media)
+def drop_stale_media_variants(sender, instance, created, raw=False, **kwargs):
+    """Variants of a replaced file are re-rendered on their next request."""
+    if not raw and not created and instance._previous_file != instance.file.name:
+        MediaVariant.objects.filter(media=instance).delete()
+
+
+@receiver(post_delete, sender=MediaVariant)
+def delete_variant_file(sender, instance, **kwargs):
+    """Remove the rendered file after commit, whether the source was replaced or the media deleted."""
+    derivatives.schedule_file_cleanup([instance.file.name])
+
+
+@receiver(post_save, sender=Media)
+def register_media_blob(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous_blob_id = instance.blob_id
+    blob = blobs.register_blob(instance)
+    blobs.schedule_recount(blob_ids=[previous_blob_id, blob.pk if blob else None])
+
+
+@receiver(post_delete, sender=Media)
+def recount_deleted_media_blob(sender, instance, **kwargs):
+    blobs.schedule_recount(blob_ids=[instance.blob_id])
+
+
+@receiver(m2m_changed, sender=Article.media.through)
+def recount_article_media_blobs(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # ``instance`` is a Media item.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            blobs.schedule_recount(media_ids=[instance.pk])
+        return
+    if action == 'pre_clear':
+        blobs.schedule_recount(media_ids=instance.media.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        blobs.schedule_recount(media_ids=pk_set or [])
+
+
+blobs.connect_reference_signals()
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def blob_digest(name: str) -> str:
+    """The SHA-256 digest encoded in a blob name, or '' for other file names."""
+    parts = name.replace('\\', '/').split('/')
+    if len(parts) != 4 or parts[0] != BLOB_PREFIX:
+        return ''
+    return os.path.splitext(parts[3])[0]
+
+
+def _touch_blob(digest: str) -> None:
+    # Restart the GC grace period of a blob whose file a new upload reuses.
+    from .models import MediaBlob
+
+    MediaBlob.objects.filter(digest=digest).update(updated_at=timezone.now())
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each upload under the SHA-256 of its bytes, as
+    ``blobs/ab/cd/<digest><ext>``. Uploads are hashed while they are streamed
+    to a temporary file, and an upload whose bytes are already stored reuses
+    the existing file. Files that carry a precomputed ``sha256`` and a
+    temporary file path are moved into place without being read. The requested name only contributes its extension.
+    """
+
+    def _blob_name(self, digest: str, extension: str) -> str:
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def _existing_blob(self, digest: str):
+        directory = self.path(f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}')
+        if not os.path.isdir(directory):
+            return None
+        for entry in os.listdir(directory):
+            if os.path.splitext(entry)[0] == digest:
+                return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{entry}'
+        return None
+
+    def _place(self, name: str, hexdigest: str, path: str) -> str:
+        """Move the file at ``path`` into place as the blob ``hexdigest``, or reuse the stored blob."""
+        existing = self._existing_blob(hexdigest)
+        if existing is not None:
+            _touch_blob(hexdigest)
+            return existing
+
+        blob_name = self._blob_name(hexdigest, os.path.splitext(name)[1].lower())
+        os.makedirs(os.path.dirname(self.path(blob_name)), exist_ok=True)
+        file_move_safe(path, self.path(blob_name), allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(self.path(blob_name), self.file_permissions_mode)
+        return blob_name
+
+    def _save(self, name, content):
+        os.makedirs(self.location, exist_ok=True)
+        # Files received with a known digest (see chunked_upload) are moved without being read again.
+        if getattr(content, 'sha256', None) and hasattr(content, 'temporary_file_path'):
+            return self._place(name, content.sha256, content.temporary_file_path())
+
+        digest = hashlib.sha256()
+        handle, temporary_path = tempfile.mkstemp(dir=self.location, prefix='.upload-')
+        try:
+            with os.fdopen(handle, 'wb') as temporary:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+                    temporary.write(chunk)
+            return self._place(name, digest.hexdigest(), temporary_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save(), so they never need a random suffix.
+        return name
+
+
+media_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    return media_storage
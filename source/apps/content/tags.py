@@ -0,0 +1,93 @@
+"""
+Tag queries for articles over django-taggit.
+
+Multi-tag filters compile to a single query with a ``TaggedItem`` subquery,
+and tag counts are aggregated in the database and cached per scope.
+"""
+import math
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from taggit.models import TaggedItem
+
+from .cache import ArticleCache, article_cache
+from .models import Article
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+TAG_CLOUD_WEIGHTS = 5
+
+
+def _article_content_type_id() -> int:
+    # ContentType lookups are cached by Django after the first query.
+    return ContentType.objects.get_for_model(Article).pk
+
+
+def tagged_articles():
+    """Tag assignments of articles, i.e. ``TaggedItem`` rows restricted to the Article content type."""
+    return TaggedItem.objects.filter(content_type_id=_article_content_type_id())
+
+
+def filter_by_tags(queryset, tag_slugs: Iterable[str], match: str = MATCH_ANY):
+    """
+    Restrict an article queryset to articles tagged with any (``match='any'``)
+    or all (``match='all'``) of the given tag slugs, as one SQL query.
+    """
+    tag_slugs = sorted(set(tag_slugs))
+    if not tag_slugs:
+        return queryset
+    tagged = tagged_articles().filter(tag__slug__in=tag_slugs)
+    if match == MATCH_ALL:
+        tagged = tagged.values('object_id').annotate(
+            matched=Count('tag_id', distinct=True)
+        ).filter(matched=len(tag_slugs))
+    elif match != MATCH_ANY:
+        raise ValueError(f"Unknown tag match mode: {match}")
+    return queryset.filter(pk__in=tagged.values('object_id'))
+
+
+def _tag_counts(article_ids=None, limit: Optional[int] = None) -> List[Dict]:
+    """Tag counts, most used first; ``limit`` is applied in the query."""
+    tagged = tagged_articles().filter(
+        object_id__in=article_ids if article_ids is not None else Article.objects.published().values('pk')
+    )
+    counts = (
+        tagged.values('tag__name', 'tag__slug')
+        .annotate(count=Count('object_id', distinct=True))
+        .order_by('-count', 'tag__name')
+        .values('tag__name', 'tag__slug', 'count')
+    )
+    return list(counts if limit is None else counts[:limit])
+
+
+def _as_tags(rows: List[Dict]) -> List[Dict]:
+    return [{'name': row['tag__name'], 'slug': row['tag__slug'], 'count': row['count']} for row in rows]
+
+
+def category_tag_counts(category_id: int) -> List[Dict]:
+    """Tag counts over the published articles of one category, most used first (cached)."""
+    def compute():
+        article_ids = Article.objects.published().filter(categories=category_id).values('pk')
+        return _as_tags(_tag_counts(article_ids))
+
+    return article_cache.cached('tag-counts', ArticleCache.category_tags_scope(category_id), 'all', compute)
+
+
+def tag_cloud(limit: int = 50) -> List[Dict]:
+    """
+    The most used tags over published articles, alphabetically, each with a
+    1-5 ``weight`` on a logarithmic scale (cached).
+    """
+    def compute():
+        tags = _as_tags(_tag_counts(limit=limit))
+        if not tags:
+            return tags
+        low = math.log(min(tag['count'] for tag in tags))
+        high = math.log(max(tag['count'] for tag in tags))
+        spread = (high - low) or 1
+        for tag in tags:
+            tag['weight'] = 1 + round((math.log(tag['count']) - low) / spread * (TAG_CLOUD_WEIGHTS - 1))
+        return sorted(tags, key=lambda tag: tag['name'].casefold())
+
+    return article_cache.cached('tag-cloud', ArticleCache.tag_cloud_scope, str(limit), compute)
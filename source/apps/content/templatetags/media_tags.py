@@ -0,0 +1,35 @@
+from django import template
+from django.utils.html import format_html
+
+from source.apps.content import derivatives
+
+register = template.Library()
+
+
+@register.simple_tag
+def media_variant_url(media, size, variant_format='webp'):
+    """{% media_variant_url media "thumbnail" "webp" %}"""
+    return derivatives.variant_url(media, size, variant_format)
+
+
+@register.simple_tag
+def media_srcset(media, variant_format='webp'):
+    """{% media_srcset media "webp" %}"""
+    return derivatives.srcset(media, variant_format)
+
+
+@register.simple_tag
+def media_img(media, size='medium', sizes='100vw', variant_format='webp', css_class=''):
+    """
+    An ``<img>`` for a Media image with a ``srcset`` of its variants and the
+    ``size`` variant as the fallback ``src``:
+    {% media_img media "medium" sizes="(max-width: 600px) 100vw, 600px" %}
+    """
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">',
+        derivatives.variant_url(media, size, variant_format),
+        derivatives.srcset(media, variant_format),
+        sizes,
+        media.alt_text,
+        css_class,
+    )
@@ -1,3 +1,196 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from source.apps.core.utils import assert_no_full_scans
+from source.services.article_import import ArticleImportService, read_csv_articles, read_jsonl_articles
+from source.utils.slug_utils import allocate_slugs
+
+from . import related
+from .cache import article_cache
+from .blobs import collect_garbage
+from .models import Article, Category, Media, MediaBlob, MediaVariant, RelatedArticle
+from .storage import media_storage
+from .tags import tag_cloud
+from .utils import manager_query_plan_cases
+
+
+class ManagerQueryPlanTests(TestCase):
+    """The content manager listing queries must be served by indexes."""
+
+    def test_manager_queries_do_not_scan_full_tables(self):
+        author = get_user_model().objects.create_user(username='author', password='secret')
+        assert_no_full_scans(manager_query_plan_cases(author))
+
+
+class RelatedRefreshBoundsTests(TestCase):
+    """A save only refreshes articles it strictly outranks a stored neighbour of, up to a cap."""
+
+    def setUp(self):
+        caches[related.CACHE_ALIAS].delete(related.DEFERRED_KEY)
+        category = Category.objects.create(name="News", slug="news")
+        self.articles = []
+        for number, tags in enumerate([['oil'], ['oil'], ['oil'], []]):
+            article = Article.objects.create(title=f"Article {number}", slug=f"article-{number}", content="text")
+            article.categories.add(category)
+            article.tags.add(*tags)
+            article.publish()
+            self.articles.append(article)
+        self.changed, self.first, self.second, self.category_only = self.articles
+        # Every other article keeps one neighbour with a category-only score.
+        RelatedArticle.objects.all().delete()
+        for article in self.articles[1:]:
+            RelatedArticle.objects.create(article=article, related=self.changed, score=1.0, rank=1)
+
+    def test_ties_are_not_outranked(self):
+        with mock.patch.object(related, 'TOP_N', 1):
+            outranked = related._outranked_ids(self.changed, use_terms=False)
+        self.assertEqual(sorted(outranked), sorted([self.first.pk, self.second.pk]))
+
+    def test_refresh_beyond_the_limit_is_deferred(self):
+        refreshed = []
+        with mock.patch.object(related, 'TOP_N', 1), mock.patch.object(related, 'REFRESH_LIMIT', 1), \
+                mock.patch.object(related, '_neighbour_ids', return_value=set()), \
+                mock.patch.object(related, 'refresh_related', side_effect=lambda ids, *args: refreshed.append(set(ids))):
+            related.refresh_article(self.changed.pk, use_terms=False)
+        deferred = caches[related.CACHE_ALIAS].get(related.DEFERRED_KEY)
+        self.assertEqual(len(refreshed[-1]), 1)
+        self.assertEqual(refreshed[-1] | deferred, {self.first.pk, self.second.pk})
+        self.assertNotIn(self.category_only.pk, refreshed[-1] | deferred)
+
+
+class BlobGarbageCollectionTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+    def _age_blobs(self):
+        MediaBlob.objects.update(updated_at=timezone.now() - timedelta(days=2))
+
+    def test_unattached_media_keeps_its_blob(self):
+        media = Media.objects.create(file=SimpleUploadedFile("scan.pdf", b"scan"), media_type='document')
+        self._age_blobs()
+        self.assertEqual(collect_garbage()['blobs'], 0)
+        self.assertTrue(media.file.storage.exists(media.file.name))
+
+    def test_reused_file_restarts_the_grace_period(self):
+        media = Media.objects.create(file=SimpleUploadedFile("a.jpg", b"same bytes"), media_type='image')
+        name = media.file.name
+        media.delete()
+        self._age_blobs()
+        # A new upload of the same bytes reuses the stored file before its Media row exists.
+        self.assertEqual(media_storage.save("b.jpg", ContentFile(b"same bytes")), name)
+        self.assertEqual(collect_garbage()['blobs'], 0)
+
+        # Named by a Media row that register_blob has not linked yet.
+        self._age_blobs()
+        Media.objects.bulk_create([Media(file=name, media_type='image')])
+        self.assertEqual(collect_garbage()['blobs'], 0)
+        self.assertTrue(media_storage.exists(name))
+
+    def test_blob_without_media_is_collected_after_the_grace_period(self):
+        media = Media.objects.create(file=SimpleUploadedFile("a.jpg", b"orphan"), media_type='image')
+        name = media.file.name
+        media.delete()
+        self.assertEqual(collect_garbage()['blobs'], 0)
+        self._age_blobs()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(collect_garbage()['blobs'], 1)
+        self.assertFalse(media_storage.exists(name))
+
+
+class SlugAllocationTests(TestCase):
+    def test_collisions_get_the_next_free_suffix(self):
+        Article.objects.create(title="Hello", slug="hello-world", content="text")
+        Article.objects.create(title="Hello", slug="hello-world-2", content="text")
+        slugs = allocate_slugs(Article.objects.all(), ["Hello World", "Hello world!", "مرحبا بكم", "!!"], fallback='article')
+        self.assertEqual(slugs, ["hello-world-3", "hello-world-4", "مرحبا-بكم", "article"])
+
+
+class ArticleImportTests(TestCase):
+    def test_rerun_skips_entries_with_an_existing_slug(self):
+        lines = [
+            '{"title": "First", "content": "Body", "slug": "First Story"}\n',
+            '{"title": "First", "content": "Body"}\n',
+        ]
+        counts = ArticleImportService.import_articles(read_jsonl_articles(lines))
+        self.assertEqual((counts['articles'], counts['skipped']), (2, 0))
+        self.assertTrue(Article.objects.filter(slug="first-story").exists())
+
+        counts = ArticleImportService.import_articles(read_jsonl_articles(lines[:1]))
+        self.assertEqual((counts['articles'], counts['skipped']), (0, 1))
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_invalid_entries_name_their_row(self):
+        cases = [
+            (['{"title": "A", "content": "Body"}\n', '\n', '{"title": \n'], "Row 3: invalid JSON"),
+            (['{"title": "A", "content": "Secret body"}\n', '{"content": "Secret body"}\n'], "Row 2: article is missing 'title'"),
+            (['{"title": "A", "content": "Body", "published_at": "yesterday"}\n'], "Row 1: invalid value for 'published_at'"),
+        ]
+        for lines, message in cases:
+            with self.subTest(message=message), self.assertRaises(ValidationError) as raised:
+                ArticleImportService.import_articles(read_jsonl_articles(lines))
+            self.assertTrue(raised.exception.messages[0].startswith(message), raised.exception.messages)
+            self.assertNotIn("Secret body", raised.exception.messages[0])
+        self.assertFalse(Article.objects.exists())
+
+    def test_csv_rows_are_numbered_by_line(self):
+        lines = ["title,content,published_at\n", "A,Body,\n", "B,Body,2026-13-40\n"]
+        with self.assertRaisesMessage(ValidationError, "Row 3: invalid value for 'published_at'"):
+            ArticleImportService.import_articles(read_csv_articles(lines))
+
+
+class VariantFileCleanupTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+    def _media_with_variant(self, source, path):
+        media = Media.objects.create(file=SimpleUploadedFile("photo.jpg", source), media_type='image')
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(b"rendered"))
+        MediaVariant.objects.create(media=media, size='small', format='webp', file=path, width=300, height=200)
+        return media
+
+    def test_dropped_variant_files_are_deleted_once_unused(self):
+        first = self._media_with_variant(b"first", "derivatives/aa/bb/shared.webp")
+        second = self._media_with_variant(b"second", "derivatives/aa/bb/shared.webp")
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists("derivatives/aa/bb/shared.webp"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.file = SimpleUploadedFile("photo.jpg", b"replaced")
+            second.save()
+        self.assertFalse(second.variants.exists())
+        self.assertFalse(default_storage.exists("derivatives/aa/bb/shared.webp"))
+
+
+class TagCloudTests(TestCase):
+    def test_limit_is_applied_in_the_query(self):
+        article_cache.cache.clear()
+        for number, tags in enumerate([['oil', 'gas'], ['oil', 'gas'], ['oil', 'wind']]):
+            article = Article.objects.create(title=f"Article {number}", slug=f"article-{number}", content="text")
+            article.tags.add(*tags)
+            article.publish()
+
+        with CaptureQueriesContext(connection) as queries:
+            cloud = tag_cloud(limit=2)
+        self.assertEqual([(tag['name'], tag['count']) for tag in cloud], [('gas', 2), ('oil', 3)])
+        self.assertTrue(any('LIMIT 2' in query['sql'] for query in queries.captured_queries))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(tag_cloud(limit=2), cloud)
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'content'
+
+urlpatterns = [
+    path(
+        'media/<int:media_id>/<str:size>.<str:variant_format>',
+        views.media_variant,
+        name='media-variant'
+    ),
+]
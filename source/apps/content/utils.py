@@ -1,9 +1,9 @@
-from django.utils.text import slugify
+from source.utils.slug_utils import slugify_value
 from django.core.exceptions import ValidationError
 
 
 def generate_slug(value):
-    return slugify(value)
+    return slugify_value(value)
 
 
 def validate_article_data(title, content):
@@ -18,4 +18,19 @@ def handle_media_upload(file, media_type, alt_text=''):
 
 def format_date(date):
     # Logic to format date for display
-    return date.strftime('%Y-%m-%d')
\ No newline at end of file
+    return date.strftime('%Y-%m-%d')
+
+def manager_query_plan_cases(author=None):
+    """
+    Labelled querysets for every listing method of the content managers,
+    for query plan audits with ``source.apps.core.utils.assert_no_full_scans``.
+    """
+    from .models import Article, Category, Magazine, Media
+
+    return [
+        ('Article.objects.published()', Article.objects.published()),
+        ('Article.objects.by_author()', Article.objects.by_author(author)),
+        ('Magazine.objects.published()', Magazine.objects.published()),
+        ('Media.objects.images()', Media.objects.images()),
+        ('Category.objects.active()', Category.objects.active()),
+    ]
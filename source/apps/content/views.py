@@ -1,3 +1,19 @@
-from django.shortcuts import render
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from . import derivatives
+from .models import Media
+
+
+@require_GET
+def media_variant(request, media_id, size, variant_format):
+    """Redirect to a resized variant of a Media image, rendering it on first request."""
+    media = get_object_or_404(Media, pk=media_id, media_type='image')
+    variant = derivatives.get_variant(media, size, variant_format)
+    if variant is None:
+        if size not in derivatives.SIZES or variant_format not in derivatives.FORMATS:
+            raise Http404("Unknown media variant")
+        # Another request is still rendering it; serve the original meanwhile.
+        return redirect(media.file.url)
+    return redirect(variant.file.url)
@@ -0,0 +1,44 @@
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import connections
+
+
+def explain_query_plan(queryset) -> List[str]:
+    """Return the database query plan of a queryset, one line per plan step."""
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+    return queryset.explain().splitlines()
+
+
+def is_full_scan(plan_line: str) -> bool:
+    """Check whether a plan step reads a whole table without an index."""
+    line = plan_line.strip()
+    if line.startswith('SCAN '):
+        # SQLite: "SCAN table" is a full scan, "SCAN table USING INDEX ..." walks an index.
+        return ' USING ' not in line
+    return 'Seq Scan' in line
+
+
+def find_full_scans(queries: Iterable[Tuple[str, object]]) -> Dict[str, List[str]]:
+    """Map each labelled queryset that does a full table scan to its offending plan steps."""
+    offenders = {}
+    for label, queryset in queries:
+        scans = [line for line in explain_query_plan(queryset) if is_full_scan(line)]
+        if scans:
+            offenders[label] = scans
+    return offenders
+
+
+def assert_no_full_scans(queries: Iterable[Tuple[str, object]]) -> None:
+    """
+    Fail with an AssertionError listing every labelled queryset whose plan
+    contains a full table scan. Intended for use from test suites.
+    """
+    offenders = find_full_scans(queries)
+    if offenders:
+        details = '; '.join(f"{label}: {', '.join(scans)}" for label, scans in offenders.items())
+        raise AssertionError(f"Full table scans found: {details}")
@@ -0,0 +1,160 @@
+import csv
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, F, FloatField, QuerySet, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from source.apps.advertisements.models import AdCampaign, AdDailyRollup, CampaignSpend
+from source.apps.advertisements.pacing import expected_spend
+from source.apps.advertisements.rollups import derive_performance
+
+# (id field, name field) on AdDailyRollup for each report level
+LEVELS = {
+    'ad': ('advertisement_id', 'advertisement__name'),
+    'campaign': ('campaign_id', 'campaign__name'),
+    'advertiser': ('campaign__advertiser_id', 'campaign__advertiser__name'),
+    'placement': ('placement_id', 'placement__name'),
+}
+METRIC_FIELDS = ['impressions', 'clicks', 'ctr', 'spend', 'ecpm']
+PACING_FIELDS = ['budget', 'spent', 'expected_spend', 'pace']
+# CampaignSpend field for the levels the ledger records spend at
+LEDGER_LEVELS = {
+    'campaign': 'campaign_id',
+    'advertiser': 'campaign__advertiser_id',
+}
+
+
+def _charged_units():
+    # What a rollup row was charged for under its campaign's pricing model.
+    return Case(When(campaign__pricing_model='cpc', then=F('clicks')), default=F('impressions'))
+
+
+def _rate(numerator, denominator, scale: int):
+    return Case(
+        When(**{f'{denominator}__gt': 0}, then=Cast(numerator, FloatField()) * Value(float(scale)) / F(denominator)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+class AdReportService:
+    """Ad, campaign, advertiser and placement reports computed with aggregate queries over the daily rollups"""
+
+    @classmethod
+    def report(cls, level: str = 'campaign', start: Optional[date] = None, end: Optional[date] = None,
+               ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Impressions, clicks, CTR (%), spend and eCPM per ``level`` between
+        ``start`` and ``end`` (inclusive, both optional). Spend is what the
+        ``CampaignSpend`` ledger charged in the period (see ``_ledger_spend``).
+        Campaign reports add budget, lifetime spend and pacing against an
+        even schedule, in one more query.
+        """
+        if level not in LEVELS:
+            raise ValidationError(f"Unknown report level '{level}'; expected one of {', '.join(LEVELS)}")
+        id_field, name_field = LEVELS[level]
+
+        if ids is not None:
+            ids = list(ids)
+
+        dated = AdDailyRollup.objects.all()
+        if start is not None:
+            dated = dated.filter(day__gte=start)
+        if end is not None:
+            dated = dated.filter(day__lte=end)
+        rollups = dated if ids is None else dated.filter(**{f'{id_field}__in': ids})
+
+        rows = rollups.values(id_field, name_field).annotate(
+            total_impressions=Coalesce(Sum('impressions'), 0),
+            total_clicks=Coalesce(Sum('clicks'), 0),
+        ).annotate(
+            ctr=_rate('total_clicks', 'total_impressions', 100),
+        ).order_by(name_field)
+        spend = cls._ledger_spend(level, dated, rollups, start, end, ids)
+
+        report = []
+        for row in rows:
+            row_spend = spend.get(row[id_field], Decimal(0))
+            impressions = row['total_impressions']
+            report.append({
+                'id': row[id_field],
+                'name': row[name_field] or '',
+                'impressions': impressions,
+                'clicks': row['total_clicks'],
+                'ctr': round(row['ctr'], 2),
+                'spend': row_spend.quantize(Decimal('0.01')),
+                'ecpm': round(float(row_spend) * 1000 / impressions, 4) if impressions else 0.0,
+            })
+        if level == 'campaign':
+            cls._add_pacing(report)
+        return report
+
+    @classmethod
+    def _ledger_spend(cls, level: str, dated: QuerySet, rollups: QuerySet, start: Optional[date],
+                      end: Optional[date], ids: Optional[List[int]]) -> Dict[Any, Decimal]:
+        """
+        Ledger spend per ``level`` id for entries created between ``start``
+        and ``end``. The ledger records campaigns, so ad and placement spend
+        is each campaign's spend split by the row's share of the units
+        (impressions or clicks) the campaign was charged for in the period.
+        """
+        ledger = CampaignSpend.objects.order_by()
+        if start is not None:
+            ledger = ledger.filter(created_at__date__gte=start)
+        if end is not None:
+            ledger = ledger.filter(created_at__date__lte=end)
+
+        if level in LEDGER_LEVELS:
+            field = LEDGER_LEVELS[level]
+            if ids is not None:
+                ledger = ledger.filter(**{f'{field}__in': ids})
+            return dict(ledger.values_list(field).annotate(amount=Sum('amount')))
+
+        id_field = LEVELS[level][0]
+        shares = list(rollups.values(id_field, 'campaign_id').annotate(units=Sum(_charged_units())).order_by())
+        campaign_ids = {share['campaign_id'] for share in shares}
+        campaign_units = dict(
+            dated.filter(campaign_id__in=campaign_ids).values_list('campaign_id')
+            .annotate(units=Sum(_charged_units())).order_by()
+        )
+        charged = dict(
+            ledger.filter(campaign_id__in=campaign_ids).values_list('campaign_id').annotate(amount=Sum('amount'))
+        )
+        spend: Dict[Any, Decimal] = defaultdict(Decimal)
+        for share in shares:
+            units = campaign_units.get(share['campaign_id'])
+            if units and share['units']:
+                spend[share[id_field]] += charged.get(share['campaign_id'], Decimal(0)) * share['units'] / units
+        return spend
+
+    @classmethod
+    def _add_pacing(cls, report: List[Dict[str, Any]]) -> None:
+        now = timezone.now()
+        campaigns = AdCampaign.objects.in_bulk([row['id'] for row in report])
+        for row in report:
+            campaign = campaigns[row['id']]
+            expected = expected_spend(campaign, now)
+            row['budget'] = campaign.budget
+            row['spent'] = campaign.spent.quantize(Decimal('0.01'))
+            row['expected_spend'] = expected.quantize(Decimal('0.01'))
+            # Above 1 the campaign is spending ahead of schedule, below 1 behind it.
+            row['pace'] = round(float(campaign.spent / expected), 4) if expected else 0.0
+
+    @classmethod
+    def refresh_performance(cls) -> int:
+        """Recompute every ``AdPerformance`` row from the daily rollups in one bulk update."""
+        return derive_performance()
+
+    @classmethod
+    def write_csv(cls, report: List[Dict[str, Any]], stream: TextIO, level: str = 'campaign') -> int:
+        """Write a report as CSV. Returns the number of rows written."""
+        fields = ['id', 'name'] + METRIC_FIELDS + (PACING_FIELDS if level == 'campaign' else [])
+        writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report)
+        return len(report)
@@ -0,0 +1,148 @@
+import csv
+import json
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+
+from source.apps.archives.models import ArchiveMetadata, Edition, EditionContent
+
+EDITION_FIELDS = [
+    'year', 'edition_number', 'title', 'slug', 'description', 'edition_type', 'season',
+    'publication_date', 'is_digitized', 'page_count', 'file_size', 'primary_category',
+]
+CONTENT_FIELDS = [
+    'title', 'content_type', 'page_number', 'categories', 'content_preview', 'keywords',
+    'is_searchable', 'digital_content',
+]
+METADATA_FIELDS = [
+    'language', 'contributors', 'source_info', 'digitization_date', 'digitization_notes',
+    'preservation_status', 'copyright_info', 'tags',
+]
+# Column names match the CSV manifest format read by ``import_editions``.
+CSV_CONTENT_COLUMNS = {
+    'title': 'content_title',
+    'content_type': 'content_type',
+    'page_number': 'page_number',
+    'categories': 'categories',
+    'content_preview': 'content_preview',
+    'keywords': 'content_keywords',
+    'is_searchable': 'content_is_searchable',
+    'digital_content': 'content_digital_content',
+}
+CSV_COLUMNS = (
+    EDITION_FIELDS
+    + list(CSV_CONTENT_COLUMNS.values())
+    + [f'metadata_{field}' for field in METADATA_FIELDS]
+)
+
+
+class _Echo:
+    """File-like object whose write() hands the written value back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+class ArchiveExporter:
+    """
+    Streams the archive as JSONL (one edition per line, pages nested under
+    ``contents``) or CSV (one row per page). Rows are read with
+    ``iterator(chunk_size=...)`` and relations are prefetched per chunk, so
+    memory stays flat regardless of the archive size.
+    """
+
+    formats = {
+        'jsonl': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+
+    def __init__(self, queryset=None, chunk_size: int = 200):
+        self.queryset = queryset if queryset is not None else Edition.objects.all()
+        self.chunk_size = chunk_size
+
+    def editions(self) -> Iterator[Dict[str, Any]]:
+        """Yield one plain dict per edition, with its pages and their metadata."""
+        contents = EditionContent.objects.select_related('metadata').prefetch_related(
+            'categories'
+        ).order_by('page_number')
+        queryset = self.queryset.select_related('archive_year', 'primary_category').prefetch_related(
+            Prefetch('contents', queryset=contents)
+        ).order_by('archive_year__year', 'edition_number')
+
+        for edition in queryset.iterator(chunk_size=self.chunk_size):
+            yield {
+                'year': edition.archive_year.year,
+                'edition_number': edition.edition_number,
+                'title': edition.title,
+                'slug': edition.slug,
+                'description': edition.description,
+                'edition_type': edition.edition_type,
+                'season': edition.season,
+                'publication_date': edition.publication_date.isoformat(),
+                'is_digitized': edition.is_digitized,
+                'page_count': edition.page_count,
+                'file_size': edition.file_size,
+                'primary_category': edition.primary_category.slug if edition.primary_category else None,
+                'contents': [self._content(content) for content in edition.contents.all()],
+            }
+
+    def _content(self, content: EditionContent) -> Dict[str, Any]:
+        try:
+            metadata = content.metadata
+        except ArchiveMetadata.DoesNotExist:
+            metadata = None
+        return {
+            'title': content.title,
+            'content_type': content.content_type,
+            'page_number': content.page_number,
+            'categories': [category.slug for category in content.categories.all()],
+            'content_preview': content.content_preview,
+            'keywords': content.keywords,
+            'is_searchable': content.is_searchable,
+            'digital_content': content.digital_content.name if content.digital_content else '',
+            'metadata': {
+                field: getattr(metadata, field) for field in METADATA_FIELDS
+            } if metadata else None,
+        }
+
+    def iter_jsonl(self) -> Iterator[str]:
+        for edition in self.editions():
+            yield json.dumps(edition, ensure_ascii=False, default=str) + '\n'
+
+    def iter_csv(self) -> Iterator[str]:
+        writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS)
+        yield writer.writeheader()
+        for edition in self.editions():
+            row = {field: edition[field] for field in EDITION_FIELDS}
+            if not edition['contents']:
+                yield writer.writerow(row)
+            for content in edition['contents']:
+                page_row = dict(row)
+                for field, column in CSV_CONTENT_COLUMNS.items():
+                    page_row[column] = content[field]
+                page_row['categories'] = ';'.join(content['categories'])
+                for field, value in (content['metadata'] or {}).items():
+                    page_row[f'metadata_{field}'] = value
+                yield writer.writerow(page_row)
+
+    def iter_format(self, export_format: str) -> Iterator[str]:
+        if export_format not in self.formats:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        return self.iter_jsonl() if export_format == 'jsonl' else self.iter_csv()
+
+    def write(self, stream: TextIO, export_format: str = 'jsonl') -> int:
+        """Write the export to a text stream incrementally. Returns the number of chunks written."""
+        written = 0
+        for chunk in self.iter_format(export_format):
+            stream.write(chunk)
+            written += 1
+        return written
+
+    def streaming_response(self, export_format: str = 'jsonl', filename: Optional[str] = None) -> StreamingHttpResponse:
+        response = StreamingHttpResponse(
+            self.iter_format(export_format), content_type=self.formats[export_format]
+        )
+        filename = filename or f'archive.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,268 @@
+import csv
+import json
+from datetime import date
+from itertools import groupby, islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.utils.dateparse import parse_date
+
+from source.apps.archives.models import ArchiveMetadata, ArchiveYear, Edition, EditionContent
+from source.apps.archives.search import get_search_backend
+from source.apps.archives.timeline import refresh_timeline
+from source.apps.content.models import Category
+from source.services.archive_service import METADATA_UPDATE_FIELDS
+from source.utils.slug_utils import allocate_slugs
+
+EDITION_FIELDS = (
+    'title', 'description', 'edition_type', 'season', 'publication_date',
+    'is_digitized', 'page_count', 'file_size',
+)
+CONTENT_FIELDS = ('title', 'content_type', 'page_number', 'content_preview', 'keywords', 'is_searchable')
+BOOLEAN_FIELDS = {'is_digitized', 'is_searchable'}
+INTEGER_FIELDS = {'year', 'edition_number', 'page_count', 'file_size', 'page_number'}
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+# Manifest line an edition or page entry was read from, set by the readers.
+ROW_KEY = '_row'
+
+
+def _coerce(field: str, value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        if field in BOOLEAN_FIELDS:
+            return value.lower() in TRUE_VALUES
+        if field in INTEGER_FIELDS:
+            return int(value) if value else 0
+        if field == 'publication_date':
+            return parse_date(value)
+    return value
+
+
+def _coerce_at(row: Any, field: str, value: Any) -> Any:
+    try:
+        return _coerce(field, value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Row {row}: invalid value for '{field}': {value!r}")
+
+
+def read_jsonl_manifest(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield one edition entry per non-empty JSON line."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValidationError(f"Row {number}: invalid JSON: {error.msg}")
+        if not isinstance(entry, dict):
+            raise ValidationError(f"Row {number}: expected a JSON object")
+        entry[ROW_KEY] = number
+        yield entry
+
+
+def read_csv_manifest(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield edition entries from a CSV manifest with one row per page.
+    Rows of the same edition must be consecutive. Page columns are prefixed
+    with ``content_`` (``page_number`` and ``categories`` are unprefixed, the
+    latter separated by ``;``) and metadata columns with ``metadata_``.
+    """
+    reader = csv.DictReader(lines)
+    # line_num is read as each row is produced, so it is that row's (last) line.
+    rows = ((reader.line_num, row) for row in reader)
+    for _, edition_rows in groupby(rows, key=lambda item: (item[1]['year'], item[1]['edition_number'])):
+        edition_rows = list(edition_rows)
+        number, first = edition_rows[0]
+        entry = {
+            key: value for key, value in first.items()
+            if not key.startswith(('content_', 'metadata_')) and key not in ('page_number', 'categories')
+        }
+        entry[ROW_KEY] = number
+        entry['contents'] = []
+        for number, row in edition_rows:
+            if not row.get('content_title'):
+                continue
+            content = {
+                'title': row['content_title'],
+                'content_type': row.get('content_type') or 'article',
+                'page_number': row.get('page_number'),
+                'content_preview': row.get('content_preview', ''),
+                'keywords': row.get('content_keywords', ''),
+                'is_searchable': row.get('content_is_searchable', ''),
+                'categories': [slug for slug in (row.get('categories') or '').split(';') if slug],
+                'metadata': {
+                    key[len('metadata_'):]: value for key, value in row.items()
+                    if key.startswith('metadata_') and value
+                },
+                ROW_KEY: number,
+            }
+            entry['contents'].append(content)
+        yield entry
+
+
+class EditionIngestionService:
+    """Batch ingestion of editions, their pages and archive metadata"""
+
+    @classmethod
+    @transaction.atomic
+    def ingest(cls, entries: Iterable[Dict[str, Any]], batch_size: int = 200) -> Dict[str, int]:
+        """
+        Create editions with their ``EditionContent`` pages and ``ArchiveMetadata``
+        in batches. Editions that already exist for their year are skipped.
+        ``total_editions`` is recomputed once per affected year at the end.
+        Every entry of a batch is validated before any of it is written; a bad
+        entry raises ``ValidationError`` naming its manifest row (or its
+        position when it was not read from a manifest).
+        Returns the number of created editions, contents and metadata rows,
+        skipped editions and affected years.
+        """
+        counts = {'editions': 0, 'contents': 0, 'metadata': 0, 'skipped': 0, 'years': 0}
+        years: Dict[int, ArchiveYear] = {}
+        categories: Dict[str, Category] = {}
+        timeline_cells = set()
+
+        entries = iter(entries)
+        position = 0
+        while True:
+            batch = list(islice(entries, batch_size))
+            if not batch:
+                break
+            for offset, entry in enumerate(batch, position + 1):
+                cls._validate_entry(entry, entry.get(ROW_KEY, offset))
+            position += len(batch)
+            cls._ingest_batch(batch, years, categories, timeline_cells, counts)
+
+        affected_years = list(ArchiveYear.objects.filter(
+            pk__in=[archive_year.pk for archive_year in years.values()]
+        ).annotate(edition_count=Count('editions')))
+        for archive_year in affected_years:
+            archive_year.total_editions = archive_year.edition_count
+        ArchiveYear.objects.bulk_update(affected_years, ['total_editions'])
+        counts['years'] = len(affected_years)
+
+        refresh_timeline(timeline_cells)
+        return counts
+
+    @classmethod
+    def _resolve_years(cls, year_values: Iterable[int], years: Dict[int, ArchiveYear]) -> None:
+        missing = set(year_values) - set(years)
+        if not missing:
+            return
+        ArchiveYear.objects.bulk_create(
+            [ArchiveYear(year=year, description=f'Archive for year {year}') for year in missing],
+            ignore_conflicts=True
+        )
+        years.update({archive_year.year: archive_year for archive_year in ArchiveYear.objects.filter(year__in=missing)})
+
+    @classmethod
+    def _resolve_categories(cls, slugs: Iterable[str], categories: Dict[str, Category]) -> None:
+        missing = set(slugs) - set(categories)
+        if not missing:
+            return
+        categories.update({category.slug: category for category in Category.objects.filter(slug__in=missing)})
+        unknown = missing - set(categories)
+        if unknown:
+            raise ValidationError(f"Unknown categories: {', '.join(sorted(unknown))}")
+
+    @classmethod
+    def _validate_entry(cls, entry: Dict[str, Any], row: Any) -> None:
+        """Check an edition entry and its pages so that writing them cannot fail on bad input."""
+        for field in ('year', 'edition_number', 'title', 'publication_date'):
+            if not entry.get(field):
+                raise ValidationError(f"Row {row}: edition is missing '{field}'")
+        for field in ('year', 'edition_number') + EDITION_FIELDS:
+            if entry.get(field) not in (None, ''):
+                _coerce_at(row, field, entry[field])
+        if not isinstance(_coerce('publication_date', entry['publication_date']), date):
+            raise ValidationError(f"Row {row}: invalid value for 'publication_date': {entry['publication_date']!r}")
+
+        for content_entry in entry.get('contents', []):
+            content_row = content_entry.get(ROW_KEY, row)
+            for field in ('title', 'page_number'):
+                if content_entry.get(field) in (None, ''):
+                    raise ValidationError(f"Row {content_row}: page is missing '{field}'")
+            for field in CONTENT_FIELDS:
+                if content_entry.get(field) not in (None, ''):
+                    _coerce_at(content_row, field, content_entry[field])
+
+            metadata = content_entry.get('metadata') or {}
+            unknown_fields = set(metadata) - METADATA_UPDATE_FIELDS
+            if unknown_fields:
+                raise ValidationError(f"Row {content_row}: unknown metadata fields: {', '.join(sorted(unknown_fields))}")
+            try:
+                ArchiveMetadata(**metadata).clean_fields(
+                    exclude=[field.name for field in ArchiveMetadata._meta.fields if field.name not in metadata]
+                )
+            except ValidationError as error:
+                raise ValidationError(f"Row {content_row}: invalid metadata: {'; '.join(error.messages)}")
+
+    @classmethod
+    def _ingest_batch(cls, batch: List[Dict[str, Any]], years, categories, timeline_cells, counts) -> None:
+        # Categories are only read, so an unknown one fails the batch before the years are created.
+        cls._resolve_categories((
+            slug
+            for entry in batch
+            for slug in [entry.get('primary_category')] + [
+                slug for content in entry.get('contents', []) for slug in content.get('categories', [])
+            ]
+            if slug
+        ), categories)
+        cls._resolve_years((_coerce('year', entry['year']) for entry in batch), years)
+
+        existing = set(Edition.objects.filter(
+            archive_year__in=[years[_coerce('year', entry['year'])] for entry in batch]
+        ).values_list('archive_year__year', 'edition_number'))
+
+        editions, edition_entries = [], []
+        for entry in batch:
+            year = _coerce('year', entry['year'])
+            number = _coerce('edition_number', entry['edition_number'])
+            if (year, number) in existing:
+                counts['skipped'] += 1
+                continue
+            existing.add((year, number))
+            values = {field: _coerce(field, entry[field]) for field in EDITION_FIELDS if entry.get(field) not in (None, '')}
+            editions.append(Edition(
+                archive_year=years[year],
+                edition_number=number,
+                slug=f"{year}-{number}-{values['title']}",
+                primary_category=categories.get(entry.get('primary_category')),
+                **values
+            ))
+            edition_entries.append(entry)
+
+        slugs = allocate_slugs(Edition.objects.all(), [edition.slug for edition in editions], fallback='edition')
+        for edition, slug in zip(editions, slugs):
+            edition.slug = slug
+        Edition.objects.bulk_create(editions)
+        counts['editions'] += len(editions)
+
+        contents, content_entries = [], []
+        for edition, entry in zip(editions, edition_entries):
+            for content_entry in entry.get('contents', []):
+                contents.append(EditionContent(edition=edition, **{
+                    field: _coerce(field, content_entry[field])
+                    for field in CONTENT_FIELDS if content_entry.get(field) not in (None, '')
+                }))
+                content_entries.append(content_entry)
+
+        EditionContent.objects.bulk_create(contents)
+        counts['contents'] += len(contents)
+
+        CategoryLink = EditionContent.categories.through
+        links, metadata = [], []
+        for content, content_entry in zip(contents, content_entries):
+            for slug in dict.fromkeys(content_entry.get('categories', [])):
+                category = categories[slug]
+                links.append(CategoryLink(editioncontent_id=content.pk, category_id=category.pk))
+                timeline_cells.add((category.pk, content.edition.archive_year.year))
+            metadata.append(ArchiveMetadata(edition_content=content, **(content_entry.get('metadata') or {})))
+
+        CategoryLink.objects.bulk_create(links)
+        ArchiveMetadata.objects.bulk_create(metadata)
+        counts['metadata'] += len(metadata)
+
+        # bulk_create bypasses the post_save signals that maintain the search index.
+        get_search_backend().index(contents)
@@ -1,14 +1,25 @@
 from datetime import datetime
 from typing import List, Optional, Union, Dict, Any
 from django.db import transaction
+from django.db.models import Case, IntegerField, Q, When
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.text import slugify
 
 from source.apps.archives.models import (
     ArchiveYear, Edition, EditionContent, ArchiveMetadata,
     ArchiveCategory, YearCategoryHighlight
 )
+from source.apps.archives import timeline
+from source.apps.archives.search import get_search_backend
 from source.apps.content.models import Article, Category, Media
+from source.services.archive_statistics import ArchiveStatisticsService
+
+# ArchiveMetadata fields that may be changed through bulk metadata updates.
+METADATA_UPDATE_FIELDS = {
+    field.name for field in ArchiveMetadata._meta.concrete_fields
+    if field.editable and not field.primary_key and field.name != 'edition_content'
+}
 
 class ArchiveService:
     """Service class for handling archive-related operations"""
@@ -73,25 +84,7 @@ class ArchiveService:
     @classmethod
     def get_year_statistics(cls, year: int) -> Dict[str, Any]:
         """Get comprehensive statistics for an archive year"""
-        try:
-            archive_year = ArchiveYear.objects.get(year=year)
-        except ArchiveYear.DoesNotExist:
-            raise ValidationError(f"Archive year {year} does not exist")
-            
-        editions = archive_year.editions.all()
-        
-        return {
-            'total_editions': archive_year.total_editions,
-            'total_content': EditionContent.objects.filter(edition__archive_year=archive_year).count(),
-            'content_by_type': EditionContent.objects.filter(
-                edition__archive_year=archive_year
-            ).values('content_type').annotate(count=models.Count('id')),
-            'digitized_editions': editions.filter(is_digitized=True).count(),
-            'total_pages': sum(edition.page_count for edition in editions),
-            'categories': Category.objects.filter(
-                archived_content__edition__archive_year=archive_year
-            ).distinct().count()
-        }
+        return ArchiveStatisticsService.get_year_statistics(year)
 
     @classmethod
     @transaction.atomic
@@ -124,20 +117,19 @@ class ArchiveService:
         cls, query: str, 
         year: Optional[int] = None,
         content_type: Optional[str] = None,
-        category: Optional[Category] = None
+        category: Optional[Category] = None,
+        mode: str = 'basic',
+        limit: int = 500
     ) -> List[EditionContent]:
-        """Search through archived content with various filters"""
+        """
+        Search through archived content with various filters.
+        ``mode='fulltext'`` uses the ranked search index and returns at most
+        ``limit`` results that pass the filters, best match first.
+        """
         queryset = EditionContent.objects.select_related(
             'edition', 'edition__archive_year'
         ).prefetch_related('categories')
         
-        if query:
-            queryset = queryset.filter(
-                models.Q(title__icontains=query) |
-                models.Q(content_preview__icontains=query) |
-                models.Q(keywords__icontains=query)
-            )
-            
         if year:
             queryset = queryset.filter(edition__archive_year__year=year)
             
@@ -146,28 +138,75 @@ class ArchiveService:
             
         if category:
             queryset = queryset.filter(categories=category)
+        
+        ranked_ids = None
+        if query and mode == 'fulltext':
+            # The filters go into the index query so the limit applies to filtered matches.
+            ranked_ids = [
+                content_id for content_id, _ in get_search_backend().search(query, limit=limit, within=queryset)
+            ]
+            queryset = queryset.filter(id__in=ranked_ids)
+        elif query:
+            queryset = queryset.filter(
+                Q(title__icontains=query) |
+                Q(content_preview__icontains=query) |
+                Q(keywords__icontains=query)
+            )
             
+        if ranked_ids:
+            return queryset.order_by(Case(
+                *[When(id=content_id, then=rank) for rank, content_id in enumerate(ranked_ids)],
+                output_field=IntegerField()
+            ))
         return queryset.order_by('-edition__publication_date')
 
     @classmethod
     @transaction.atomic
     def bulk_update_metadata(
         cls, content_ids: List[int], 
-        metadata: Dict[str, Any]
-    ) -> int:
-        """Bulk update metadata for multiple content items"""
-        updated = 0
-        for content in EditionContent.objects.filter(id__in=content_ids):
-            try:
-                content_metadata = content.metadata
-                for key, value in metadata.items():
-                    if hasattr(content_metadata, key):
-                        setattr(content_metadata, key, value)
-                content_metadata.save()
-                updated += 1
-            except ArchiveMetadata.DoesNotExist:
-                continue
-        return updated
+        metadata: Dict[str, Any],
+        create_missing: bool = False,
+        chunk_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        Bulk update metadata for multiple content items with one UPDATE per chunk.
+        Missing metadata rows are created when ``create_missing`` is set, otherwise
+        they are skipped along with unknown content ids.
+        Returns the created, updated and skipped counts.
+        """
+        unknown_fields = set(metadata) - METADATA_UPDATE_FIELDS
+        if unknown_fields:
+            raise ValidationError(f"Unknown metadata fields: {', '.join(sorted(unknown_fields))}")
+        ArchiveMetadata(**metadata).clean_fields(
+            exclude=[field.name for field in ArchiveMetadata._meta.fields if field.name not in metadata]
+        )
+
+        content_ids = list(dict.fromkeys(content_ids))
+        counts = {'created': 0, 'updated': 0, 'skipped': 0}
+        now = timezone.now()
+        for start in range(0, len(content_ids), chunk_size):
+            chunk = content_ids[start:start + chunk_size]
+            metadata_by_content = dict(
+                EditionContent.objects.filter(id__in=chunk).values_list('id', 'metadata__id')
+            )
+            missing = [content_id for content_id, metadata_id in metadata_by_content.items() if metadata_id is None]
+            counts['skipped'] += len(chunk) - len(metadata_by_content)
+
+            if metadata:
+                counts['updated'] += ArchiveMetadata.objects.filter(
+                    edition_content_id__in=chunk
+                ).update(updated_at=now, **metadata)
+            else:
+                counts['updated'] += len(metadata_by_content) - len(missing)
+
+            if create_missing:
+                ArchiveMetadata.objects.bulk_create([
+                    ArchiveMetadata(edition_content_id=content_id, **metadata) for content_id in missing
+                ])
+                counts['created'] += len(missing)
+            else:
+                counts['skipped'] += len(missing)
+        return counts
 
     @classmethod
     def get_category_timeline(
@@ -175,36 +214,5 @@ class ArchiveService:
         start_year: Optional[int] = None,
         end_year: Optional[int] = None
     ) -> Dict[int, Dict[str, Any]]:
-        """Get a timeline of content for a specific category"""
-        queryset = EditionContent.objects.filter(
-            categories=category
-        ).select_related('edition__archive_year')
-        
-        if start_year:
-            queryset = queryset.filter(edition__archive_year__year__gte=start_year)
-        if end_year:
-            queryset = queryset.filter(edition__archive_year__year__lte=end_year)
-            
-        timeline = {}
-        for content in queryset:
-            year = content.edition.archive_year.year
-            if year not in timeline:
-                timeline[year] = {
-                    'total_content': 0,
-                    'content_types': {},
-                    'editions': set()
-                }
-            
-            timeline[year]['total_content'] += 1
-            timeline[year]['editions'].add(content.edition.edition_number)
-            
-            content_type = content.content_type
-            if content_type not in timeline[year]['content_types']:
-                timeline[year]['content_types'][content_type] = 0
-            timeline[year]['content_types'][content_type] += 1
-            
-        # Convert sets to lists for JSON serialization
-        for year_data in timeline.values():
-            year_data['editions'] = sorted(list(year_data['editions']))
-            
-        return timeline
+        """Get a timeline of content for a specific category from the materialized rollup"""
+        return timeline.get_category_timeline(category.pk, start_year, end_year)
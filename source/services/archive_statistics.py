@@ -0,0 +1,74 @@
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from source.apps.archives.models import ArchiveYear, EditionContent
+
+CONTENT_TYPES = [value for value, _ in EditionContent._meta.get_field('content_type').choices]
+
+
+class ArchiveStatisticsService:
+    """Computes archive year statistics with aggregate queries pushed down to the database"""
+
+    @classmethod
+    def get_statistics_for_years(cls, years: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Get statistics for many archive years at once (all years when ``years`` is None).
+        Runs exactly two queries regardless of how many years or rows are involved.
+        """
+        year_queryset = ArchiveYear.objects.all()
+        content_queryset = EditionContent.objects.all()
+        if years is not None:
+            years = list(years)
+            year_queryset = year_queryset.filter(year__in=years)
+            content_queryset = content_queryset.filter(edition__archive_year__year__in=years)
+
+        # Query 1: edition-level aggregates, one row per archive year.
+        statistics = {}
+        for row in year_queryset.values('year').annotate(
+            edition_count=Count('editions'),
+            digitized_editions=Count('editions', filter=Q(editions__is_digitized=True)),
+            total_pages=Coalesce(Sum('editions__page_count'), 0),
+        ).order_by():
+            statistics[row['year']] = {
+                'total_editions': row['edition_count'],
+                'total_content': 0,
+                'content_by_type': [],
+                'digitized_editions': row['digitized_editions'],
+                'total_pages': row['total_pages'],
+                'categories': 0,
+            }
+
+        # Query 2: content-level aggregates. The categories join multiplies
+        # rows, so content counts are taken over distinct ids.
+        type_counts = {
+            f'type_{content_type}': Count('id', distinct=True, filter=Q(content_type=content_type))
+            for content_type in CONTENT_TYPES
+        }
+        for row in content_queryset.values('edition__archive_year__year').annotate(
+            total_content=Count('id', distinct=True),
+            category_count=Count('categories', distinct=True),
+            **type_counts
+        ).order_by():
+            year_stats = statistics.get(row['edition__archive_year__year'])
+            if year_stats is None:
+                continue
+            year_stats['total_content'] = row['total_content']
+            year_stats['categories'] = row['category_count']
+            year_stats['content_by_type'] = [
+                {'content_type': content_type, 'count': row[f'type_{content_type}']}
+                for content_type in CONTENT_TYPES
+                if row[f'type_{content_type}']
+            ]
+
+        return statistics
+
+    @classmethod
+    def get_year_statistics(cls, year: int) -> Dict[str, Any]:
+        """Get comprehensive statistics for a single archive year"""
+        statistics = cls.get_statistics_for_years([year])
+        if year not in statistics:
+            raise ValidationError(f"Archive year {year} does not exist")
+        return statistics[year]
@@ -0,0 +1,212 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from taggit.models import Tag, TaggedItem
+
+from source.apps.content.cache import ArticleCache, article_cache
+from source.apps.content.models import Article, Category
+from source.utils.slug_utils import allocate_slugs, slugify_value
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+LIST_FIELDS = ('categories', 'tags')
+# Input line an article entry was read from, set by the readers.
+ROW_KEY = '_row'
+
+
+def _published_at(value: Any) -> Optional[datetime]:
+    # Raises ValueError for a value that is not a datetime.
+    if not isinstance(value, str):
+        return value
+    if not value.strip():
+        return None
+    parsed = parse_datetime(value.strip())
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def read_jsonl_articles(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield one article entry per non-empty JSON line."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValidationError(f"Row {number}: invalid JSON: {error.msg}")
+        if not isinstance(entry, dict):
+            raise ValidationError(f"Row {number}: expected a JSON object")
+        entry[ROW_KEY] = number
+        yield entry
+
+
+def read_csv_articles(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield article entries from a CSV file with one row per article. The
+    ``categories`` (slugs) and ``tags`` (names) columns are separated by ``;``.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        entry = {key: value for key, value in row.items() if value not in (None, '')}
+        for field in LIST_FIELDS:
+            entry[field] = [value.strip() for value in row.get(field, '').split(';') if value.strip()]
+        entry[ROW_KEY] = reader.line_num
+        yield entry
+
+
+class ArticleImportService:
+    """Bulk creation of articles with their categories and tags"""
+
+    @classmethod
+    @transaction.atomic
+    def import_articles(cls, entries: Iterable[Dict[str, Any]], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Create articles in batches with ``bulk_create``, linking categories (by
+        slug) and tags (by name, created when missing) through bulk-created
+        through-rows. Entries with an explicit ``slug`` that already exists
+        (once slugified) are skipped, so an interrupted import can be re-run;
+        other slugs are made unique. An invalid entry raises ``ValidationError``
+        naming its row and nothing is written. Returns the number of created
+        articles and tags, and skipped entries.
+        """
+        counts = {'articles': 0, 'tags': 0, 'skipped': 0}
+        state = {
+            'categories': {},
+            'tags': {},
+            'authors': {},
+            'content_type_id': ContentType.objects.get_for_model(Article).pk,
+            'category_ids': set(),
+            'tag_slugs': set(),
+        }
+
+        entries = iter(entries)
+        position = 0
+        while True:
+            batch = list(islice(entries, batch_size))
+            if not batch:
+                break
+            for offset, entry in enumerate(batch, position + 1):
+                cls._validate_entry(entry, entry.get(ROW_KEY, offset))
+            position += len(batch)
+            cls._import_batch(batch, state, counts)
+
+        # bulk_create bypasses the signals that keep listings and counts fresh.
+        if counts['articles']:
+            article_cache.invalidate_scopes(
+                ['all', ArticleCache.tag_cloud_scope]
+                + [ArticleCache.category_scope(pk) for pk in state['category_ids']]
+                + [ArticleCache.category_tags_scope(pk) for pk in state['category_ids']]
+                + [ArticleCache.tag_scope(slug) for slug in state['tag_slugs']]
+            )
+        return counts
+
+    @classmethod
+    def _validate_entry(cls, entry: Dict[str, Any], row: Any) -> None:
+        for field in ('title', 'content'):
+            if not entry.get(field):
+                raise ValidationError(f"Row {row}: article is missing '{field}'")
+        try:
+            _published_at(entry.get('published_at'))
+        except ValueError:
+            raise ValidationError(f"Row {row}: invalid value for 'published_at': {entry['published_at']!r}")
+
+    @classmethod
+    def _resolve_categories(cls, slugs: Set[str], categories: Dict[str, int]) -> None:
+        missing = slugs - set(categories)
+        if not missing:
+            return
+        categories.update(Category.objects.filter(slug__in=missing).values_list('slug', 'pk'))
+        unknown = missing - set(categories)
+        if unknown:
+            raise ValidationError(f"Unknown categories: {', '.join(sorted(unknown))}")
+
+    @classmethod
+    def _resolve_authors(cls, emails: Set[str], authors: Dict[str, int]) -> None:
+        missing = emails - set(authors)
+        if not missing:
+            return
+        User = get_user_model()
+        authors.update(User.objects.filter(email__in=missing).values_list('email', 'pk'))
+        unknown = missing - set(authors)
+        if unknown:
+            raise ValidationError(f"Unknown authors: {', '.join(sorted(unknown))}")
+
+    @classmethod
+    def _resolve_tags(cls, names: Set[str], tags: Dict[str, Tag], counts: Dict[str, int]) -> None:
+        missing = names - set(tags)
+        if not missing:
+            return
+        tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=missing)})
+        new_names = sorted(missing - set(tags))
+        if not new_names:
+            return
+        slugs = allocate_slugs(Tag.objects.all(), new_names, fallback='tag')
+        created = Tag.objects.bulk_create([Tag(name=name, slug=slug) for name, slug in zip(new_names, slugs)])
+        tags.update({tag.name: tag for tag in created})
+        counts['tags'] += len(created)
+
+    @classmethod
+    def _import_batch(cls, batch: List[Dict[str, Any]], state: Dict[str, Any], counts: Dict[str, int]) -> None:
+        cls._resolve_categories({slug for entry in batch for slug in entry.get('categories', [])}, state['categories'])
+        cls._resolve_authors({entry['author_email'] for entry in batch if entry.get('author_email')}, state['authors'])
+        cls._resolve_tags({name for entry in batch for name in entry.get('tags', [])}, state['tags'], counts)
+
+        # Compare explicit slugs in the form they are stored in.
+        max_length = Article._meta.get_field('slug').max_length
+        explicit = [
+            slugify_value(entry['slug'], max_length, 'article') if entry.get('slug') else None for entry in batch
+        ]
+        existing = set(Article.objects.filter(slug__in=set(explicit) - {None}).values_list('slug', flat=True))
+        entries, values = [], []
+        for entry, slug in zip(batch, explicit):
+            if slug in existing:
+                counts['skipped'] += 1
+                continue
+            if slug:
+                existing.add(slug)
+            entries.append(entry)
+            values.append(slug or entry['title'])
+        if not entries:
+            return
+
+        slugs = allocate_slugs(Article.objects.all(), values, fallback='article')
+        now = timezone.now()
+        articles = []
+        for entry, slug in zip(entries, slugs):
+            is_published = str(entry.get('is_published', '')).strip().lower() in TRUE_VALUES
+            published_at = _published_at(entry.get('published_at'))
+            articles.append(Article(
+                title=entry['title'],
+                slug=slug,
+                content=entry['content'],
+                author_id=state['authors'].get(entry.get('author_email')),
+                is_published=is_published,
+                published_at=(published_at or now) if is_published else None,
+            ))
+        Article.objects.bulk_create(articles)
+        counts['articles'] += len(articles)
+
+        CategoryLink = Article.categories.through
+        category_links, tagged_items = [], []
+        for article, entry in zip(articles, entries):
+            for slug in dict.fromkeys(entry.get('categories', [])):
+                category_id = state['categories'][slug]
+                category_links.append(CategoryLink(article_id=article.pk, category_id=category_id))
+                state['category_ids'].add(category_id)
+            for name in dict.fromkeys(entry.get('tags', [])):
+                tag = state['tags'][name]
+                tagged_items.append(TaggedItem(
+                    content_type_id=state['content_type_id'], object_id=article.pk, tag_id=tag.pk
+                ))
+                state['tag_slugs'].add(tag.slug)
+        CategoryLink.objects.bulk_create(category_links)
+        TaggedItem.objects.bulk_create(tagged_items)
@@ -0,0 +1,257 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from source.apps.archives.models import ChunkedUpload, Edition, EditionContent
+from source.apps.content import blobs
+from source.apps.content.models import Media
+
+COPY_BUFFER_SIZE = 64 * 1024
+SCAN_EXTENSIONS = {'.pdf', '.tif', '.tiff'}
+PDF_PAGES_COUNT = re.compile(rb'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b', re.S)
+PDF_PAGE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+# Bytes carried between PDF scan windows so a token split across reads is still matched.
+PDF_SCAN_OVERLAP = 256
+
+_config = getattr(settings, 'CHUNKED_UPLOADS', {})
+UPLOAD_DIR = Path(_config.get('DIR', Path(settings.MEDIA_ROOT) / 'chunked_uploads'))
+MAX_CHUNK_SIZE = _config.get('MAX_CHUNK_SIZE', 8 * 1024 * 1024)
+MAX_FILE_SIZE = _config.get('MAX_FILE_SIZE', 2 * 1024 * 1024 * 1024)
+EXPIRE_AFTER = timedelta(hours=_config.get('EXPIRE_HOURS', 48))
+
+
+class UploadOffsetMismatch(ValidationError):
+    """A chunk did not start where the stored upload ends; resume from ``expected``."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Chunk must start at byte {expected}")
+        self.expected = expected
+
+
+class _HasherCache:
+    """
+    Running SHA-256 states of in-progress uploads, keyed by upload id. A
+    state missing here (another worker received the earlier chunks, or the
+    process restarted) is rebuilt by streaming the partial file from disk.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, upload: ChunkedUpload):
+        with self._lock:
+            offset, state = self._states.pop(upload.upload_id, (None, None))
+        if offset == upload.offset:
+            return state
+        state = hashlib.sha256()
+        with open(part_path(upload), 'rb') as partial:
+            remaining = upload.offset
+            while remaining:
+                block = partial.read(min(COPY_BUFFER_SIZE, remaining))
+                if not block:
+                    break
+                state.update(block)
+                remaining -= len(block)
+        return state
+
+    def put(self, upload: ChunkedUpload, state) -> None:
+        with self._lock:
+            self._states[upload.upload_id] = (upload.offset, state)
+            while len(self._states) > self.capacity:
+                self._states.popitem(last=False)
+
+    def discard(self, upload: ChunkedUpload) -> None:
+        with self._lock:
+            self._states.pop(upload.upload_id, None)
+
+
+_hashers = _HasherCache()
+
+
+class _AssembledFile(File):
+    """
+    The finished partial file with the SHA-256 computed while it was received.
+    Storages move it into place instead of copying it, and
+    ``ContentAddressedStorage`` uses ``sha256`` instead of hashing it again.
+    """
+
+    def __init__(self, file, name, sha256: str):
+        super().__init__(file, name=name)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def part_path(upload: ChunkedUpload) -> Path:
+    return UPLOAD_DIR / f'{upload.upload_id}.part'
+
+
+def count_pdf_pages(path: Path) -> int:
+    """
+    Count PDF pages by streaming the file: the largest ``/Count`` of a page
+    tree node, or the number of page objects when no page tree count is
+    readable (e.g. when it sits in a compressed object stream).
+    """
+    largest_count, page_objects, tail = 0, 0, b''
+    with open(path, 'rb') as pdf:
+        while True:
+            block = pdf.read(COPY_BUFFER_SIZE)
+            if not block:
+                break
+            window = tail + block
+            for match in PDF_PAGES_COUNT.finditer(window):
+                largest_count = max(largest_count, int(match.group(1) or match.group(2)))
+            # Matches that end inside the carried-over tail were counted with the previous block.
+            page_objects += sum(1 for match in PDF_PAGE.finditer(window) if match.end() > len(tail))
+            tail = window[-PDF_SCAN_OVERLAP:]
+    return largest_count or page_objects
+
+
+def count_tiff_pages(path: Path) -> int:
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return getattr(image, 'n_frames', 1)
+
+
+def count_pages(path: Path, filename: str) -> int:
+    """Page count of a PDF or (multi-page) TIFF scan, or 0 for other files."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.pdf':
+        return count_pdf_pages(path)
+    if extension in ('.tif', '.tiff'):
+        return count_tiff_pages(path)
+    return 0
+
+
+class ChunkedUploadService:
+    """Resumable uploads written to disk chunk by chunk and assembled without buffering"""
+
+    @classmethod
+    def start(cls, filename: str, total_size: int, edition: Optional[Edition] = None,
+              edition_content: Optional[EditionContent] = None, user=None) -> ChunkedUpload:
+        """
+        Register a new upload. When the upload is for an edition or one of its
+        pages the file must be a PDF or TIFF scan; the finished file is stored
+        on ``edition_content`` if given and as a document ``Media`` otherwise,
+        which becomes the edition's ``scan`` for a whole-edition upload.
+        """
+        filename = os.path.basename(filename or '')
+        if not filename:
+            raise ValidationError("A file name is required")
+        if not 0 < total_size <= MAX_FILE_SIZE:
+            raise ValidationError(f"File size must be between 1 and {MAX_FILE_SIZE} bytes")
+        if edition_content is not None:
+            edition = edition or edition_content.edition
+            if edition_content.edition_id != edition.pk:
+                raise ValidationError("The edition content belongs to another edition")
+        if edition is not None and os.path.splitext(filename)[1].lower() not in SCAN_EXTENSIONS:
+            raise ValidationError("Edition scans must be PDF or TIFF files")
+
+        upload = ChunkedUpload.objects.create(
+            filename=filename, total_size=total_size, edition=edition, edition_content=edition_content, user=user
+        )
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        part_path(upload).touch()
+        return upload
+
+    @classmethod
+    def append_chunk(cls, upload_id, offset: int, stream: BinaryIO, length: Optional[int] = None) -> ChunkedUpload:
+        """
+        Write a chunk read from ``stream`` at ``offset``. Chunks must arrive in
+        order; a chunk at any other offset raises ``UploadOffsetMismatch``
+        carrying the offset to resume from. The upload is marked complete when
+        the last byte arrives, and its file is stored once that commits.
+        """
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().get(upload_id=upload_id)
+            if upload.is_complete:
+                raise ValidationError("The upload is already complete")
+            if offset != upload.offset:
+                raise UploadOffsetMismatch(upload.offset)
+            limit = min(MAX_CHUNK_SIZE, upload.total_size - upload.offset)
+            if length is not None and length > limit:
+                raise ValidationError(f"Chunk is larger than the {limit} bytes allowed")
+
+            state = _hashers.take(upload)
+            written = 0
+            with open(part_path(upload), 'r+b') as partial:
+                # Drop bytes left behind by an interrupted earlier attempt.
+                partial.truncate(offset)
+                partial.seek(offset)
+                while written < limit:
+                    block = stream.read(min(COPY_BUFFER_SIZE, limit - written))
+                    if not block:
+                        break
+                    partial.write(block)
+                    state.update(block)
+                    written += len(block)
+                if stream.read(1):
+                    partial.truncate(offset)
+                    raise ValidationError(f"Chunk is larger than the {limit} bytes allowed")
+
+            upload.offset += written
+            completed = upload.offset == upload.total_size
+            if completed:
+                upload.checksum = state.hexdigest()
+                upload.status = 'complete'
+                upload.completed_at = timezone.now()
+                _hashers.discard(upload)
+            else:
+                _hashers.put(upload, state)
+            upload.save(update_fields=['offset', 'checksum', 'status', 'completed_at', 'updated_at'])
+        if completed:
+            # Stored after the commit: moving or copying a large scan must not hold the database write lock.
+            cls._store(upload)
+        return upload
+
+    @classmethod
+    def _store(cls, upload: ChunkedUpload) -> None:
+        path = part_path(upload)
+        page_count = count_pages(path, upload.filename)
+        with open(path, 'rb') as handle:
+            assembled = _AssembledFile(handle, name=upload.filename, sha256=upload.checksum)
+            if upload.edition_content is not None:
+                upload.edition_content.digital_content.save(upload.filename, assembled, save=True)
+            else:
+                upload.media = Media.objects.create(file=assembled, media_type='document')
+                upload.save(update_fields=['media', 'updated_at'])
+        if path.exists():
+            path.unlink()
+
+        if upload.edition_id and upload.edition_content_id is None:
+            # Only a whole-edition scan describes the edition's size and pages; a page upload does not.
+            previous_scan_id = Edition.objects.filter(pk=upload.edition_id).values_list('scan_id', flat=True).first()
+            # update() avoids Edition.save(), which recounts the year's editions.
+            Edition.objects.filter(pk=upload.edition_id).update(
+                scan=upload.media, file_size=upload.total_size, page_count=page_count, updated_at=timezone.now()
+            )
+            blobs.schedule_recount(media_ids=[previous_scan_id, upload.media.pk])
+
+    @classmethod
+    def expire(cls, older_than: timedelta = EXPIRE_AFTER) -> int:
+        """Delete unfinished uploads untouched for ``older_than`` and their partial files."""
+        stale = ChunkedUpload.objects.filter(status='uploading', updated_at__lt=timezone.now() - older_than)
+        count = 0
+        for upload in stale.iterator():
+            path = part_path(upload)
+            if path.exists():
+                path.unlink()
+            _hashers.discard(upload)
+            upload.delete()
+            count += 1
+        return count
@@ -1,8 +1,26 @@
+from collections import defaultdict
 from datetime import datetime
 from django.utils import timezone
-from django.db.models import Q
-from django.core.exceptions import ValidationError
-from typing import List, Optional, Dict, Any
+from django.db import transaction
+from django.db.models import Count, Q
+from django.dispatch import Signal
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from typing import Iterable, List, Optional, Dict, Any
+
+ARCHIVE_FIELDS = ('is_archived', 'archived_at', 'archive_reason')
+
+# Sent once per model and batch operation instead of once per object.
+# Arguments: ``sender`` (the model class), ``pks``, ``archived`` and ``archive_reason``.
+content_bulk_archived = Signal()
+
+def supports_archiving(model_class) -> bool:
+    """Check whether a model has the fields required for archiving."""
+    try:
+        for field_name in ARCHIVE_FIELDS:
+            model_class._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return False
+    return True
 
 def archive_content(content_obj, archive_reason: str = None) -> None:
     """
@@ -29,39 +47,111 @@ def restore_from_archive(content_obj) -> None:
     content_obj.archive_reason = None
     content_obj.save()
 
+def _set_archive_state(queryset, archived: bool, archive_reason: str = None,
+                       chunk_size: int = 1000) -> int:
+    model_class = queryset.model
+    if not supports_archiving(model_class):
+        raise ValidationError(f"{model_class._meta.label} does not support archiving")
+
+    # Materialize the ids first so chunked UPDATEs never race an open cursor.
+    pks = list(queryset.filter(is_archived=not archived).values_list('pk', flat=True))
+    now = timezone.now()
+    values = {
+        'is_archived': archived,
+        'archived_at': now if archived else None,
+        'archive_reason': archive_reason if archived else None,
+    }
+    if any(field.name == 'updated_at' for field in model_class._meta.concrete_fields):
+        values['updated_at'] = now
+
+    updated = 0
+    with transaction.atomic():
+        for start in range(0, len(pks), chunk_size):
+            updated += model_class._default_manager.filter(
+                pk__in=pks[start:start + chunk_size]
+            ).update(**values)
+
+    if pks:
+        content_bulk_archived.send(
+            sender=model_class, pks=pks, archived=archived, archive_reason=values['archive_reason']
+        )
+    return updated
+
+def archive_queryset(queryset, archive_reason: str = None, chunk_size: int = 1000) -> int:
+    """
+    Archive every not-yet-archived object in a queryset with one UPDATE per chunk.
+    Returns the number of archived objects.
+    """
+    return _set_archive_state(queryset, True, archive_reason, chunk_size)
+
+def restore_queryset(queryset, chunk_size: int = 1000) -> int:
+    """
+    Restore every archived object in a queryset with one UPDATE per chunk.
+    Returns the number of restored objects.
+    """
+    return _set_archive_state(queryset, False, chunk_size=chunk_size)
+
+def archive_querysets(querysets: Iterable[Any], archive_reason: str = None,
+                      chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Archive several querysets, possibly of different models.
+    Returns the number of archived objects per model label.
+    """
+    counts = defaultdict(int)
+    for queryset in querysets:
+        counts[queryset.model._meta.label] += archive_queryset(queryset, archive_reason, chunk_size)
+    return dict(counts)
+
+def restore_querysets(querysets: Iterable[Any], chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Restore several querysets, possibly of different models.
+    Returns the number of restored objects per model label.
+    """
+    counts = defaultdict(int)
+    for queryset in querysets:
+        counts[queryset.model._meta.label] += restore_queryset(queryset, chunk_size)
+    return dict(counts)
+
 def get_archive_stats(model_class, start_date: Optional[datetime] = None, 
                      end_date: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Get statistics about archived content within a date range.
     """
-    query = Q(is_archived=True)
+    period = Q()
     if start_date:
-        query &= Q(archived_at__gte=start_date)
+        period &= Q(archived_at__gte=start_date)
     if end_date:
-        query &= Q(archived_at__lte=end_date)
+        period &= Q(archived_at__lte=end_date)
     
-    total_archived = model_class.objects.filter(query).count()
-    recently_archived = model_class.objects.filter(
-        is_archived=True,
-        archived_at__gte=timezone.now() - timezone.timedelta(days=30)
-    ).count()
+    stats = model_class.objects.filter(is_archived=True).aggregate(
+        total_archived=Count('pk', filter=period),
+        recently_archived=Count(
+            'pk', filter=Q(archived_at__gte=timezone.now() - timezone.timedelta(days=30))
+        ),
+    )
+    recently_archived = stats['recently_archived']
     
     return {
-        'total_archived': total_archived,
+        'total_archived': stats['total_archived'],
         'recently_archived': recently_archived,
         'archive_rate': recently_archived / 30 if recently_archived > 0 else 0
     }
 
-def bulk_archive(objects: List[Any], archive_reason: str = None) -> int:
+def bulk_archive(objects: List[Any], archive_reason: str = None, chunk_size: int = 1000) -> int:
     """
-    Archive multiple content objects at once.
+    Archive multiple content objects at once, with one UPDATE per model and chunk.
+    Objects whose model does not support archiving are skipped.
     Returns the number of successfully archived objects.
     """
-    count = 0
+    pks_by_model = defaultdict(list)
     for obj in objects:
-        try:
-            archive_content(obj, archive_reason)
-            count += 1
-        except ValidationError:
+        pks_by_model[type(obj)].append(obj.pk)
+
+    count = 0
+    for model_class, pks in pks_by_model.items():
+        if not supports_archiving(model_class):
             continue
+        count += archive_queryset(
+            model_class._default_manager.filter(pk__in=pks), archive_reason, chunk_size
+        )
     return count
@@ -1,8 +1,8 @@
-from django.utils.text import slugify
+from source.utils.slug_utils import slugify_value
 
 def generate_slug(name):
     """Generate a slug for a given name."""
-    return slugify(name)
+    return slugify_value(name)
 
 def is_published(instance):
     """Check if an article or magazine is published."""
@@ -0,0 +1,68 @@
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+from typing import Iterable, List, Optional
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room kept at the end of truncated slugs for a "-<n>" collision suffix.
+SUFFIX_RESERVE = 8
+# Prefixes OR-ed into one query, below SQLite's expression depth limit.
+PREFIXES_PER_QUERY = 500
+
+
+def slugify_value(value: str, max_length: Optional[int] = None, fallback: str = 'item') -> str:
+    """
+    Slugify ``value`` keeping Unicode letters, so Arabic titles produce Arabic
+    slugs instead of an empty string. Falls back to ``fallback`` when nothing
+    is left, and leaves room for a collision suffix under ``max_length``.
+    """
+    slug = slugify(value or '', allow_unicode=True)
+    if max_length and len(slug) > max_length - SUFFIX_RESERVE:
+        slug = slug[:max_length - SUFFIX_RESERVE].rstrip('-_')
+    return slug or fallback
+
+
+def _suffixed(field: str, base: str) -> Q:
+    # A prefix lookup; on PostgreSQL it is served by the pattern-ops index
+    # Django creates for unique slug fields.
+    return Q(**{f'{field}__startswith': f'{base}-'})
+
+
+def allocate_slugs(queryset, values: Iterable[str], field: str = 'slug', fallback: str = 'item') -> List[str]:
+    """
+    Return a unique slug for each value, in order. Slugs already taken in
+    ``queryset`` or earlier in ``values`` get a ``-2``, ``-3``... suffix.
+    Uses one query for exact matches and one prefix query for the
+    colliding slugs, whatever the number of values.
+    """
+    max_length = queryset.model._meta.get_field(field).max_length
+    bases = [slugify_value(value, max_length, fallback) for value in values]
+    if not bases:
+        return []
+
+    taken = set(queryset.filter(**{f'{field}__in': set(bases)}).values_list(field, flat=True))
+    colliding = [base for base, count in Counter(bases).items() if count > 1 or base in taken]
+    for start in range(0, len(colliding), PREFIXES_PER_QUERY):
+        taken.update(queryset.filter(
+            reduce(or_, (_suffixed(field, base) for base in colliding[start:start + PREFIXES_PER_QUERY]))
+        ).values_list(field, flat=True))
+
+    slugs, counters = [], defaultdict(lambda: 1)
+    for base in bases:
+        slug = base
+        while slug in taken:
+            counters[base] += 1
+            slug = f'{base}-{counters[base]}'
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def unique_slug(instance, value: str, field: str = 'slug') -> str:
+    """Return a free slug for a single model instance, ignoring the instance's own row."""
+    queryset = type(instance)._default_manager.all()
+    if instance.pk is not None:
+        queryset = queryset.exclude(pk=instance.pk)
+    return allocate_slugs(queryset, [value], field, fallback=type(instance)._meta.model_name)[0]
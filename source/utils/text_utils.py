@@ -0,0 +1,39 @@
+import re
+from typing import List
+
+# Harakat, Quranic annotation marks and the superscript alef.
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06dc\u06df-\u06e8\u06ea-\u06ed]')
+ARABIC_TATWEEL = '\u0640'
+ARABIC_LETTER_MAP = str.maketrans({
+    'آ': 'ا',  # alef with madda -> alef
+    'أ': 'ا',  # alef with hamza above -> alef
+    'إ': 'ا',  # alef with hamza below -> alef
+    'ٱ': 'ا',  # alef wasla -> alef
+    'ى': 'ي',  # alef maksura -> yeh
+    'ة': 'ه',  # teh marbuta -> heh
+    'ؤ': 'و',  # waw with hamza -> waw
+    'ئ': 'ي',  # yeh with hamza -> yeh
+})
+# Definite article with its common attached conjunctions/prepositions.
+ARABIC_ARTICLE_PREFIXES = ('وال', 'بال', 'كال',
+                           'فال', 'لل', 'ال')
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_arabic(text: str) -> str:
+    """Strip diacritics and tatweel and fold Arabic letter variants."""
+    text = ARABIC_DIACRITICS.sub('', text or '').replace(ARABIC_TATWEEL, '')
+    return text.translate(ARABIC_LETTER_MAP).casefold()
+
+
+def stem_token(token: str) -> str:
+    """Light stemming: drop a leading definite article from longer Arabic tokens."""
+    for prefix in ARABIC_ARTICLE_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            return token[len(prefix):]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized, lightly stemmed search tokens."""
+    return [stem_token(token) for token in TOKEN_PATTERN.findall(normalize_arabic(text))]